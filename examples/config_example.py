@@ -5,15 +5,18 @@ Example script demonstrating the configuration management system.
 import sys
 import os
 
-# Add the src directory to the path so we can import our modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-from src.services.config_service import ConfigService
-from src.models.config import Config
+# Add the project root to the path so we can import our modules
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in map(os.path.abspath, sys.path):
+    sys.path.append(PROJECT_ROOT)
 
 
 def main():
     """Demonstrate configuration loading and validation."""
+    # Imported here so the script's module import stays cheap
+    from src.services.config_service import ConfigService
+    from src.models.config import Config
+    
     config_service = ConfigService()
     
     print("=== Price Monitor Configuration System Demo ===\n")
@@ -22,17 +25,19 @@ def main():
     print("1. Creating default configuration file...")
     default_config_path = "config/example.properties"
     
+    config = None
     try:
-        config_service.create_default_config_file(default_config_path)
+        config = config_service.create_default_config_file(default_config_path)
         print(f"✓ Created default configuration at: {default_config_path}")
     except Exception as e:
         print(f"✗ Failed to create default config: {e}")
     
-    # Example 2: Load configuration with validation
+    # Example 2: Use the configuration returned above instead of re-reading the file
     print("\n2. Loading configuration...")
     
     try:
-        config = config_service.load_config(default_config_path)
+        if config is None:
+            config = config_service.load_config(default_config_path)
         print("✓ Configuration loaded successfully!")
         
         # Display some key settings
@@ -6,16 +6,39 @@ Demonstration script showing the database models and service layer functionality
 import sys
 import os
 
-# Add the project root to the Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Add the project root to the end of the Python path if missing
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in map(os.path.abspath, sys.path):
+    sys.path.append(PROJECT_ROOT)
 
-from src.models.database import get_database_manager
-from src.models.migrations import run_migrations
-from src.services.product_service import ProductService
+# Price trend markers indexed by sign(current - previous) + 1
+PRICE_TREND_ICONS = ("📉", "➡️", "📈")
+
+# One listing entry per product, written in a single call instead of six prints
+PRODUCT_BLOCK_FORMAT = (
+    "   {status} {name}\n"
+    "      Current: ${current}\n"
+    "      Previous: ${previous}\n"
+    "      Lowest: ${lowest}\n"
+    "      URL: {url}\n"
+    "\n"
+).format
+
+
+def price_trend_icon(current_price, previous_price):
+    """Return the trend marker for a price change (unchanged if no previous price)."""
+    if previous_price is None:
+        return PRICE_TREND_ICONS[1]
+    return PRICE_TREND_ICONS[(current_price > previous_price) - (current_price < previous_price) + 1]
 
 
 def main():
     """Demonstrate database functionality."""
+    # Imported here so SQLAlchemy is only loaded when the demo actually runs
+    from src.models.database import get_database_manager
+    from src.models.migrations import run_migrations
+    from src.services.product_service import ProductService
+    
     print("=== Price Monitor Database Demo ===\n")
     
     # Create database manager (uses temporary database for demo)
@@ -27,74 +50,74 @@ def main():
     # Create product service
     product_service = ProductService(db_manager)
     
-    # Add some sample products
+    # Add some sample products in a single transaction
     print("2. Adding sample products...")
     
-    product1 = product_service.add_product(
-        url="https://example.com/laptop",
-        name="Gaming Laptop",
-        price=1299.99,
-        image_url="https://example.com/laptop.jpg"
-    )
+    product1, product2, product3 = product_service.add_products_bulk([
+        {
+            'url': "https://example.com/laptop",
+            'name': "Gaming Laptop",
+            'price': 1299.99,
+            'image_url': "https://example.com/laptop.jpg"
+        },
+        {
+            'url': "https://example.com/headphones",
+            'name': "Wireless Headphones",
+            'price': 199.99,
+            'image_url': "https://example.com/headphones.jpg"
+        },
+        {
+            'url': "https://example.com/mouse",
+            'name': "Gaming Mouse",
+            'price': 79.99
+        },
+    ])
     print(f"   ✓ Added: {product1.name} - ${product1.current_price}")
-    
-    product2 = product_service.add_product(
-        url="https://example.com/headphones",
-        name="Wireless Headphones",
-        price=199.99,
-        image_url="https://example.com/headphones.jpg"
-    )
     print(f"   ✓ Added: {product2.name} - ${product2.current_price}")
-    
-    product3 = product_service.add_product(
-        url="https://example.com/mouse",
-        name="Gaming Mouse",
-        price=79.99
-    )
     print(f"   ✓ Added: {product3.name} - ${product3.current_price}\n")
     
-    # Update some prices
+    # Update some prices in a single transaction
     print("3. Updating prices...")
     
-    # Price drop for laptop
-    product_service.update_product_price(product1.id, 1199.99, 'automatic')
+    product_service.update_prices_bulk([
+        (product1.id, 1199.99, 'automatic'),  # Price drop for laptop
+        (product2.id, 219.99, 'automatic'),   # Price increase for headphones
+        (product3.id, 69.99, 'manual'),       # Manual price update for mouse
+    ])
     print(f"   ✓ {product1.name}: ${product1.current_price} → $1199.99 (price drop!)")
-    
-    # Price increase for headphones
-    product_service.update_product_price(product2.id, 219.99, 'automatic')
     print(f"   ✓ {product2.name}: ${product2.current_price} → $219.99 (price increase)")
-    
-    # Manual price update for mouse
-    product_service.update_product_price(product3.id, 69.99, 'manual')
     print(f"   ✓ {product3.name}: ${product3.current_price} → $69.99 (manual update)\n")
     
     # Show all products
     print("4. Current product list:")
-    products = product_service.get_all_products()
-    for product in products:
-        status = "📉" if product.current_price < (product.previous_price or float('inf')) else "📈" if product.previous_price and product.current_price > product.previous_price else "➡️"
-        print(f"   {status} {product.name}")
-        print(f"      Current: ${product.current_price}")
-        print(f"      Previous: ${product.previous_price or 'N/A'}")
-        print(f"      Lowest: ${product.lowest_price}")
-        print(f"      URL: {product.url}")
-        print()
+    sys.stdout.write("".join(
+        PRODUCT_BLOCK_FORMAT(
+            status=price_trend_icon(product.current_price, product.previous_price),
+            name=product.name,
+            current=product.current_price,
+            previous=product.previous_price or 'N/A',
+            lowest=product.lowest_price,
+            url=product.url
+        )
+        for product in product_service.iter_products()
+    ))
     
     # Show price history for laptop
     print("5. Price history for Gaming Laptop:")
     history = product_service.get_price_history(product1.id)
     for entry in history:
-        print(f"   ${entry.price} - {entry.recorded_at.strftime('%Y-%m-%d %H:%M:%S')} ({entry.source})")
+        print(f"   ${entry.price} - {entry.recorded_at.isoformat(sep=' ', timespec='seconds')} ({entry.source})")
     print()
     
     # Check for price drops
     print("6. Checking for price drops...")
-    for product in products:
-        has_dropped, prev_price, curr_price = product_service.has_price_dropped(product.id)
-        if has_dropped:
-            print(f"   🎉 {product.name}: Price dropped from ${prev_price} to ${curr_price}")
-        elif prev_price:
-            print(f"   📊 {product.name}: No price drop (${prev_price} → ${curr_price})")
+    # SQLite finds the dropped products; only their IDs come back
+    dropped_ids = set(product_service.get_dropped_product_ids())
+    for product in product_service.iter_products():
+        if product.id in dropped_ids:
+            print(f"   🎉 {product.name}: Price dropped from ${product.previous_price} to ${product.current_price}")
+        elif product.previous_price:
+            print(f"   📊 {product.name}: No price drop (${product.previous_price} → ${product.current_price})")
     print()
     
     # Show statistics
@@ -105,8 +128,12 @@ def main():
     print(f"   Recent price drops: {stats['recent_price_drops']}")
     print()
     
+    # Closing the last connection checkpoints the WAL back into the main
+    # file and removes the -wal and -shm files
+    db_manager.close()
+    
     print("=== Demo completed successfully! ===")
-    print(f"Database file: demo_price_monitor.db")
+    print("Data saved to demo_price_monitor.db")
 
 
 if __name__ == "__main__":
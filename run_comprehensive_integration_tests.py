@@ -12,26 +12,296 @@ import time
 import json
 import subprocess
 import argparse
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import xml.etree.ElementTree as ET
+from collections import defaultdict, deque
 from datetime import datetime
-from io import StringIO
 import tempfile
 import shutil
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+# Tool availability probes are slow (process spawns, a headless browser),
+# so their results are reused for a day
+ENV_PROBE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'price_monitor_envinfo.json')
+ENV_PROBE_CACHE_TTL = 24 * 60 * 60
+
+# Only the tail of each module's verbose output is kept for the report
+MODULE_OUTPUT_MAX_LINES = 2000
+
+
+class RingStream:
+    """Text stream that keeps only the last ``maxlen`` lines written to it."""
+    
+    def __init__(self, maxlen=MODULE_OUTPUT_MAX_LINES):
+        self._buf = deque(maxlen=maxlen)
+    
+    def write(self, s):
+        self._buf.extend(s.splitlines(keepends=True))
+    
+    def flush(self):
+        pass
+    
+    def getvalue(self):
+        return ''.join(self._buf)
+
+
+def _probe_docker():
+    """Check whether the Docker CLI is available."""
+    try:
+        docker_result = subprocess.run(['docker', '--version'], 
+                                     capture_output=True, text=True, timeout=10)
+        if docker_result.returncode == 0:
+            return {'docker_available': True, 'docker_version': docker_result.stdout.strip()}
+        return {'docker_available': False}
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return {'docker_available': False}
+
+
+def _probe_docker_compose():
+    """Check whether Docker Compose is available."""
+    try:
+        compose_result = subprocess.run(['docker-compose', '--version'], 
+                                      capture_output=True, text=True, timeout=10)
+        if compose_result.returncode == 0:
+            return {'docker_compose_available': True, 'docker_compose_version': compose_result.stdout.strip()}
+        return {'docker_compose_available': False}
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return {'docker_compose_available': False}
+
+
+def _probe_selenium():
+    """Check whether Selenium can start a headless Chrome session."""
+    try:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
+        options = Options()
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        
+        driver = webdriver.Chrome(options=options)
+        driver.quit()
+        return {'selenium_available': True}
+    except Exception:
+        return {'selenium_available': False}
+
+
+def run_test_module_isolated(module_name):
+    """
+    Run the tests of one module and return its results dictionary.
+    
+    This is a module-level function returning plain data so it can run in a
+    worker process.
+    """
+    # Capture the tail of the test output
+    test_output = RingStream()
+    
+    try:
+        # Import the test module
+        test_module = __import__(module_name, fromlist=[''])
+        
+        # Create test suite
+        loader = unittest.TestLoader()
+        suite = loader.loadTestsFromModule(test_module)
+        
+        # Run tests with custom result handler
+        runner = unittest.TextTestRunner(
+            stream=test_output,
+            verbosity=2,
+            buffer=True
+        )
+        
+        result = runner.run(suite)
+        
+        # Process results; output is only kept when something went wrong
+        success = result.wasSuccessful()
+        skipped = getattr(result, 'skipped', ())
+        module_results = {
+            'module': module_name,
+            'tests_run': result.testsRun,
+            'failures': len(result.failures),
+            'errors': len(result.errors),
+            'skipped': len(skipped),
+            'success': success,
+            'output': '' if success else test_output.getvalue(),
+            'failure_details': [],
+            'error_details': [],
+            'skipped_details': []
+        }
+        
+        # Collect failure details
+        for test, traceback in result.failures:
+            module_results['failure_details'].append({
+                'test': str(test),
+                'traceback': traceback
+            })
+        
+        # Collect error details
+        for test, traceback in result.errors:
+            module_results['error_details'].append({
+                'test': str(test),
+                'traceback': traceback
+            })
+        
+        # Collect skipped details
+        for test, reason in skipped:
+            module_results['skipped_details'].append({
+                'test': str(test),
+                'reason': reason
+            })
+        
+        return module_results
+        
+    except ImportError as e:
+        return {
+            'module': module_name,
+            'import_error': str(e),
+            'tests_run': 0,
+            'success': False
+        }
+    
+    except Exception as e:
+        return {
+            'module': module_name,
+            'execution_error': str(e),
+            'tests_run': 0,
+            'success': False
+        }
+
+
+class _WritelnStream:
+    """Wrap a text stream with the writeln() that TextTestResult writes through."""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, s):
+        self._stream.write(s)
+    
+    def writeln(self, s=None):
+        if s:
+            self._stream.write(s)
+        self._stream.write('\n')
+    
+    def flush(self):
+        self._stream.flush()
+
+
+class _PartitioningResult(unittest.TextTestResult):
+    """
+    Test result that buckets outcomes by test module.
+    
+    Lets a single suite spanning several modules be reported per module. Each
+    module's verbose output goes to its own RingStream.
+    """
+    
+    def __init__(self, stream, descriptions, verbosity):
+        super().__init__(stream, descriptions, verbosity)
+        self.module_names = []
+        self.per_module = {}
+    
+    def _module_of(self, test):
+        """Return the registered module a test (or error holder) belongs to."""
+        test_id = test.id()
+        if ' (' in test_id and test_id.endswith(')'):
+            # Class and module fixture errors are reported under ids such as
+            # "setUpClass (tests.test_x.TestCase)"
+            test_id = test_id.partition(' (')[2][:-1]
+        for module_name in self.module_names:
+            if test_id == module_name or test_id.startswith(module_name + '.'):
+                return module_name
+        return None
+    
+    def _bucket(self, test):
+        module_name = self._module_of(test)
+        bucket = self.per_module.get(module_name)
+        if bucket is not None:
+            self.stream = _WritelnStream(bucket['output'])
+        return bucket
+    
+    def add_module(self, module_name):
+        self.module_names.append(module_name)
+        self.per_module[module_name] = {
+            'tests_run': 0,
+            'failures': [],
+            'errors': [],
+            'skipped': [],
+            'unexpected_successes': 0,
+            'output': RingStream()
+        }
+    
+    def startTest(self, test):
+        bucket = self._bucket(test)
+        if bucket is not None:
+            bucket['tests_run'] += 1
+        super().startTest(test)
+    
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        bucket = self._bucket(test)
+        if bucket is not None:
+            bucket['failures'].append(self.failures[-1])
+    
+    def addError(self, test, err):
+        super().addError(test, err)
+        bucket = self._bucket(test)
+        if bucket is not None:
+            bucket['errors'].append(self.errors[-1])
+    
+    def addSubTest(self, test, subtest, err):
+        failures, errors = len(self.failures), len(self.errors)
+        super().addSubTest(test, subtest, err)
+        bucket = self._bucket(test)
+        if bucket is not None:
+            bucket['failures'].extend(self.failures[failures:])
+            bucket['errors'].extend(self.errors[errors:])
+    
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        bucket = self._bucket(test)
+        if bucket is not None:
+            bucket['skipped'].append(self.skipped[-1])
+    
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        bucket = self._bucket(test)
+        if bucket is not None:
+            bucket['unexpected_successes'] += 1
+    
+    def printErrors(self):
+        # Each module's tracebacks go to that module's own output
+        for bucket in self.per_module.values():
+            self.stream = _WritelnStream(bucket['output'])
+            self.printErrorList('ERROR', bucket['errors'])
+            self.printErrorList('FAIL', bucket['failures'])
+
 
 class ComprehensiveIntegrationTestRunner:
     """Comprehensive integration test runner with detailed reporting."""
     
-    def __init__(self, output_dir=None, skip_docker=False, skip_selenium=False):
-        self.output_dir = output_dir or f"test_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    def __init__(self, output_dir=None, skip_docker=False, skip_selenium=False, use_pytest=False,
+                 workers=None):
+        # Timestamp shared by the output directory name and every report
+        self._now = datetime.now()
+        self._now_str = self._now.strftime('%Y-%m-%d %H:%M:%S')
+        
+        self.output_dir = output_dir or f"test_reports_{self._now.strftime('%Y%m%d_%H%M%S')}"
         self.skip_docker = skip_docker
         self.skip_selenium = skip_selenium
+        self.use_pytest = use_pytest
+        self.workers = workers or os.cpu_count() or 1
         
         # Ensure output directory exists
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # Tracebacks are written here as modules finish; opened on first failure
+        self.failure_report_path = os.path.join(self.output_dir, 'failure_analysis.txt')
+        self._failure_fp = None
+        
         self.results = {
             'start_time': None,
             'end_time': None,
@@ -65,59 +335,94 @@ class ComprehensiveIntegrationTestRunner:
             'tests.test_product_listing_features'
         ]
         
-        # Add Docker tests if not skipped
+        # Apply the skip flags here so skipped modules are never imported
         if not skip_docker:
             self.test_modules.append('tests.test_docker_integration')
+        if skip_selenium:
+            self.test_modules = [
+                module_name for module_name in self.test_modules
+                if 'static_web' not in module_name and 'web_interface' not in module_name
+            ]
+    
+    def _get_tool_probes(self):
+        """
+        Return Docker, Docker Compose and Selenium availability.
+        
+        Probing forks two CLI tools and starts a headless browser, so results
+        are cached on disk for ENV_PROBE_CACHE_TTL seconds. The cache is keyed
+        by a fingerprint of the host and tool locations, so installing or
+        upgrading a tool invalidates it.
+        """
+        import platform
+        
+        fingerprint = [
+            self.skip_selenium,
+            platform.node(),
+            platform.release(),
+            shutil.which('docker'),
+            shutil.which('docker-compose'),
+            os.path.getmtime(sys.executable),
+        ]
+        
+        try:
+            with open(ENV_PROBE_CACHE_PATH) as f:
+                cached = json.load(f)
+            if (cached.get('fingerprint') == fingerprint and
+                    time.time() - cached.get('created_at', 0) < ENV_PROBE_CACHE_TTL):
+                return cached['probes']
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        probes = self._run_tool_probes()
+        
+        try:
+            os.makedirs(os.path.dirname(ENV_PROBE_CACHE_PATH), exist_ok=True)
+            with open(ENV_PROBE_CACHE_PATH, 'w') as f:
+                json.dump({'fingerprint': fingerprint, 'created_at': time.time(), 'probes': probes}, f)
+        except OSError:
+            pass
+        
+        return probes
+    
+    def _run_tool_probes(self):
+        """
+        Probe Docker, Docker Compose and Selenium availability.
+        
+        The probes only wait on child processes, so they run in threads and
+        their timeouts overlap instead of adding up. Selenium is not imported
+        at all when Selenium tests are skipped.
+        """
+        probes = {}
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(_probe_docker),
+                executor.submit(_probe_docker_compose),
+            ]
+            if self.skip_selenium:
+                probes['selenium_available'] = False
+            else:
+                futures.append(executor.submit(_probe_selenium))
+            for future in as_completed(futures):
+                probes.update(future.result())
+        return probes
     
     def collect_environment_info(self):
         """Collect comprehensive environment information."""
         print("Collecting environment information...")
         
+        import platform
+        
         try:
             # Python version
             self.results['environment_info']['python_version'] = sys.version
             
             # Operating system
-            import platform
             self.results['environment_info']['os'] = platform.system()
             self.results['environment_info']['os_version'] = platform.release()
             self.results['environment_info']['architecture'] = platform.machine()
             
-            # Docker availability
-            try:
-                docker_result = subprocess.run(['docker', '--version'], 
-                                             capture_output=True, text=True, timeout=10)
-                self.results['environment_info']['docker_available'] = docker_result.returncode == 0
-                if docker_result.returncode == 0:
-                    self.results['environment_info']['docker_version'] = docker_result.stdout.strip()
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                self.results['environment_info']['docker_available'] = False
-            
-            # Docker Compose availability
-            try:
-                compose_result = subprocess.run(['docker-compose', '--version'], 
-                                              capture_output=True, text=True, timeout=10)
-                self.results['environment_info']['docker_compose_available'] = compose_result.returncode == 0
-                if compose_result.returncode == 0:
-                    self.results['environment_info']['docker_compose_version'] = compose_result.stdout.strip()
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                self.results['environment_info']['docker_compose_available'] = False
-            
-            # Selenium availability
-            try:
-                from selenium import webdriver
-                from selenium.webdriver.chrome.options import Options
-                
-                options = Options()
-                options.add_argument('--headless')
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
-                
-                driver = webdriver.Chrome(options=options)
-                driver.quit()
-                self.results['environment_info']['selenium_available'] = True
-            except Exception:
-                self.results['environment_info']['selenium_available'] = False
+            # Docker, Docker Compose and Selenium availability (cached between runs)
+            self.results['environment_info'].update(self._get_tool_probes())
             
             # Required files check
             required_files = [
@@ -135,10 +440,22 @@ class ComprehensiveIntegrationTestRunner:
                 '.kiro/specs/price-monitor/tasks.md'
             ]
             
-            missing_files = []
+            # One directory listing per parent directory instead of a stat per file
+            files_by_dir = defaultdict(list)
             for file_path in required_files:
-                if not os.path.exists(file_path):
-                    missing_files.append(file_path)
+                files_by_dir[os.path.dirname(file_path)].append(file_path)
+            
+            missing_files = []
+            for directory, file_paths in files_by_dir.items():
+                try:
+                    with os.scandir(directory or '.') as entries:
+                        present = {entry.name for entry in entries}
+                except OSError:
+                    present = set()
+                missing_files.extend(
+                    file_path for file_path in file_paths
+                    if os.path.basename(file_path) not in present
+                )
             
             self.results['environment_info']['missing_files'] = missing_files
             self.results['environment_info']['all_files_present'] = len(missing_files) == 0
@@ -152,116 +469,312 @@ class ComprehensiveIntegrationTestRunner:
     
     def run_test_module(self, module_name):
         """Run tests from a specific module."""
+        module_results = run_test_module_isolated(module_name)
+        return self._record_module_results(module_name, module_results)
+    
+    def _record_module_results(self, module_name, module_results):
+        """Fold one module's results into the run totals and print its summary."""
         print(f"\n{'='*80}")
         print(f"Running tests from: {module_name}")
         print(f"{'='*80}")
         
-        # Skip Docker tests if requested
-        if self.skip_docker and 'docker' in module_name.lower():
-            print(f"Skipping {module_name} (Docker tests disabled)")
-            return True
+        self.results['test_modules'].append(module_results)
         
-        # Skip Selenium tests if requested
-        if self.skip_selenium and ('static_web' in module_name or 'web_interface' in module_name):
-            print(f"Skipping {module_name} (Selenium tests disabled)")
-            return True
+        if 'import_error' in module_results:
+            print(f"Could not import test module {module_name}: {module_results['import_error']}")
+            return False
+        if 'execution_error' in module_results:
+            print(f"Error running tests from {module_name}: {module_results['execution_error']}")
+            return False
         
-        # Capture test output
-        test_output = StringIO()
+        self._spill_tracebacks(module_results)
         
-        try:
-            # Import the test module
-            test_module = __import__(module_name, fromlist=[''])
-            
-            # Create test suite
-            loader = unittest.TestLoader()
-            suite = loader.loadTestsFromModule(test_module)
-            
-            # Run tests with custom result handler
-            runner = unittest.TextTestRunner(
-                stream=test_output,
-                verbosity=2,
-                buffer=True
-            )
-            
-            result = runner.run(suite)
+        # Update totals
+        tests_run = module_results['tests_run']
+        failures = module_results['failures']
+        errors = module_results['errors']
+        skipped = module_results['skipped']
+        passed = tests_run - failures - errors - skipped
+        
+        self.results['total_tests'] += tests_run
+        self.results['failed_tests'] += failures
+        self.results['error_tests'] += errors
+        self.results['skipped_tests'] += skipped
+        self.results['passed_tests'] += passed
+        
+        # Print summary for this module
+        print(f"\nModule: {module_name}")
+        print(f"  Tests run: {tests_run}")
+        print(f"  Passed: {passed}")
+        print(f"  Failed: {failures}")
+        print(f"  Errors: {errors}")
+        print(f"  Skipped: {skipped}")
+        print(f"  Success: {module_results['success']}")
+        
+        return module_results['success']
+    
+    def run_modules_in_single_suite(self, module_names):
+        """
+        Run test modules in-process as one combined suite.
+        
+        Tests are collected with a single loader into one suite and run by a
+        single runner; a partitioning result class then splits the outcome
+        back into the usual per-module results.
+        """
+        loader = unittest.TestLoader()
+        master_suite = unittest.TestSuite()
+        runner = unittest.TextTestRunner(
+            stream=RingStream(),
+            verbosity=2,
+            buffer=True
+        )
+        result = _PartitioningResult(runner.stream, runner.descriptions, runner.verbosity)
+        runner.resultclass = lambda *args, **kwargs: result
+        
+        all_successful = True
+        loaded_modules = []
+        for module_name in module_names:
+            try:
+                test_module = __import__(module_name, fromlist=[''])
+                master_suite.addTests(loader.loadTestsFromModule(test_module))
+            except Exception as e:
+                error_key = 'import_error' if isinstance(e, ImportError) else 'execution_error'
+                self._record_module_results(module_name, {
+                    'module': module_name,
+                    error_key: str(e),
+                    'tests_run': 0,
+                    'success': False
+                })
+                all_successful = False
+                continue
             
-            # Process results
+            result.add_module(module_name)
+            loaded_modules.append(module_name)
+        
+        try:
+            runner.run(master_suite)
+        except Exception as e:
+            print(f"Error running combined test suite: {e}")
+            for module_name in loaded_modules:
+                self._record_module_results(module_name, {
+                    'module': module_name,
+                    'execution_error': str(e),
+                    'tests_run': 0,
+                    'success': False
+                })
+            return False
+        
+        for module_name in loaded_modules:
+            bucket = result.per_module[module_name]
+            success = not (bucket['failures'] or bucket['errors'] or bucket['unexpected_successes'])
             module_results = {
                 'module': module_name,
-                'tests_run': result.testsRun,
-                'failures': len(result.failures),
-                'errors': len(result.errors),
-                'skipped': len(result.skipped) if hasattr(result, 'skipped') else 0,
-                'success': result.wasSuccessful(),
-                'output': test_output.getvalue(),
+                'tests_run': bucket['tests_run'],
+                'failures': len(bucket['failures']),
+                'errors': len(bucket['errors']),
+                'skipped': len(bucket['skipped']),
+                'success': success,
+                'output': '' if success else bucket['output'].getvalue(),
+                'failure_details': [
+                    {'test': str(test), 'traceback': traceback}
+                    for test, traceback in bucket['failures']
+                ],
+                'error_details': [
+                    {'test': str(test), 'traceback': traceback}
+                    for test, traceback in bucket['errors']
+                ],
+                'skipped_details': [
+                    {'test': str(test), 'reason': reason}
+                    for test, reason in bucket['skipped']
+                ]
+            }
+            if not self._record_module_results(module_name, module_results):
+                all_successful = False
+        
+        module_order = {name: index for index, name in enumerate(module_names)}
+        self.results['test_modules'].sort(key=lambda result: module_order.get(result['module'], len(module_order)))
+        return all_successful
+    
+    def run_modules_in_parallel(self, module_names):
+        """
+        Run test modules concurrently in worker processes.
+        
+        Modules are independent, so they are spread over a process pool.
+        Docker modules share a single extra worker so they never compete for
+        containers or ports. Results are recorded as modules finish and then
+        put back into the configured module order.
+        """
+        docker_modules = [name for name in module_names if 'docker' in name.lower()]
+        other_modules = [name for name in module_names if name not in docker_modules]
+        
+        all_successful = True
+        with ProcessPoolExecutor(max_workers=self.workers) as pool, \
+                ProcessPoolExecutor(max_workers=1) as docker_pool:
+            futures = {
+                pool.submit(run_test_module_isolated, name): name
+                for name in other_modules
+            }
+            futures.update({
+                docker_pool.submit(run_test_module_isolated, name): name
+                for name in docker_modules
+            })
+            
+            for future in as_completed(futures):
+                module_name = futures[future]
+                try:
+                    module_results = future.result()
+                except Exception as e:
+                    module_results = {
+                        'module': module_name,
+                        'execution_error': str(e),
+                        'tests_run': 0,
+                        'success': False
+                    }
+                if not self._record_module_results(module_name, module_results):
+                    all_successful = False
+        
+        module_order = {name: index for index, name in enumerate(module_names)}
+        self.results['test_modules'].sort(key=lambda result: module_order.get(result['module'], len(module_order)))
+        return all_successful
+    
+    def run_modules_with_pytest(self, module_names):
+        """
+        Run all modules in a single pytest invocation.
+        
+        Collection happens once for the whole run, and when pytest-xdist is
+        installed the modules are spread over all CPU cores with
+        ``--dist=loadfile`` so each file stays on one worker. Results are read
+        back from the JUnit XML report into the usual per-module structure.
+        """
+        print(f"\n{'='*80}")
+        print(f"Running {len(module_names)} test modules with pytest")
+        print(f"{'='*80}")
+        
+        junit_path = os.path.join(self.output_dir, 'junit.xml')
+        command = [sys.executable, '-m', 'pytest', '-q', f'--junitxml={junit_path}']
+        if importlib.util.find_spec('xdist') is not None:
+            command += ['-n', 'auto', '--dist=loadfile']
+        else:
+            print("pytest-xdist not installed, running modules in a single process")
+        command += [module_name.replace('.', os.sep) + '.py' for module_name in module_names]
+        
+        try:
+            subprocess.run(command)
+            tree = ET.parse(junit_path)
+        except (OSError, ET.ParseError) as e:
+            print(f"Error running tests with pytest: {e}")
+            for module_name in module_names:
+                self._record_module_results(module_name, {
+                    'module': module_name,
+                    'execution_error': str(e),
+                    'tests_run': 0,
+                    'success': False
+                })
+            return False
+        
+        module_results = {
+            module_name: {
+                'module': module_name,
+                'tests_run': 0,
+                'failures': 0,
+                'errors': 0,
+                'skipped': 0,
+                'success': True,
+                'output': '',
                 'failure_details': [],
                 'error_details': [],
                 'skipped_details': []
             }
+            for module_name in module_names
+        }
+        
+        for testcase in tree.iter('testcase'):
+            classname = testcase.get('classname', '')
+            module_name = next(
+                (name for name in module_names if classname == name or classname.startswith(name + '.')),
+                None
+            )
+            if module_name is None:
+                continue
             
-            # Collect failure details
-            for test, traceback in result.failures:
-                module_results['failure_details'].append({
-                    'test': str(test),
-                    'traceback': traceback
-                })
-            
-            # Collect error details
-            for test, traceback in result.errors:
-                module_results['error_details'].append({
-                    'test': str(test),
-                    'traceback': traceback
-                })
+            module_result = module_results[module_name]
+            module_result['tests_run'] += 1
+            test_name = f"{testcase.get('name')} ({classname})"
             
-            # Collect skipped details
-            if hasattr(result, 'skipped'):
-                for test, reason in result.skipped:
-                    module_results['skipped_details'].append({
-                        'test': str(test),
-                        'reason': reason
+            for outcome, count_key, details_key in (
+                ('failure', 'failures', 'failure_details'),
+                ('error', 'errors', 'error_details'),
+            ):
+                element = testcase.find(outcome)
+                if element is not None:
+                    module_result[count_key] += 1
+                    module_result['success'] = False
+                    module_result[details_key].append({
+                        'test': test_name,
+                        'traceback': element.text or element.get('message', '')
                     })
             
-            self.results['test_modules'].append(module_results)
-            
-            # Update totals
-            self.results['total_tests'] += result.testsRun
-            self.results['failed_tests'] += len(result.failures)
-            self.results['error_tests'] += len(result.errors)
-            self.results['skipped_tests'] += len(result.skipped) if hasattr(result, 'skipped') else 0
-            self.results['passed_tests'] += (result.testsRun - len(result.failures) - len(result.errors) - 
-                                            (len(result.skipped) if hasattr(result, 'skipped') else 0))
-            
-            # Print summary for this module
-            print(f"\nModule: {module_name}")
-            print(f"  Tests run: {result.testsRun}")
-            print(f"  Passed: {result.testsRun - len(result.failures) - len(result.errors) - (len(result.skipped) if hasattr(result, 'skipped') else 0)}")
-            print(f"  Failed: {len(result.failures)}")
-            print(f"  Errors: {len(result.errors)}")
-            print(f"  Skipped: {len(result.skipped) if hasattr(result, 'skipped') else 0}")
-            print(f"  Success: {result.wasSuccessful()}")
-            
-            return result.wasSuccessful()
-            
-        except ImportError as e:
-            print(f"Could not import test module {module_name}: {e}")
-            self.results['test_modules'].append({
-                'module': module_name,
-                'import_error': str(e),
-                'tests_run': 0,
-                'success': False
-            })
-            return False
+            skipped = testcase.find('skipped')
+            if skipped is not None:
+                module_result['skipped'] += 1
+                module_result['skipped_details'].append({
+                    'test': test_name,
+                    'reason': skipped.get('message', '')
+                })
         
-        except Exception as e:
-            print(f"Error running tests from {module_name}: {e}")
-            self.results['test_modules'].append({
-                'module': module_name,
-                'execution_error': str(e),
-                'tests_run': 0,
-                'success': False
-            })
-            return False
+        all_successful = True
+        for module_name in module_names:
+            if not self._record_module_results(module_name, module_results[module_name]):
+                all_successful = False
+        
+        return all_successful
+    
+    def _failure_log(self):
+        """Return the failure analysis file, creating it with its header on first use."""
+        if self._failure_fp is None:
+            self._failure_fp = open(self.failure_report_path, 'wb')
+            self._failure_fp.write((
+                "PRICE MONITOR - FAILURE ANALYSIS REPORT\n" +
+                "=" * 45 + "\n\n" +
+                f"Generated: {self._now_str}\n\n" +
+                "DETAILED FAILURE ANALYSIS:\n" +
+                "-" * 28 + "\n\n"
+            ).encode('utf-8'))
+        return self._failure_fp
+    
+    def _spill_tracebacks(self, module_result):
+        """
+        Write a module's tracebacks to the failure analysis file.
+        
+        Each traceback is replaced in the results by its byte ``offset`` and
+        ``len`` within failure_analysis.txt, so tracebacks are not held in
+        memory or duplicated in the JSON report.
+        """
+        sections = [
+            (title, rule, module_result.get(key))
+            for title, rule, key in (
+                ('FAILURES:', '-' * 10, 'failure_details'),
+                ('ERRORS:', '-' * 8, 'error_details'),
+            )
+            if module_result.get(key)
+        ]
+        if not sections:
+            return
+        
+        f = self._failure_log()
+        f.write((f"Module: {module_result['module']}\n" +
+                 "=" * (len(module_result['module']) + 8) + "\n\n").encode('utf-8'))
+        for title, rule, details in sections:
+            f.write(f"{title}\n{rule}\n".encode('utf-8'))
+            for detail in details:
+                f.write(f"Test: {detail['test']}\nTraceback:\n".encode('utf-8'))
+                traceback = detail.pop('traceback').encode('utf-8')
+                detail['offset'] = f.tell()
+                detail['len'] = len(traceback)
+                f.write(traceback)
+                f.write(("\n" + "-" * 40 + "\n").encode('utf-8'))
+        f.write(b"\n")
+        f.flush()
     
     def validate_requirements(self):
         """Validate that all user requirements are covered by tests."""
@@ -411,10 +924,12 @@ class ComprehensiveIntegrationTestRunner:
         
         # Run tests from each module
         all_successful = True
-        for module_name in self.test_modules:
-            success = self.run_test_module(module_name)
-            if not success:
-                all_successful = False
+        if self.use_pytest:
+            all_successful = self.run_modules_with_pytest(self.test_modules)
+        elif self.workers > 1:
+            all_successful = self.run_modules_in_parallel(self.test_modules)
+        else:
+            all_successful = self.run_modules_in_single_suite(self.test_modules)
         
         # Validate requirements coverage
         self.validate_requirements()
@@ -435,8 +950,7 @@ class ComprehensiveIntegrationTestRunner:
         
         # Generate detailed JSON report
         json_report_path = os.path.join(self.output_dir, 'comprehensive_test_report.json')
-        with open(json_report_path, 'w') as f:
-            json.dump(self.results, f, indent=2, default=str)
+        self._write_json_report(json_report_path)
         
         # Generate human-readable summary
         summary_path = os.path.join(self.output_dir, 'test_summary.txt')
@@ -448,8 +962,8 @@ class ComprehensiveIntegrationTestRunner:
         
         # Generate failure analysis if there are failures
         if self.results['failed_tests'] > 0 or self.results['error_tests'] > 0:
-            failure_path = os.path.join(self.output_dir, 'failure_analysis.txt')
-            self._generate_failure_report(failure_path)
+            failure_path = self.failure_report_path
+            self._generate_failure_report()
         
         print(f"Reports generated:")
         print(f"  - Detailed report: {json_report_path}")
@@ -461,154 +975,159 @@ class ComprehensiveIntegrationTestRunner:
         
         return json_report_path, summary_path
     
-    def _generate_summary_report(self, output_path):
-        """Generate human-readable summary report."""
+    def _write_json_report(self, output_path):
+        """
+        Write the results as JSON, serializing one test module at a time.
+        
+        Module entries carry captured output and tracebacks, so they are
+        encoded and written individually instead of building the whole
+        document in memory first.
+        """
         with open(output_path, 'w') as f:
-            f.write("PRICE MONITOR - COMPREHENSIVE INTEGRATION TEST REPORT\n")
-            f.write("=" * 60 + "\n\n")
-            
-            f.write(f"Test Run Date: {self.results['start_time']}\n")
-            f.write(f"Duration: {self.results['duration']:.2f} seconds\n")
-            f.write(f"Output Directory: {self.output_dir}\n\n")
-            
-            # Environment Information
-            f.write("ENVIRONMENT INFORMATION:\n")
-            f.write("-" * 30 + "\n")
-            env_info = self.results['environment_info']
-            f.write(f"Python Version: {env_info.get('python_version', 'Unknown')}\n")
-            f.write(f"Operating System: {env_info.get('os', 'Unknown')} {env_info.get('os_version', '')}\n")
-            f.write(f"Architecture: {env_info.get('architecture', 'Unknown')}\n")
-            f.write(f"Docker Available: {env_info.get('docker_available', False)}\n")
-            if env_info.get('docker_available'):
-                f.write(f"Docker Version: {env_info.get('docker_version', 'Unknown')}\n")
-            f.write(f"Docker Compose Available: {env_info.get('docker_compose_available', False)}\n")
-            f.write(f"Selenium Available: {env_info.get('selenium_available', False)}\n")
-            f.write(f"All Required Files Present: {env_info.get('all_files_present', False)}\n")
-            if env_info.get('missing_files'):
-                f.write(f"Missing Files: {', '.join(env_info['missing_files'])}\n")
-            f.write("\n")
-            
-            # Test Summary
-            f.write("TEST SUMMARY:\n")
-            f.write("-" * 15 + "\n")
-            f.write(f"Total Tests: {self.results['total_tests']}\n")
-            f.write(f"Passed: {self.results['passed_tests']}\n")
-            f.write(f"Failed: {self.results['failed_tests']}\n")
-            f.write(f"Errors: {self.results['error_tests']}\n")
-            f.write(f"Skipped: {self.results['skipped_tests']}\n")
-            
-            success_rate = (self.results['passed_tests'] / self.results['total_tests'] * 100) if self.results['total_tests'] > 0 else 0
-            f.write(f"Success Rate: {success_rate:.1f}%\n\n")
-            
-            # Overall Result
-            overall_success = (self.results['failed_tests'] == 0 and self.results['error_tests'] == 0)
-            f.write(f"OVERALL RESULT: {'PASS' if overall_success else 'FAIL'}\n\n")
-            
-            # Module Results
-            f.write("MODULE RESULTS:\n")
-            f.write("-" * 16 + "\n")
-            for module_result in self.results['test_modules']:
-                f.write(f"\n{module_result['module']}:\n")
-                if 'import_error' in module_result:
-                    f.write(f"  Import Error: {module_result['import_error']}\n")
-                elif 'execution_error' in module_result:
-                    f.write(f"  Execution Error: {module_result['execution_error']}\n")
+            f.write('{')
+            for index, (key, value) in enumerate(self.results.items()):
+                f.write(',\n  ' if index else '\n  ')
+                f.write(json.dumps(key) + ': ')
+                if key == 'test_modules':
+                    f.write('[')
+                    for module_index, module_result in enumerate(value):
+                        f.write(',\n    ' if module_index else '\n    ')
+                        f.write(json.dumps(module_result, indent=2, default=str).replace('\n', '\n    '))
+                    f.write('\n  ]' if value else ']')
                 else:
-                    f.write(f"  Tests Run: {module_result['tests_run']}\n")
-                    f.write(f"  Failures: {module_result['failures']}\n")
-                    f.write(f"  Errors: {module_result['errors']}\n")
-                    f.write(f"  Skipped: {module_result['skipped']}\n")
-                    f.write(f"  Success: {'✓' if module_result['success'] else '✗'}\n")
-            
-            # Deployment Test Results
-            if 'deployment_test' in self.results:
-                f.write(f"\nDEPLOYMENT TEST:\n")
-                f.write("-" * 17 + "\n")
-                deploy_result = self.results['deployment_test']
-                f.write(f"Script Executed: {deploy_result.get('script_executed', False)}\n")
-                f.write(f"Success: {'✓' if deploy_result.get('success', False) else '✗'}\n")
-                if 'exit_code' in deploy_result:
-                    f.write(f"Exit Code: {deploy_result['exit_code']}\n")
+                    f.write(json.dumps(value, indent=2, default=str).replace('\n', '\n  '))
+            f.write('\n}\n')
+    
+    def _generate_summary_report(self, output_path):
+        """Generate human-readable summary report."""
+        parts = []
+        parts.append("PRICE MONITOR - COMPREHENSIVE INTEGRATION TEST REPORT\n")
+        parts.append("=" * 60 + "\n\n")
+        
+        parts.append(f"Test Run Date: {self.results['start_time']}\n")
+        parts.append(f"Duration: {self.results['duration']:.2f} seconds\n")
+        parts.append(f"Output Directory: {self.output_dir}\n\n")
+        
+        # Environment Information
+        parts.append("ENVIRONMENT INFORMATION:\n")
+        parts.append("-" * 30 + "\n")
+        env_info = self.results['environment_info']
+        parts.append(f"Python Version: {env_info.get('python_version', 'Unknown')}\n")
+        parts.append(f"Operating System: {env_info.get('os', 'Unknown')} {env_info.get('os_version', '')}\n")
+        parts.append(f"Architecture: {env_info.get('architecture', 'Unknown')}\n")
+        parts.append(f"Docker Available: {env_info.get('docker_available', False)}\n")
+        if env_info.get('docker_available'):
+            parts.append(f"Docker Version: {env_info.get('docker_version', 'Unknown')}\n")
+        parts.append(f"Docker Compose Available: {env_info.get('docker_compose_available', False)}\n")
+        parts.append(f"Selenium Available: {env_info.get('selenium_available', False)}\n")
+        parts.append(f"All Required Files Present: {env_info.get('all_files_present', False)}\n")
+        if env_info.get('missing_files'):
+            parts.append(f"Missing Files: {', '.join(env_info['missing_files'])}\n")
+        parts.append("\n")
+        
+        # Test Summary
+        parts.append("TEST SUMMARY:\n")
+        parts.append("-" * 15 + "\n")
+        parts.append(f"Total Tests: {self.results['total_tests']}\n")
+        parts.append(f"Passed: {self.results['passed_tests']}\n")
+        parts.append(f"Failed: {self.results['failed_tests']}\n")
+        parts.append(f"Errors: {self.results['error_tests']}\n")
+        parts.append(f"Skipped: {self.results['skipped_tests']}\n")
+        
+        success_rate = (self.results['passed_tests'] / self.results['total_tests'] * 100) if self.results['total_tests'] > 0 else 0
+        parts.append(f"Success Rate: {success_rate:.1f}%\n\n")
+        
+        # Overall Result
+        overall_success = (self.results['failed_tests'] == 0 and self.results['error_tests'] == 0)
+        parts.append(f"OVERALL RESULT: {'PASS' if overall_success else 'FAIL'}\n\n")
+        
+        # Module Results
+        parts.append("MODULE RESULTS:\n")
+        parts.append("-" * 16 + "\n")
+        for module_result in self.results['test_modules']:
+            parts.append(f"\n{module_result['module']}:\n")
+            if 'import_error' in module_result:
+                parts.append(f"  Import Error: {module_result['import_error']}\n")
+            elif 'execution_error' in module_result:
+                parts.append(f"  Execution Error: {module_result['execution_error']}\n")
+            else:
+                parts.append(f"  Tests Run: {module_result['tests_run']}\n")
+                parts.append(f"  Failures: {module_result['failures']}\n")
+                parts.append(f"  Errors: {module_result['errors']}\n")
+                parts.append(f"  Skipped: {module_result['skipped']}\n")
+                parts.append(f"  Success: {'✓' if module_result['success'] else '✗'}\n")
+        
+        # Deployment Test Results
+        if 'deployment_test' in self.results:
+            parts.append(f"\nDEPLOYMENT TEST:\n")
+            parts.append("-" * 17 + "\n")
+            deploy_result = self.results['deployment_test']
+            parts.append(f"Script Executed: {deploy_result.get('script_executed', False)}\n")
+            parts.append(f"Success: {'✓' if deploy_result.get('success', False) else '✗'}\n")
+            if 'exit_code' in deploy_result:
+                parts.append(f"Exit Code: {deploy_result['exit_code']}\n")
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
     
     def _generate_requirements_report(self, output_path):
         """Generate requirements validation report."""
-        with open(output_path, 'w') as f:
-            f.write("# Price Monitor - Requirements Validation Report\n\n")
-            f.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            
-            f.write("## Overview\n\n")
-            f.write("This report validates that all 9 user requirements for the Price Monitor application ")
-            f.write("have been comprehensively tested through integration tests.\n\n")
-            
-            f.write("## Requirements Validation\n\n")
-            
-            requirements = self.results.get('requirements_validation', {})
-            
-            for req_id, req_info in requirements.items():
-                status = "✅ VALIDATED" if req_info.get('validated', False) else "❌ NOT VALIDATED"
-                f.write(f"### {req_id}\n\n")
-                f.write(f"**Status:** {status}\n\n")
-                f.write(f"**Description:** {req_info.get('description', 'N/A')}\n\n")
-                f.write("**Test Coverage:**\n")
-                for test_module in req_info.get('test_modules', []):
-                    f.write(f"- {test_module}\n")
-                f.write("\n")
-            
-            # Summary
-            validated_count = sum(1 for req in requirements.values() if req.get('validated', False))
-            total_count = len(requirements)
-            
-            f.write("## Summary\n\n")
-            f.write(f"**Total Requirements:** {total_count}\n")
-            f.write(f"**Validated Requirements:** {validated_count}\n")
-            f.write(f"**Validation Rate:** {(validated_count/total_count*100):.1f}%\n\n")
-            
-            if validated_count == total_count:
-                f.write("🎉 **All user requirements have been successfully validated through comprehensive integration testing!**\n")
-            else:
-                f.write("⚠️ **Some requirements may need additional test coverage.**\n")
+        parts = []
+        parts.append("# Price Monitor - Requirements Validation Report\n\n")
+        parts.append(f"**Generated:** {self._now_str}\n\n")
+        
+        parts.append("## Overview\n\n")
+        parts.append("This report validates that all 9 user requirements for the Price Monitor application ")
+        parts.append("have been comprehensively tested through integration tests.\n\n")
+        
+        parts.append("## Requirements Validation\n\n")
+        
+        requirements = self.results.get('requirements_validation', {})
+        
+        for req_id, req_info in requirements.items():
+            status = "✅ VALIDATED" if req_info.get('validated', False) else "❌ NOT VALIDATED"
+            parts.append(f"### {req_id}\n\n")
+            parts.append(f"**Status:** {status}\n\n")
+            parts.append(f"**Description:** {req_info.get('description', 'N/A')}\n\n")
+            parts.append("**Test Coverage:**\n")
+            for test_module in req_info.get('test_modules', []):
+                parts.append(f"- {test_module}\n")
+            parts.append("\n")
+        
+        # Summary
+        validated_count = sum(1 for req in requirements.values() if req.get('validated', False))
+        total_count = len(requirements)
+        
+        parts.append("## Summary\n\n")
+        parts.append(f"**Total Requirements:** {total_count}\n")
+        parts.append(f"**Validated Requirements:** {validated_count}\n")
+        parts.append(f"**Validation Rate:** {(validated_count/total_count*100):.1f}%\n\n")
+        
+        if validated_count == total_count:
+            parts.append("🎉 **All user requirements have been successfully validated through comprehensive integration testing!**\n")
+        else:
+            parts.append("⚠️ **Some requirements may need additional test coverage.**\n")
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
     
-    def _generate_failure_report(self, output_path):
-        """Generate detailed failure analysis report."""
-        with open(output_path, 'w') as f:
-            f.write("PRICE MONITOR - FAILURE ANALYSIS REPORT\n")
-            f.write("=" * 45 + "\n\n")
-            
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            
-            f.write("FAILURE SUMMARY:\n")
-            f.write("-" * 17 + "\n")
-            f.write(f"Failed Tests: {self.results['failed_tests']}\n")
-            f.write(f"Error Tests: {self.results['error_tests']}\n")
-            f.write(f"Total Issues: {self.results['failed_tests'] + self.results['error_tests']}\n\n")
-            
-            f.write("DETAILED FAILURE ANALYSIS:\n")
-            f.write("-" * 28 + "\n\n")
-            
-            for module_result in self.results['test_modules']:
-                if module_result.get('failures', 0) > 0 or module_result.get('errors', 0) > 0:
-                    f.write(f"Module: {module_result['module']}\n")
-                    f.write("=" * (len(module_result['module']) + 8) + "\n\n")
-                    
-                    # Failures
-                    if module_result.get('failure_details'):
-                        f.write("FAILURES:\n")
-                        f.write("-" * 10 + "\n")
-                        for failure in module_result['failure_details']:
-                            f.write(f"Test: {failure['test']}\n")
-                            f.write(f"Traceback:\n{failure['traceback']}\n")
-                            f.write("-" * 40 + "\n")
-                    
-                    # Errors
-                    if module_result.get('error_details'):
-                        f.write("ERRORS:\n")
-                        f.write("-" * 8 + "\n")
-                        for error in module_result['error_details']:
-                            f.write(f"Test: {error['test']}\n")
-                            f.write(f"Traceback:\n{error['traceback']}\n")
-                            f.write("-" * 40 + "\n")
-                    
-                    f.write("\n")
+    def _generate_failure_report(self):
+        """
+        Finish the failure analysis report.
+        
+        Tracebacks were already written by _spill_tracebacks while tests ran,
+        so only the summary is appended before the file is closed.
+        """
+        f = self._failure_log()
+        f.write((
+            "FAILURE SUMMARY:\n" +
+            "-" * 17 + "\n" +
+            f"Failed Tests: {self.results['failed_tests']}\n" +
+            f"Error Tests: {self.results['error_tests']}\n" +
+            f"Total Issues: {self.results['failed_tests'] + self.results['error_tests']}\n"
+        ).encode('utf-8'))
+        f.close()
+        self._failure_fp = None
     
     def print_summary(self):
         """Print test summary to console."""
@@ -657,6 +1176,8 @@ Examples:
   python3 run_comprehensive_integration_tests.py
   python3 run_comprehensive_integration_tests.py --output-dir my_reports
   python3 run_comprehensive_integration_tests.py --skip-docker --skip-selenium
+  python3 run_comprehensive_integration_tests.py --skip-docker --pytest
+  python3 run_comprehensive_integration_tests.py --workers 1
         """
     )
     
@@ -666,6 +1187,10 @@ Examples:
                        help='Skip Docker-related tests')
     parser.add_argument('--skip-selenium', action='store_true',
                        help='Skip Selenium browser tests')
+    parser.add_argument('--workers', '-j', type=int,
+                       help='Number of test modules to run in parallel (default: CPU count, 1 = serial)')
+    parser.add_argument('--pytest', action='store_true', dest='use_pytest',
+                       help='Run all modules in one pytest invocation (parallel if pytest-xdist is installed)')
     
     args = parser.parse_args()
     
@@ -673,7 +1198,9 @@ Examples:
     runner = ComprehensiveIntegrationTestRunner(
         output_dir=args.output_dir,
         skip_docker=args.skip_docker,
-        skip_selenium=args.skip_selenium
+        skip_selenium=args.skip_selenium,
+        use_pytest=args.use_pytest,
+        workers=args.workers
     )
     
     # Run tests
@@ -2,8 +2,11 @@
 Flask application with mTLS security for the price monitoring system.
 """
 from flask import Flask, request, jsonify, g
+from werkzeug.serving import ThreadedWSGIServer
+import json
 import logging
 import ssl
+import time
 from typing import Optional
 from datetime import datetime
 
@@ -16,6 +19,109 @@ from .services.web_scraping_service import WebScrapingService
 from .services.price_monitor_service import PriceMonitorService
 from .services.email_service import EmailService
 from .models.database import DatabaseManager
+from .routes import products_bp
+
+# Serialized /api/products pages are reused for this long. Mutations made
+# through the API clear the cache; scheduled price checks show up after at
+# most this delay.
+PRODUCTS_CACHE_TTL_SECONDS = 10
+
+# The cache is dropped wholesale once it holds this many distinct pages
+PRODUCTS_CACHE_MAX_ENTRIES = 256
+
+# Security headers added to every response, built once at import
+SECURITY_HEADERS = (
+    # HTTPS-only headers
+    ('Strict-Transport-Security', 'max-age=31536000; includeSubDomains'),
+    
+    # Content security policy
+    ('Content-Security-Policy', (
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-inline'; "
+        "style-src 'self' 'unsafe-inline' https://cdnjs.cloudflare.com; "
+        "img-src 'self' data: https: http:; "
+        "connect-src 'self'; "
+        "font-src 'self' https://cdnjs.cloudflare.com; "
+        "object-src 'none'; "
+        "media-src 'self'; "
+        "frame-src 'none';"
+    )),
+    
+    # Other security headers
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-Frame-Options', 'DENY'),
+    ('X-XSS-Protection', '1; mode=block'),
+    ('Referrer-Policy', 'strict-origin-when-cross-origin'),
+)
+
+# Response headers replaced by SECURITY_HEADERS, plus server information,
+# which is removed
+_REPLACED_HEADER_NAMES = frozenset(
+    [name.lower() for name, _ in SECURITY_HEADERS] + ['server']
+)
+
+
+class SecurityHeadersMiddleware:
+    """
+    WSGI middleware adding SECURITY_HEADERS to every response.
+    
+    Working at the WSGI layer covers every response the application produces,
+    including error pages, without running a Flask after_request hook or
+    touching the response's Headers object.
+    """
+    
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        def start_secure_response(status, headers, exc_info=None):
+            headers = [
+                header for header in headers
+                if header[0].lower() not in _REPLACED_HEADER_NAMES
+            ]
+            headers.extend(SECURITY_HEADERS)
+            return start_response(status, headers, exc_info)
+        
+        return self.wsgi_app(environ, start_secure_response)
+
+
+def _error_body(error: str, message: str) -> bytes:
+    """Encode a JSON error response body."""
+    return json.dumps({'error': error, 'message': message}).encode('utf-8')
+
+
+# Bodies of the generic error responses, which never vary between requests
+NOT_FOUND_BODY = _error_body('Not found', 'The requested endpoint does not exist')
+METHOD_NOT_ALLOWED_BODY = _error_body(
+    'Method not allowed', 'The requested method is not allowed for this endpoint'
+)
+INTERNAL_ERROR_BODY = _error_body('Internal server error', 'An unexpected error occurred')
+
+
+class MTLSWSGIServer(ThreadedWSGIServer):
+    """
+    Threaded WSGI server that performs the TLS handshake in the request thread.
+    
+    The stock server wraps the listening socket, so every mTLS handshake runs
+    inside accept() on the serving thread and a slow or stalled client holds
+    up all other connections. Here connections are accepted as plain TCP and
+    wrapped without handshaking; OpenSSL completes the handshake on the first
+    read, in the thread handling that connection.
+    """
+    
+    def __init__(self, host: str, port: int, app, ssl_context: ssl.SSLContext):
+        super().__init__(host, port, app)
+        self.ssl_context = ssl_context
+    
+    def get_request(self):
+        """Accept a connection and wrap it for a deferred server-side handshake."""
+        connection, address = self.socket.accept()
+        connection = self.ssl_context.wrap_socket(
+            connection,
+            server_side=True,
+            do_handshake_on_connect=False
+        )
+        return connection, address
 
 
 class SecureFlaskApp:
@@ -30,6 +136,12 @@ class SecureFlaskApp:
         self.logging_service = logging_service
         self.logger = logging.getLogger(__name__)
         
+        # Serialized product list pages keyed by client and query parameters
+        self._products_cache = {}
+        
+        # mTLS context, built on first use by create_ssl_context()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        
         # Initialize database and services
         # Convert file path to SQLAlchemy URL if needed
         database_url = self.config.database_path
@@ -44,9 +156,9 @@ class SecureFlaskApp:
             max_retries=self.config.max_retry_attempts
         )
         self.parser_service = ParserService(
-            ai_api_key=getattr(self.config, 'ai_api_key', None),
-            ai_api_endpoint=getattr(self.config, 'ai_api_endpoint', None),
-            enable_ai_parsing=getattr(self.config, 'enable_ai_parsing', False)
+            ai_api_key=self.config.ai_api_key,
+            ai_api_endpoint=self.config.ai_api_endpoint,
+            enable_ai_parsing=self.config.enable_ai_parsing
         )
         self.email_service = EmailService(self.config)
         self.price_monitor_service = PriceMonitorService(
@@ -64,10 +176,33 @@ class SecureFlaskApp:
         setup_mtls_authentication(self.app, self.security_service, self.config)
         
         # Set up routes
+        self._setup_request_context()
         self._setup_routes()
         self._setup_error_handlers()
         self._setup_security_headers()
     
+    def _setup_request_context(self):
+        """Set up per-request values shared by the route handlers."""
+        
+        @self.app.before_request
+        def set_request_time():
+            """Record the request time once for every timestamp in the response."""
+            g.request_time_iso = datetime.now().isoformat()
+        
+        if self.config.enable_server_timing:
+            @self.app.before_request
+            def start_server_timing():
+                g.request_start_ns = time.perf_counter_ns()
+            
+            @self.app.after_request
+            def add_server_timing(response):
+                """Report the time spent handling the request, visible in browser devtools."""
+                start_ns = g.get('request_start_ns')
+                if start_ns is not None:
+                    duration_ms = (time.perf_counter_ns() - start_ns) / 1e6
+                    response.headers['Server-Timing'] = f"app;dur={duration_ms:.2f}"
+                return response
+    
     def _setup_routes(self):
         """Set up API routes."""
         
@@ -84,7 +219,7 @@ class SecureFlaskApp:
                 'service': 'price-monitor',
                 'mtls_enabled': self.config.enable_mtls,
                 'client_id': getattr(g, 'client_id', 'anonymous'),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': g.request_time_iso
             }
             
             # Add logging service health if available
@@ -107,7 +242,8 @@ class SecureFlaskApp:
                 
                 return jsonify({
                     'metrics': metrics,
-                    'timestamp': datetime.now().isoformat()
+                    'tls_sessions': self.security_service.get_tls_session_stats(),
+                    'timestamp': g.request_time_iso
                 })
             except Exception as e:
                 self.logger.error(f"Error retrieving performance metrics: {str(e)}")
@@ -127,590 +263,83 @@ class SecureFlaskApp:
                 return jsonify({
                     'error_summary': error_summary,
                     'since_hours': since_hours,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': g.request_time_iso
                 })
             except Exception as e:
                 self.logger.error(f"Error retrieving error summary: {str(e)}")
                 return jsonify({'error': 'Failed to retrieve error summary'}), 500
         
-        @self.app.route('/api/products', methods=['GET'])
-        @require_authentication
-        def get_products():
-            """Get all monitored products with filtering and sorting."""
-            try:
-                # Get query parameters for filtering
-                active_only = request.args.get('active_only', 'true').lower() == 'true'
-                sort_by = request.args.get('sort_by', 'created_at')  # name, current_price, lowest_price, created_at, last_checked
-                sort_order = request.args.get('sort_order', 'desc').lower()  # asc, desc
-                search = request.args.get('search', '').strip()
-                limit = request.args.get('limit', type=int)
-                offset = request.args.get('offset', 0, type=int)
-                
-                # Validate sort parameters
-                valid_sort_fields = ['name', 'current_price', 'previous_price', 'lowest_price', 'created_at', 'last_checked']
-                if sort_by not in valid_sort_fields:
-                    return jsonify({
-                        'error': 'Invalid sort field',
-                        'message': f'sort_by must be one of: {", ".join(valid_sort_fields)}'
-                    }), 400
-                
-                if sort_order not in ['asc', 'desc']:
-                    return jsonify({
-                        'error': 'Invalid sort order',
-                        'message': 'sort_order must be "asc" or "desc"'
-                    }), 400
-                
-                if limit is not None and limit <= 0:
-                    return jsonify({
-                        'error': 'Invalid limit',
-                        'message': 'limit must be a positive number'
-                    }), 400
-                
-                if offset < 0:
-                    return jsonify({
-                        'error': 'Invalid offset',
-                        'message': 'offset must be non-negative'
-                    }), 400
-                
-                # Get products from service
-                products = self.product_service.get_all_products(active_only=active_only)
-                
-                # Apply search filter
-                if search:
-                    search_lower = search.lower()
-                    products = [p for p in products if 
-                              search_lower in p.name.lower() or 
-                              search_lower in p.url.lower()]
-                
-                # Apply sorting
-                reverse = sort_order == 'desc'
-                if sort_by == 'name':
-                    products.sort(key=lambda p: p.name.lower(), reverse=reverse)
-                elif sort_by == 'current_price':
-                    products.sort(key=lambda p: p.current_price, reverse=reverse)
-                elif sort_by == 'previous_price':
-                    products.sort(key=lambda p: p.previous_price or 0, reverse=reverse)
-                elif sort_by == 'lowest_price':
-                    products.sort(key=lambda p: p.lowest_price, reverse=reverse)
-                elif sort_by == 'created_at':
-                    products.sort(key=lambda p: p.created_at or datetime.min, reverse=reverse)
-                elif sort_by == 'last_checked':
-                    products.sort(key=lambda p: p.last_checked or datetime.min, reverse=reverse)
-                
-                # Get total count before pagination
-                total_count = len(products)
-                
-                # Apply pagination
-                if limit is not None:
-                    end_index = offset + limit
-                    products = products[offset:end_index]
-                elif offset > 0:
-                    products = products[offset:]
-                
-                # Convert products to JSON-serializable format
-                products_data = []
-                for product in products:
-                    # Calculate price change information
-                    price_change = None
-                    if product.previous_price and product.previous_price != product.current_price:
-                        change_amount = product.current_price - product.previous_price
-                        change_percentage = (change_amount / product.previous_price) * 100
-                        price_change = {
-                            'amount': change_amount,
-                            'percentage': change_percentage,
-                            'direction': 'drop' if change_amount < 0 else 'rise'
-                        }
-                    
-                    product_data = {
-                        'id': product.id,
-                        'url': product.url,
-                        'name': product.name,
-                        'current_price': product.current_price,
-                        'previous_price': product.previous_price,
-                        'lowest_price': product.lowest_price,
-                        'image_url': product.image_url,
-                        'created_at': product.created_at.isoformat() if product.created_at else None,
-                        'last_checked': product.last_checked.isoformat() if product.last_checked else None,
-                        'is_active': product.is_active,
-                        'price_change': price_change
-                    }
-                    products_data.append(product_data)
-                
-                return jsonify({
-                    'products': products_data,
-                    'count': len(products_data),
-                    'total_count': total_count,
-                    'offset': offset,
-                    'limit': limit,
-                    'filters': {
-                        'active_only': active_only,
-                        'search': search,
-                        'sort_by': sort_by,
-                        'sort_order': sort_order
-                    },
-                    'client_id': g.client_id
-                })
-                
-            except Exception as e:
-                self.logger.error(f"Error getting products: {str(e)}")
-                return jsonify({
-                    'error': 'Internal server error',
-                    'message': 'Failed to retrieve products'
-                }), 500
-        
-        @self.app.route('/api/products', methods=['POST'])
-        @require_authentication
-        def add_product():
-            """Add a new product to monitor."""
-            try:
-                data = request.get_json()
-                
-                if not data or 'url' not in data:
-                    return jsonify({
-                        'error': 'Invalid request',
-                        'message': 'URL is required'
-                    }), 400
-                
-                url = data['url'].strip()
-                if not url:
-                    return jsonify({
-                        'error': 'Invalid request',
-                        'message': 'URL cannot be empty'
-                    }), 400
-                
-                # Check if product already exists
-                existing_product = self.product_service.get_product_by_url(url)
-                if existing_product:
-                    return jsonify({
-                        'error': 'Product already exists',
-                        'message': f'Product with URL {url} is already being monitored',
-                        'product_id': existing_product.id
-                    }), 409
-                
-                # Fetch and parse product information
-                self.logger.info(f"Adding new product: {url}")
-                
-                # Fetch page content
-                scraping_result = self.web_scraping_service.fetch_page_content(url)
-                if not scraping_result.success:
-                    return jsonify({
-                        'error': 'Failed to fetch product page',
-                        'message': scraping_result.error_message
-                    }), 400
-                
-                # Parse product information
-                parsing_result = self.parser_service.parse_product(url, scraping_result.page_content)
-                if not parsing_result.success:
-                    return jsonify({
-                        'error': 'Failed to parse product information',
-                        'message': parsing_result.error_message
-                    }), 400
-                
-                product_info = parsing_result.product_info
-                if not product_info or product_info.price is None:
-                    return jsonify({
-                        'error': 'Invalid product information',
-                        'message': 'Could not extract price information from the page'
-                    }), 400
-                
-                # Add product to database
-                product = self.product_service.add_product(
-                    url=url,
-                    name=product_info.name or 'Unknown Product',
-                    price=product_info.price,
-                    image_url=product_info.image_url
-                )
-                
-                if not product:
-                    return jsonify({
-                        'error': 'Failed to add product',
-                        'message': 'Could not save product to database'
-                    }), 500
-                
-                # Return product data
-                product_data = {
-                    'id': product.id,
-                    'url': product.url,
-                    'name': product.name,
-                    'current_price': product.current_price,
-                    'previous_price': product.previous_price,
-                    'lowest_price': product.lowest_price,
-                    'image_url': product.image_url,
-                    'created_at': product.created_at.isoformat() if product.created_at else None,
-                    'last_checked': product.last_checked.isoformat() if product.last_checked else None,
-                    'is_active': product.is_active
-                }
-                
-                self.logger.info(f"Successfully added product: {product.name} (ID: {product.id})")
-                
-                return jsonify({
-                    'message': 'Product added successfully',
-                    'product': product_data,
-                    'client_id': g.client_id
-                }), 201
-                
-            except Exception as e:
-                self.logger.error(f"Error adding product: {str(e)}")
-                return jsonify({
-                    'error': 'Internal server error',
-                    'message': 'Failed to add product'
-                }), 500
-        
-        @self.app.route('/api/products/<int:product_id>', methods=['DELETE'])
-        @require_authentication
-        def delete_product(product_id):
-            """Delete a monitored product."""
-            try:
-                self.logger.info(f"DELETE request for product {product_id}, args: {request.args}")
-                
-                # Check for confirmation parameter
-                confirm = request.args.get('confirm', 'false').lower() == 'true'
-                self.logger.info(f"Confirmation parameter: {confirm}")
-                
-                # Check if product exists
-                product = self.product_service.get_product(product_id)
-                if not product:
-                    self.logger.warning(f"Product {product_id} not found")
-                    return jsonify({
-                        'error': 'Product not found',
-                        'message': f'Product with ID {product_id} does not exist'
-                    }), 404
-                
-                # If no confirmation, return product info for confirmation dialog
-                if not confirm:
-                    self.logger.info(f"No confirmation, returning product info for {product_id}")
-                    return jsonify({
-                        'requires_confirmation': True,
-                        'product': {
-                            'id': product.id,
-                            'name': product.name,
-                            'url': product.url,
-                            'current_price': product.current_price
-                        },
-                        'message': 'Deletion requires confirmation. Add ?confirm=true to proceed.',
-                        'client_id': g.client_id
-                    }), 200
-                
-                # Delete the product
-                self.logger.info(f"Attempting to delete product {product_id}: {product.name}")
-                success = self.product_service.delete_product(product_id)
-                
-                if not success:
-                    self.logger.error(f"Failed to delete product {product_id} from database")
-                    return jsonify({
-                        'error': 'Failed to delete product',
-                        'message': 'Could not delete product from database'
-                    }), 500
-                
-                self.logger.info(f"Successfully deleted product: {product.name} (ID: {product_id})")
-                
-                return jsonify({
-                    'message': 'Product deleted successfully',
-                    'product_id': product_id,
-                    'product_name': product.name,
-                    'client_id': g.client_id
-                })
-                
-            except Exception as e:
-                self.logger.error(f"Error deleting product {product_id}: {str(e)}", exc_info=True)
-                return jsonify({
-                    'error': 'Internal server error',
-                    'message': f'Failed to delete product: {str(e)}'
-                }), 500
-        
-        @self.app.route('/api/products/<int:product_id>/price', methods=['PUT'])
-        @require_authentication
-        def update_product_price(product_id):
-            """Manually update a product's price."""
-            try:
-                data = request.get_json()
-                
-                if not data or 'price' not in data:
-                    return jsonify({
-                        'error': 'Invalid request',
-                        'message': 'Price is required'
-                    }), 400
-                
-                try:
-                    price = float(data['price'])
-                    if price < 0:
-                        raise ValueError("Price cannot be negative")
-                except (ValueError, TypeError):
-                    return jsonify({
-                        'error': 'Invalid price',
-                        'message': 'Price must be a positive number'
-                    }), 400
-                
-                # Check if product exists
-                product = self.product_service.get_product(product_id)
-                if not product:
-                    return jsonify({
-                        'error': 'Product not found',
-                        'message': f'Product with ID {product_id} does not exist'
-                    }), 404
-                
-                if not product.is_active:
-                    return jsonify({
-                        'error': 'Product not active',
-                        'message': 'Cannot update price for inactive product'
-                    }), 400
-                
-                # Use the price monitor service for manual updates (includes email notifications)
-                result = self.price_monitor_service.update_product_price_manually(product_id, price)
-                
-                if not result.success:
-                    return jsonify({
-                        'error': 'Failed to update price',
-                        'message': result.error_message
-                    }), 500
-                
-                # Get updated product data
-                updated_product = self.product_service.get_product(product_id)
-                product_data = {
-                    'id': updated_product.id,
-                    'url': updated_product.url,
-                    'name': updated_product.name,
-                    'current_price': updated_product.current_price,
-                    'previous_price': updated_product.previous_price,
-                    'lowest_price': updated_product.lowest_price,
-                    'image_url': updated_product.image_url,
-                    'created_at': updated_product.created_at.isoformat() if updated_product.created_at else None,
-                    'last_checked': updated_product.last_checked.isoformat() if updated_product.last_checked else None,
-                    'is_active': updated_product.is_active
-                }
-                
-                response_data = {
-                    'message': 'Price updated successfully',
-                    'product': product_data,
-                    'price_change': {
-                        'old_price': result.old_price,
-                        'new_price': result.new_price,
-                        'price_dropped': result.price_dropped,
-                        'is_new_lowest': result.is_new_lowest
-                    },
-                    'notification': {
-                        'sent': result.notification_sent,
-                        'error': result.notification_error
-                    },
-                    'client_id': g.client_id
-                }
-                
-                self.logger.info(f"Successfully updated price for product {product_id}: ${result.old_price:.2f} -> ${result.new_price:.2f}")
-                
-                return jsonify(response_data)
-                
-            except Exception as e:
-                self.logger.error(f"Error updating price for product {product_id}: {str(e)}")
-                return jsonify({
-                    'error': 'Internal server error',
-                    'message': 'Failed to update product price'
-                }), 500
-        
-        @self.app.route('/api/products/<int:product_id>/history', methods=['GET'])
-        @require_authentication
-        def get_price_history(product_id):
-            """Get price history for a product."""
-            try:
-                # Check if product exists
-                product = self.product_service.get_product(product_id)
-                if not product:
-                    return jsonify({
-                        'error': 'Product not found',
-                        'message': f'Product with ID {product_id} does not exist'
-                    }), 404
-                
-                # Get query parameters
-                limit = request.args.get('limit', type=int)
-                if limit is not None and limit <= 0:
-                    return jsonify({
-                        'error': 'Invalid limit',
-                        'message': 'Limit must be a positive number'
-                    }), 400
-                
-                # Get price history
-                history = self.product_service.get_price_history(product_id, limit=limit)
-                
-                # Convert to JSON-serializable format
-                history_data = []
-                for entry in history:
-                    entry_data = {
-                        'id': entry.id,
-                        'price': entry.price,
-                        'recorded_at': entry.recorded_at.isoformat() if entry.recorded_at else None,
-                        'source': entry.source
-                    }
-                    history_data.append(entry_data)
-                
-                # Get product summary
-                product_data = {
-                    'id': product.id,
-                    'name': product.name,
-                    'url': product.url,
-                    'current_price': product.current_price,
-                    'previous_price': product.previous_price,
-                    'lowest_price': product.lowest_price,
-                    'created_at': product.created_at.isoformat() if product.created_at else None,
-                    'last_checked': product.last_checked.isoformat() if product.last_checked else None
-                }
-                
-                return jsonify({
-                    'product': product_data,
-                    'history': history_data,
-                    'count': len(history_data),
-                    'client_id': g.client_id
-                })
-                
-            except Exception as e:
-                self.logger.error(f"Error getting price history for product {product_id}: {str(e)}")
-                return jsonify({
-                    'error': 'Internal server error',
-                    'message': 'Failed to retrieve price history'
-                }), 500
-        
-        @self.app.route('/api/products/<int:product_id>', methods=['GET'])
-        @require_authentication
-        def get_product_details(product_id):
-            """Get detailed information for a specific product."""
-            try:
-                # Get product
-                product = self.product_service.get_product(product_id)
-                if not product:
-                    return jsonify({
-                        'error': 'Product not found',
-                        'message': f'Product with ID {product_id} does not exist'
-                    }), 404
-                
-                # Get recent price history (last 10 entries)
-                recent_history = self.product_service.get_price_history(product_id, limit=10)
-                
-                # Convert to JSON-serializable format
-                product_data = {
-                    'id': product.id,
-                    'url': product.url,
-                    'name': product.name,
-                    'current_price': product.current_price,
-                    'previous_price': product.previous_price,
-                    'lowest_price': product.lowest_price,
-                    'image_url': product.image_url,
-                    'created_at': product.created_at.isoformat() if product.created_at else None,
-                    'last_checked': product.last_checked.isoformat() if product.last_checked else None,
-                    'is_active': product.is_active
-                }
-                
-                history_data = []
-                for entry in recent_history:
-                    entry_data = {
-                        'id': entry.id,
-                        'price': entry.price,
-                        'recorded_at': entry.recorded_at.isoformat() if entry.recorded_at else None,
-                        'source': entry.source
-                    }
-                    history_data.append(entry_data)
-                
-                return jsonify({
-                    'product': product_data,
-                    'recent_history': history_data,
-                    'client_id': g.client_id
-                })
-                
-            except Exception as e:
-                self.logger.error(f"Error getting product details for {product_id}: {str(e)}")
-                return jsonify({
-                    'error': 'Internal server error',
-                    'message': 'Failed to retrieve product details'
-                }), 500
+        # Product and statistics API; its views find this instance through
+        # current_app.extensions
+        self.app.extensions['price_monitor'] = self
+        self.app.register_blueprint(products_bp, url_prefix='/api')
+    
+    def get_product_cached(self, product_id: int, refresh: bool = False):
+        """
+        Get a product, reusing the lookup already made during this request.
         
-        @self.app.route('/api/stats', methods=['GET'])
-        @require_authentication
-        def get_statistics():
-            """Get system statistics."""
-            try:
-                # Get product statistics
-                product_stats = self.product_service.get_product_statistics()
-                
-                # Get monitoring statistics
-                monitoring_stats = self.price_monitor_service.get_monitoring_stats()
-                
-                # Get next scheduled run
-                next_run = self.price_monitor_service.get_next_scheduled_run()
-                
-                return jsonify({
-                    'products': product_stats,
-                    'monitoring': monitoring_stats,
-                    'next_scheduled_run': next_run.isoformat() if next_run else None,
-                    'client_id': g.client_id
-                })
-                
-            except Exception as e:
-                self.logger.error(f"Error getting statistics: {str(e)}")
-                return jsonify({
-                    'error': 'Internal server error',
-                    'message': 'Failed to retrieve statistics'
-                }), 500
+        Args:
+            product_id: ID of the product
+            refresh: Reload the product, e.g. after the handler changed it
+            
+        Returns:
+            Product object or None if not found
+        """
+        cache = g.setdefault('product_cache', {})
+        if refresh or product_id not in cache:
+            cache[product_id] = self.product_service.get_product(product_id)
+        return cache[product_id]
     
-
+    def get_cached_products_page(self, key: tuple) -> Optional[str]:
+        """Return a cached /api/products body, or None if missing or expired."""
+        entry = self._products_cache.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+    
+    def cache_products_page(self, key: tuple, body: str):
+        """Cache a /api/products body for PRODUCTS_CACHE_TTL_SECONDS."""
+        if len(self._products_cache) >= PRODUCTS_CACHE_MAX_ENTRIES:
+            self._products_cache.clear()
+        self._products_cache[key] = (time.monotonic() + PRODUCTS_CACHE_TTL_SECONDS, body)
+    
+    def invalidate_products_cache(self):
+        """Drop all cached /api/products pages after a product changes."""
+        self._products_cache.clear()
     
     def _setup_error_handlers(self):
         """Set up error handlers."""
         
+        def json_error(body: bytes, status: int):
+            return self.app.response_class(body, status=status, mimetype='application/json')
+        
         @self.app.errorhandler(404)
         def not_found(error):
-            return jsonify({
-                'error': 'Not found',
-                'message': 'The requested endpoint does not exist'
-            }), 404
+            return json_error(NOT_FOUND_BODY, 404)
         
         @self.app.errorhandler(405)
         def method_not_allowed(error):
-            return jsonify({
-                'error': 'Method not allowed',
-                'message': 'The requested method is not allowed for this endpoint'
-            }), 405
+            return json_error(METHOD_NOT_ALLOWED_BODY, 405)
         
         @self.app.errorhandler(500)
         def internal_error(error):
             self.logger.error(f"Internal server error: {error}")
-            return jsonify({
-                'error': 'Internal server error',
-                'message': 'An unexpected error occurred'
-            }), 500
+            return json_error(INTERNAL_ERROR_BODY, 500)
     
     def _setup_security_headers(self):
         """Set up security headers for all responses."""
-        
-        @self.app.after_request
-        def add_security_headers(response):
-            """Add security headers to all responses."""
-            # HTTPS-only headers
-            response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-            
-            # Content security policy
-            response.headers['Content-Security-Policy'] = (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline'; "
-                "style-src 'self' 'unsafe-inline' https://cdnjs.cloudflare.com; "
-                "img-src 'self' data: https: http:; "
-                "connect-src 'self'; "
-                "font-src 'self' https://cdnjs.cloudflare.com; "
-                "object-src 'none'; "
-                "media-src 'self'; "
-                "frame-src 'none';"
-            )
-            
-            # Other security headers
-            response.headers['X-Content-Type-Options'] = 'nosniff'
-            response.headers['X-Frame-Options'] = 'DENY'
-            response.headers['X-XSS-Protection'] = '1; mode=block'
-            response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-            
-            # Remove server information
-            response.headers.pop('Server', None)
-            
-            return response
+        self.app.wsgi_app = SecurityHeadersMiddleware(self.app.wsgi_app)
     
     def create_ssl_context(self) -> ssl.SSLContext:
-        """Create SSL context for HTTPS with mTLS."""
-        return self.security_service.setup_mtls_context()
+        """
+        Get the SSL context for HTTPS with mTLS.
+        
+        The context is built once and reused by later runs, which also keeps
+        its TLS session cache so returning clients can resume sessions.
+        """
+        if self._ssl_context is None:
+            self._ssl_context = self.security_service.setup_mtls_context()
+        return self._ssl_context
     
     def run(self, host: str = '0.0.0.0', port: Optional[int] = None, debug: bool = False):
         """Run the Flask application with HTTPS and mTLS."""
@@ -721,12 +350,21 @@ class SecureFlaskApp:
             # Run with HTTPS and mTLS
             ssl_context = self.create_ssl_context()
             self.logger.info(f"Starting secure server with mTLS on https://{host}:{port}")
-            self.app.run(
-                host=host,
-                port=port,
-                debug=debug,
-                ssl_context=ssl_context
-            )
+            if debug:
+                # Keep the reloader and debugger of the development server
+                self.app.run(
+                    host=host,
+                    port=port,
+                    debug=debug,
+                    ssl_context=ssl_context
+                )
+            else:
+                # Handle each connection, including its handshake, in its own thread
+                server = MTLSWSGIServer(host, port, self.app, ssl_context)
+                try:
+                    server.serve_forever()
+                finally:
+                    server.server_close()
         else:
             # Run without HTTPS (for development/testing only)
             self.logger.warning("Running without mTLS - this should only be used for development")
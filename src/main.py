@@ -3,12 +3,12 @@ Main application entry point for the Price Monitor system.
 Handles application initialization, service dependency injection, and graceful shutdown.
 """
 
+import functools
 import os
 import sys
 import signal
 import logging
 import threading
-import time
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
@@ -22,6 +22,7 @@ try:
     from .services.price_monitor_service import PriceMonitorService
     from .services.email_service import EmailService
     from .services.logging_service import LoggingService
+    from .models.config import LOG_LEVELS
     from .models.database import DatabaseManager
     from .app import SecureFlaskApp
 except ImportError:
@@ -33,10 +34,32 @@ except ImportError:
     from services.price_monitor_service import PriceMonitorService
     from services.email_service import EmailService
     from services.logging_service import LoggingService
+    from models.config import LOG_LEVELS
     from models.database import DatabaseManager
     from app import SecureFlaskApp
 
 
+# Configuration files looked for, in order, when no path is given
+DEFAULT_CONFIG_PATHS = (
+    "config/default.properties",
+    "config.properties",
+    "~/.price_monitor/config.properties",
+    "/etc/price_monitor/config.properties"
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _default_config_path() -> str:
+    """Return the first existing default configuration file, searched once per process."""
+    for path in DEFAULT_CONFIG_PATHS:
+        path = os.path.expanduser(path)
+        if os.path.isfile(path):
+            return path
+    
+    # Return the first option as default
+    return DEFAULT_CONFIG_PATHS[0]
+
+
 class PriceMonitorApplication:
     """Main application class for the Price Monitor system."""
     
@@ -63,6 +86,10 @@ class PriceMonitorApplication:
         # Shutdown handling
         self._shutdown_event = threading.Event()
         self._shutdown_handlers = []
+        
+        # Set by SIGHUP; the reload worker thread performs the reload
+        self._reload_pending = threading.Event()
+        self._reload_thread = None
         self._is_running = False
         
         # Setup signal handlers for graceful shutdown
@@ -70,48 +97,41 @@ class PriceMonitorApplication:
     
     def _get_default_config_path(self) -> str:
         """Get the default configuration file path."""
-        # Look for config in several locations
-        possible_paths = [
-            "config/default.properties",
-            "config.properties",
-            os.path.expanduser("~/.price_monitor/config.properties"),
-            "/etc/price_monitor/config.properties"
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-        
-        # Return the first option as default
-        return possible_paths[0]
+        return _default_config_path()
     
     def _setup_signal_handlers(self):
         """Setup signal handlers for graceful shutdown."""
-        def signal_handler(signum, frame):
-            signal_name = signal.Signals(signum).name
-            if self.logger:
-                self.logger.info(f"Received {signal_name} signal, initiating graceful shutdown...")
-            else:
-                print(f"Received {signal_name} signal, initiating graceful shutdown...")
-            self.shutdown()
-        
         # Handle common shutdown signals
-        signal.signal(signal.SIGINT, signal_handler)   # Ctrl+C
-        signal.signal(signal.SIGTERM, signal_handler)  # Termination signal
+        signal.signal(signal.SIGINT, self._on_shutdown_signal)   # Ctrl+C
+        signal.signal(signal.SIGTERM, self._on_shutdown_signal)  # Termination signal
         
         # Handle SIGHUP for configuration reload (Unix only)
         if hasattr(signal, 'SIGHUP'):
-            def reload_handler(signum, frame):
-                if self.logger:
-                    self.logger.info("Received SIGHUP signal, reloading configuration...")
-                self._reload_configuration()
-            
-            signal.signal(signal.SIGHUP, reload_handler)
+            signal.signal(signal.SIGHUP, self._on_reload_signal)
+    
+    def _on_shutdown_signal(self, signum, frame):
+        """Shut the application down on SIGINT or SIGTERM."""
+        signal_name = signal.Signals(signum).name
+        if self.logger:
+            self.logger.info(f"Received {signal_name} signal, initiating graceful shutdown...")
+        else:
+            print(f"Received {signal_name} signal, initiating graceful shutdown...")
+        self.shutdown()
     
-    def initialize(self) -> bool:
+    def _on_reload_signal(self, signum, frame):
+        """Request a configuration reload on SIGHUP."""
+        # Only flag the reload: logging and file I/O are not safe here,
+        # and signals arriving before the reload runs are coalesced
+        self._reload_pending.set()
+    
+    def initialize(self, serve: bool = True) -> bool:
         """
         Initialize all application components.
         
+        Args:
+            serve: Also create the Flask app and start the price monitoring
+                scheduler; one-shot commands such as --check-config skip them
+        
         Returns:
             True if initialization successful, False otherwise
         """
@@ -137,13 +157,17 @@ class PriceMonitorApplication:
             if not self._initialize_services():
                 return False
             
-            # Initialize Flask application
-            if not self._initialize_flask_app():
-                return False
-            
-            # Start price monitoring scheduler
-            if not self._start_monitoring_scheduler():
-                return False
+            if serve:
+                # Initialize Flask application
+                if not self._initialize_flask_app():
+                    return False
+                
+                # Start price monitoring scheduler
+                if not self._start_monitoring_scheduler():
+                    return False
+                
+                # Serve SIGHUP configuration reloads
+                self._start_reload_worker()
             
             self.logger.info("Price Monitor application initialized successfully")
             self._is_running = True
@@ -183,6 +207,9 @@ class PriceMonitorApplication:
             # Initialize logging service with configuration
             self.logging_service = LoggingService(self.config)
             
+            # Registered first so it runs last, once everything else has logged
+            self._shutdown_handlers.append(self.logging_service.shutdown)
+            
             # Update logger to use the new service
             self.logger = logging.getLogger(__name__)
             self.logger.info("Comprehensive logging service initialized")
@@ -222,17 +249,15 @@ class PriceMonitorApplication:
             
             # Update logging level if specified in config
             if hasattr(self.config, 'log_level'):
-                log_level = getattr(logging, self.config.log_level.upper(), logging.INFO)
+                log_level = LOG_LEVELS.get(self.config.log_level.upper(), logging.INFO)
                 logging.getLogger().setLevel(log_level)
                 self.logger.info(f"Log level set to: {self.config.log_level}")
             
+            # Create the log and database directories the configuration names
+            self._ensure_directories()
+            
             # Update log file path if specified
             if hasattr(self.config, 'log_file_path') and self.config.log_file_path:
-                # Create log directory
-                log_dir = os.path.dirname(self.config.log_file_path)
-                if log_dir:
-                    os.makedirs(log_dir, exist_ok=True)
-                
                 # Add file handler for the configured log file
                 file_handler = logging.FileHandler(self.config.log_file_path)
                 file_handler.setFormatter(logging.Formatter(
@@ -248,16 +273,22 @@ class PriceMonitorApplication:
             self.logger.error(f"Failed to load configuration: {str(e)}")
             return False
     
+    def _ensure_directories(self):
+        """Create the directories for the configured log file and SQLite database."""
+        paths = [self.config.log_file_path]
+        if not self.config.database_path.startswith(('sqlite://', 'postgresql://', 'mysql://')):
+            paths.append(self.config.database_path)
+        
+        directories = {os.path.dirname(path) for path in paths if path}
+        for directory in directories:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+    
     def _initialize_database(self) -> bool:
         """Initialize database connection and schema."""
         try:
             self.logger.info("Initializing database...")
             
-            # Create data directory if needed
-            db_dir = os.path.dirname(self.config.database_path)
-            if db_dir:
-                os.makedirs(db_dir, exist_ok=True)
-            
             # Initialize database manager
             # Convert file path to SQLAlchemy URL if needed
             database_url = self.config.database_path
@@ -295,22 +326,16 @@ class PriceMonitorApplication:
             
             # Initialize parser service
             self.parser_service = ParserService(
-                ai_api_key=getattr(self.config, 'ai_api_key', None),
-                ai_api_endpoint=getattr(self.config, 'ai_api_endpoint', None),
-                enable_ai_parsing=getattr(self.config, 'enable_ai_parsing', False)
+                ai_api_key=self.config.ai_api_key,
+                ai_api_endpoint=self.config.ai_api_endpoint,
+                enable_ai_parsing=self.config.enable_ai_parsing
             )
             self.logger.debug("Parser service initialized")
             
             # Initialize email service
             try:
                 self.email_service = EmailService(self.config)
-                
-                # Test email connection
-                test_result = self.email_service.test_email_connection()
-                if test_result.success:
-                    self.logger.info("Email service initialized and connection tested successfully")
-                else:
-                    self.logger.warning(f"Email service initialized but connection test failed: {test_result.message}")
+                self.logger.info("Email service initialized")
                     
             except Exception as e:
                 self.logger.warning(f"Email service initialization failed: {str(e)}")
@@ -337,6 +362,34 @@ class PriceMonitorApplication:
             self.logger.error(f"Failed to initialize services: {str(e)}")
             return False
     
+    def _start_email_probe(self):
+        """
+        Test the SMTP connection in the background.
+        
+        Only run() starts the probe, so one-shot commands and callers that
+        never serve do not open an SMTP connection; the handshake can take
+        seconds and the service is usable meanwhile.
+        """
+        if not self.email_service:
+            return
+        threading.Thread(
+            target=self._probe_email_connection,
+            args=(self.email_service,),
+            daemon=True
+        ).start()
+        self.logger.info("Testing email connection in the background")
+    
+    def _probe_email_connection(self, email_service):
+        """Test the SMTP connection of email_service and log the outcome."""
+        try:
+            test_result = email_service.test_email_connection()
+            if test_result.success:
+                self.logger.info("Email connection tested successfully")
+            else:
+                self.logger.warning(f"Email connection test failed: {test_result.message}")
+        except Exception as e:
+            self.logger.warning(f"Email connection test failed: {str(e)}")
+    
     def _initialize_flask_app(self) -> bool:
         """Initialize Flask web application."""
         try:
@@ -358,8 +411,8 @@ class PriceMonitorApplication:
             self.logger.info("Starting price monitoring scheduler...")
             
             # Get scheduling configuration
-            check_frequency_hours = getattr(self.config, 'check_frequency_hours', 24)
-            check_time = getattr(self.config, 'check_time', "09:00")
+            check_frequency_hours = self.config.check_frequency_hours
+            check_time = self.config.check_time
             
             # Validate check frequency
             if check_frequency_hours <= 0:
@@ -431,6 +484,8 @@ class PriceMonitorApplication:
             self.logger.info(f"Starting Price Monitor application on {host}:{port}")
             self.logger.info(f"mTLS enabled: {self.config.enable_mtls}")
             
+            self._start_email_probe()
+            
             # Run Flask application
             self.flask_app.run(host=host, port=port, debug=debug)
             
@@ -448,6 +503,9 @@ class PriceMonitorApplication:
         
         self.logger.info("Initiating graceful shutdown...")
         self._shutdown_event.set()
+        
+        # Wake the reload worker so it sees the shutdown and exits
+        self._reload_pending.set()
         self._is_running = False
         
         # Execute shutdown handlers in reverse order
@@ -467,6 +525,25 @@ class PriceMonitorApplication:
         
         self.logger.info("Graceful shutdown completed")
     
+    def _start_reload_worker(self):
+        """Start the thread that performs configuration reloads requested by SIGHUP."""
+        if self._reload_thread and self._reload_thread.is_alive():
+            return
+        
+        self._reload_thread = threading.Thread(target=self._reload_worker, daemon=True)
+        self._reload_thread.start()
+    
+    def _reload_worker(self):
+        """Reload the configuration each time a reload is requested, until shutdown."""
+        while True:
+            self._reload_pending.wait()
+            if self._shutdown_event.is_set():
+                return
+            
+            self._reload_pending.clear()
+            self.logger.info("Received SIGHUP signal, reloading configuration...")
+            self._reload_configuration()
+    
     def _reload_configuration(self):
         """Reload configuration without restarting the application."""
         try:
@@ -477,7 +554,7 @@ class PriceMonitorApplication:
             
             # Update logging level if changed
             if new_config.log_level != self.config.log_level:
-                log_level = getattr(logging, new_config.log_level.upper(), logging.INFO)
+                log_level = LOG_LEVELS.get(new_config.log_level.upper(), logging.INFO)
                 logging.getLogger().setLevel(log_level)
                 self.logger.info(f"Log level updated to: {new_config.log_level}")
             
@@ -486,8 +563,9 @@ class PriceMonitorApplication:
             
             # Restart scheduler if frequency changed
             if hasattr(new_config, 'check_frequency_hours'):
+                # stop_scheduler() waits briefly for the old thread; one still
+                # inside a price check stops on its own event when it finishes
                 self.price_monitor_service.stop_scheduler()
-                time.sleep(1)  # Brief pause
                 self.price_monitor_service.start_scheduler()
                 self.logger.info("Price monitoring scheduler restarted with new configuration")
             
@@ -539,8 +617,11 @@ def main():
     # Create application instance
     app = PriceMonitorApplication(config_path=args.config)
     
+    # One-shot commands need the services but not the web server or scheduler
+    serve = not (args.check_config or args.test_email)
+    
     # Initialize application
-    if not app.initialize():
+    if not app.initialize(serve=serve):
         print("Failed to initialize application")
         sys.exit(1)
     
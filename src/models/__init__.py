@@ -2,8 +2,19 @@
 Models package for the Price Monitor application.
 """
 
-from .database import Product, PriceHistory, DatabaseManager, get_database_manager
-from .migrations import MigrationManager, run_migrations, reset_database
+import importlib
+
+# Database names are resolved on first access so that importing a light
+# submodule such as models.config does not pull in SQLAlchemy.
+_LAZY_EXPORTS = {
+    'Product': '.database',
+    'PriceHistory': '.database',
+    'DatabaseManager': '.database',
+    'get_database_manager': '.database',
+    'MigrationManager': '.migrations',
+    'run_migrations': '.migrations',
+    'reset_database': '.migrations',
+}
 
 __all__ = [
     'Product',
@@ -13,4 +24,12 @@ __all__ = [
     'MigrationManager',
     'run_migrations',
     'reset_database'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,27 @@
 """
 Configuration data models for the price monitoring application.
 """
+import logging
+import re
 from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
 
 
-@dataclass
+# 24-hour HH:MM, accepting the same 1-2 digit fields as time.strptime("%H:%M")
+_CHECK_TIME_RE = re.compile(r"([01]?\d|2[0-3]):[0-5]?\d")
+
+# Accepted values for Config.log_level and the logging levels they select
+LOG_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+
+@dataclass(slots=True)
 class Config:
     """Main configuration class containing all application settings."""
     
@@ -50,6 +65,7 @@ class Config:
     log_retention_days: int = 30
     metrics_retention_hours: int = 24
     error_retention_hours: int = 168  # 7 days
+    enable_server_timing: bool = False  # Server-Timing header on API responses
     
     def __post_init__(self):
         """Validate configuration after initialization."""
@@ -67,10 +83,7 @@ class Config:
         if not isinstance(self.check_time, str):
             raise ValueError("check_time must be a string")
         
-        try:
-            import time
-            time.strptime(self.check_time, "%H:%M")
-        except ValueError:
+        if not _CHECK_TIME_RE.fullmatch(self.check_time):
             raise ValueError("check_time must be in HH:MM format (24-hour)")
         
         if not isinstance(self.max_retry_attempts, int) or self.max_retry_attempts < 0:
@@ -82,11 +95,11 @@ class Config:
         if not isinstance(self.api_port, int) or not (1 <= self.api_port <= 65535):
             raise ValueError("api_port must be an integer between 1 and 65535")
         
-        if self.log_level not in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
+        if self.log_level not in LOG_LEVELS:
             raise ValueError("log_level must be one of: DEBUG, INFO, WARNING, ERROR, CRITICAL")
 
 
-@dataclass
+@dataclass(slots=True)
 class ConfigValidationError:
     """Represents a configuration validation error."""
     field: str
@@ -97,7 +110,7 @@ class ConfigValidationError:
         return f"{self.severity.upper()}: {self.field} - {self.message}"
 
 
-@dataclass
+@dataclass(slots=True)
 class ConfigValidationResult:
     """Result of configuration validation."""
     is_valid: bool
@@ -105,10 +118,12 @@ class ConfigValidationResult:
     warnings: list[ConfigValidationError]
     
     def __post_init__(self):
-        """Separate errors and warnings."""
-        all_issues = self.errors + self.warnings
-        self.errors = [e for e in all_issues if e.severity == "error"]
-        self.warnings = [e for e in all_issues if e.severity == "warning"]
+        """Separate errors and warnings if the caller passed them mixed."""
+        if (any(e.severity != "error" for e in self.errors)
+                or any(e.severity != "warning" for e in self.warnings)):
+            all_issues = self.errors + self.warnings
+            self.errors = [e for e in all_issues if e.severity == "error"]
+            self.warnings = [e for e in all_issues if e.severity == "warning"]
     
     def has_errors(self) -> bool:
         """Check if there are any validation errors."""
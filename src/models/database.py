@@ -2,15 +2,146 @@
 Database models and initialization utilities for the Price Monitor application.
 """
 
+import threading
+from array import array
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, List
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship, Session
-from sqlalchemy.sql import func
+from typing import Optional, List, Tuple
+from sqlalchemy import create_engine, event, insert, select, update, make_url, Index, String, DateTime, Text, ForeignKey
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker, relationship, Session
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql import func, literal_column
+from sqlalchemy.sql.functions import FunctionElement
 import os
 
-Base = declarative_base()
+
+class Base(DeclarativeBase):
+    """Declarative base class for all ORM models."""
+
+
+# Per-connection SQLite tuning. WAL avoids the rollback journal's second fsync
+# per commit, and synchronous=NORMAL is still crash-safe in WAL mode: a power
+# loss can drop the last commits but never corrupts the database.
+# foreign_keys is off by default in SQLite and must be enabled per connection.
+SQLITE_PRAGMAS = (
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "cache_size=-64000",
+    "mmap_size=268435456",
+    "foreign_keys=ON",
+)
+
+
+# Columns bulk_upsert_products() never overwrites on an existing product
+_UPSERT_KEPT_COLUMNS = ('id', 'url', 'created_at')
+
+
+# Rows per executemany() call in bulk inserts. Larger batches stop paying off
+# once the per-statement overhead is amortized.
+DEFAULT_BULK_INSERT_BATCH_SIZE = 50
+
+
+# Connection pool sizing. Scraping workers, the scheduler and request threads
+# each check out a connection, so the pool is larger than SQLAlchemy's default.
+POOL_SIZE = 10
+POOL_MAX_OVERFLOW = 20
+POOL_TIMEOUT_SECONDS = 30
+POOL_RECYCLE_SECONDS = 1800
+
+# How long a SQLite connection waits for another writer's lock before failing
+SQLITE_BUSY_TIMEOUT_SECONDS = 30
+
+
+def _engine_options(database_url: str) -> dict:
+    """
+    Build create_engine() keyword arguments for a database URL.
+    
+    File-based SQLite uses a QueuePool of connections shared across threads.
+    In-memory SQLite uses a single StaticPool connection, since every new
+    connection would otherwise open its own empty database. Server databases
+    get pre-ping and recycling to drop connections closed by the server.
+    
+    Args:
+        database_url: Database connection URL
+        
+    Returns:
+        Keyword arguments for create_engine()
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite':
+        return {
+            'pool_size': POOL_SIZE,
+            'max_overflow': POOL_MAX_OVERFLOW,
+            'pool_timeout': POOL_TIMEOUT_SECONDS,
+            'pool_pre_ping': True,
+            'pool_recycle': POOL_RECYCLE_SECONDS,
+        }
+    
+    connect_args = {'check_same_thread': False, 'timeout': SQLITE_BUSY_TIMEOUT_SECONDS}
+    if url.database in (None, '', ':memory:'):
+        return {'poolclass': StaticPool, 'connect_args': connect_args}
+    
+    return {
+        'pool_size': POOL_SIZE,
+        'max_overflow': POOL_MAX_OVERFLOW,
+        'pool_timeout': POOL_TIMEOUT_SECONDS,
+        'connect_args': connect_args,
+    }
+
+
+# Name of the SQL function casefold() compiles to on SQLite. It is
+# registered on every connection the engine opens; other tools writing to
+# the products table need it too, since the name sort indexes use it.
+SQLITE_CASEFOLD_FUNCTION = 'py_casefold'
+
+
+def _sqlite_casefold(value):
+    """Fold a SQLite text value with str.casefold(), passing other values through."""
+    return value.casefold() if isinstance(value, str) else value
+
+
+class casefold(FunctionElement):
+    """
+    Case-insensitive form of a text expression, for matching and sorting.
+    
+    SQLite's lower() and LIKE only fold ASCII letters, so on SQLite this
+    calls Python's str.casefold() through SQLITE_CASEFOLD_FUNCTION. Other
+    backends use their own Unicode-aware lower().
+    """
+    type = String()
+    name = 'casefold'
+    inherit_cache = True
+
+
+@compiles(casefold)
+def _compile_casefold(element, compiler, **kw):
+    return f"lower({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(casefold, 'sqlite')
+def _compile_casefold_sqlite(element, compiler, **kw):
+    return f"{SQLITE_CASEFOLD_FUNCTION}({compiler.process(element.clauses, **kw)})"
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Apply journal mode and performance PRAGMAs to a new SQLite connection."""
+    dbapi_connection.create_function(
+        SQLITE_CASEFOLD_FUNCTION, 1, _sqlite_casefold, deterministic=True
+    )
+    
+    cursor = dbapi_connection.cursor()
+    try:
+        # journal_mode is persistent in the database file, so only switch it once
+        cursor.execute("PRAGMA journal_mode")
+        if cursor.fetchone()[0].lower() != 'wal':
+            cursor.execute("PRAGMA journal_mode=WAL")
+        
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+    finally:
+        cursor.close()
 
 
 class Product(Base):
@@ -18,19 +149,21 @@ class Product(Base):
     
     __tablename__ = 'products'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    url = Column(Text, unique=True, nullable=False)
-    name = Column(String(500), nullable=False)
-    current_price = Column(Float, nullable=False)
-    previous_price = Column(Float, nullable=True)
-    lowest_price = Column(Float, nullable=False)
-    image_url = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    last_checked = Column(DateTime, nullable=True)
-    is_active = Column(Boolean, default=True, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    url: Mapped[str] = mapped_column(Text, unique=True)
+    name: Mapped[str] = mapped_column(String(500))
+    current_price: Mapped[float]
+    previous_price: Mapped[Optional[float]]
+    lowest_price: Mapped[float]
+    image_url: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    last_checked: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    is_active: Mapped[bool] = mapped_column(default=True)
     
     # Relationship to price history
-    price_history = relationship("PriceHistory", back_populates="product", cascade="all, delete-orphan")
+    price_history: Mapped[List["PriceHistory"]] = relationship(
+        back_populates="product", cascade="all, delete-orphan"
+    )
     
     def __repr__(self):
         return f"<Product(id={self.id}, name='{self.name}', current_price={self.current_price})>"
@@ -41,37 +174,72 @@ class PriceHistory(Base):
     
     __tablename__ = 'price_history'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
-    price = Column(Float, nullable=False)
-    recorded_at = Column(DateTime, default=func.now(), nullable=False)
-    source = Column(String(20), nullable=False)  # 'automatic' or 'manual'
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey('products.id'))
+    price: Mapped[float]
+    recorded_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    source: Mapped[str] = mapped_column(String(20))  # 'automatic' or 'manual'
     
     # Relationship to product
-    product = relationship("Product", back_populates="price_history")
+    product: Mapped["Product"] = relationship(back_populates="price_history")
     
     def __repr__(self):
         return f"<PriceHistory(id={self.id}, product_id={self.product_id}, price={self.price}, source='{self.source}')>"
 
 
+# Serves "history for product X, newest first" with an index seek and no sort
+Index(
+    'idx_price_history_product_recorded',
+    PriceHistory.product_id,
+    PriceHistory.recorded_at.desc()
+)
+
+
+# Back the paginated product listing: one index per sort field, led by the
+# is_active filter, so a page is an index range scan with no sort step.
+# The sort expressions must match ProductService.query_products() exactly.
+# The case-insensitive name sort also has an index without is_active, for
+# listings that include inactive products.
+PRODUCT_SORT_INDEXES = (
+    Index('idx_products_active_name_folded', Product.is_active, casefold(Product.name)),
+    Index('idx_products_active_current_price', Product.is_active, Product.current_price),
+    Index('idx_products_active_previous_price', Product.is_active,
+          func.coalesce(Product.previous_price, literal_column('0'))),
+    Index('idx_products_active_lowest_price', Product.is_active, Product.lowest_price),
+    Index('idx_products_active_created', Product.is_active, Product.created_at),
+    Index('idx_products_active_last_checked', Product.is_active, Product.last_checked),
+    Index('idx_products_name_folded', casefold(Product.name)),
+)
+
+
+def _default_database_url() -> str:
+    """Return the URL of the default SQLite database in the data directory."""
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    return f"sqlite:///{os.path.join(data_dir, 'price_monitor.db')}"
+
+
 class DatabaseManager:
     """Database connection and initialization manager."""
     
-    def __init__(self, database_url: str = None):
+    def __init__(self, database_url: str = None,
+                 bulk_insert_batch_size: int = DEFAULT_BULK_INSERT_BATCH_SIZE):
         """
         Initialize database manager.
         
         Args:
             database_url: Database connection URL. If None, uses SQLite with default path.
+            bulk_insert_batch_size: Default number of rows per executemany() call
+                in bulk inserts
         """
         if database_url is None:
-            # Default to SQLite database in data directory
-            data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
-            os.makedirs(data_dir, exist_ok=True)
-            database_url = f"sqlite:///{os.path.join(data_dir, 'price_monitor.db')}"
+            database_url = _default_database_url()
         
         self.database_url = database_url
-        self.engine = create_engine(database_url, echo=False)
+        self.bulk_insert_batch_size = bulk_insert_batch_size
+        self.engine = create_engine(database_url, echo=False, **_engine_options(database_url))
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', _configure_sqlite_connection)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
     
     def create_tables(self):
@@ -86,6 +254,131 @@ class DatabaseManager:
         """Get a new database session."""
         return self.SessionLocal()
     
+    def bulk_insert_price_history(self, rows: List[dict], batch_size: Optional[int] = None) -> int:
+        """
+        Insert many price history rows in a single transaction.
+        
+        Rows go through a Core INSERT executed once per batch (executemany),
+        skipping the ORM's per-object unit of work. All rows must have the
+        same keys; recorded_at defaults to the current time when omitted.
+        
+        Args:
+            rows: Dictionaries with product_id, price, source and optionally recorded_at
+            batch_size: Rows per executemany() call. Defaults to bulk_insert_batch_size.
+            
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        
+        batch_size = batch_size or self.bulk_insert_batch_size
+        statement = insert(PriceHistory.__table__)
+        with self.engine.begin() as connection:
+            for start in range(0, len(rows), batch_size):
+                connection.execute(statement, rows[start:start + batch_size])
+        return len(rows)
+    
+    def load_price_series(self, product_id: int,
+                          since: Optional[datetime] = None) -> Tuple[array, array]:
+        """
+        Load a product's price history as two parallel arrays, oldest first.
+        
+        Analytics only need the numbers, so rows are read with a Core select
+        into compact float arrays instead of one PriceHistory object per entry.
+        
+        Args:
+            product_id: Product ID
+            since: Only include entries recorded at or after this time
+        
+        Returns:
+            Tuple of (recorded_at as Unix timestamps, prices), both array('d')
+        """
+        statement = (
+            select(PriceHistory.recorded_at, PriceHistory.price)
+            .where(PriceHistory.product_id == product_id)
+            .order_by(PriceHistory.recorded_at)
+        )
+        if since is not None:
+            statement = statement.where(PriceHistory.recorded_at >= since)
+        
+        with self.engine.connect() as connection:
+            rows = connection.execute(statement).all()
+        
+        timestamps = array('d', [recorded_at.timestamp() for recorded_at, _ in rows])
+        prices = array('d', [price for _, price in rows])
+        return timestamps, prices
+    
+    def bulk_upsert_products(self, records: List[dict]) -> int:
+        """
+        Insert products, updating the existing row when a URL is already tracked.
+        
+        Runs a single INSERT ... ON CONFLICT (url) DO UPDATE as one executemany
+        instead of a lookup and an ORM flush per product. Every column given in
+        the records, other than url and created_at, is overwritten on conflict.
+        All records must have the same keys. Backends without ON CONFLICT
+        support fall back to an UPDATE, then an INSERT if nothing matched, per
+        record in one transaction.
+        
+        Args:
+            records: Product column dictionaries, each including url
+            
+        Returns:
+            Number of records inserted or updated
+        """
+        if not records:
+            return 0
+        
+        dialect_name = self.engine.dialect.name
+        if dialect_name == 'sqlite':
+            statement = sqlite.insert(Product)
+        elif dialect_name == 'postgresql':
+            statement = postgresql.insert(Product)
+        else:
+            return self._upsert_products_per_row(records)
+        
+        updated_columns = [key for key in records[0] if key not in _UPSERT_KEPT_COLUMNS]
+        statement = statement.on_conflict_do_update(
+            index_elements=[Product.url],
+            set_={key: statement.excluded[key] for key in updated_columns}
+        )
+        with self.engine.begin() as connection:
+            connection.execute(statement, records)
+        return len(records)
+    
+    def _upsert_products_per_row(self, records: List[dict]) -> int:
+        """Upsert products one record at a time, for backends without ON CONFLICT."""
+        with self.engine.begin() as connection:
+            for record in records:
+                updated_values = {
+                    key: value for key, value in record.items() if key not in _UPSERT_KEPT_COLUMNS
+                }
+                if updated_values:
+                    matched = connection.execute(
+                        update(Product).where(Product.url == record['url']).values(updated_values)
+                    ).rowcount
+                else:
+                    matched = connection.execute(
+                        select(Product.id).where(Product.url == record['url'])
+                    ).first() is not None
+                if not matched:
+                    connection.execute(insert(Product), record)
+        return len(records)
+    
+    def close(self):
+        """
+        Close all pooled database connections.
+        
+        Sessions handed out by get_session() check connections out of the
+        engine's pool, so each thread serving requests works on its own
+        connection while WAL mode lets readers proceed during writes. This
+        closes the connections kept in the pool; the manager opens new ones
+        if it is used again. A manager shared by get_database_manager() also
+        stops being shared, so the next call for its URL creates a new one.
+        """
+        self.engine.dispose()
+        _release_shared_database_manager(self)
+    
     def init_database(self):
         """Initialize database with tables and any required initial data."""
         self.create_tables()
@@ -96,10 +389,48 @@ def get_database_manager(database_url: str = None) -> DatabaseManager:
     """
     Factory function to get a database manager instance.
     
+    Managers are shared per URL, so every caller reuses the same engine,
+    connection pool and per-connection prepared statement cache instead of
+    opening new connections and re-running the PRAGMA setup. At most
+    MAX_SHARED_DATABASE_MANAGERS are kept; closing a manager releases it.
+    
     Args:
         database_url: Database connection URL
         
     Returns:
         DatabaseManager instance
     """
-    return DatabaseManager(database_url)
\ No newline at end of file
+    if database_url is None:
+        database_url = _default_database_url()
+    return _get_shared_database_manager(database_url)
+
+
+# Managers handed out by get_database_manager(), least recently used first.
+# Evicted managers have their pools disposed; they keep working for callers
+# still holding them, opening connections again on demand.
+MAX_SHARED_DATABASE_MANAGERS = 8
+_shared_managers: "OrderedDict[str, DatabaseManager]" = OrderedDict()
+_shared_managers_lock = threading.Lock()
+
+
+def _get_shared_database_manager(database_url: str) -> DatabaseManager:
+    """Get or create the DatabaseManager shared by all callers using database_url."""
+    with _shared_managers_lock:
+        manager = _shared_managers.get(database_url)
+        if manager is not None:
+            _shared_managers.move_to_end(database_url)
+            return manager
+        
+        manager = DatabaseManager(database_url)
+        _shared_managers[database_url] = manager
+        if len(_shared_managers) > MAX_SHARED_DATABASE_MANAGERS:
+            _, evicted = _shared_managers.popitem(last=False)
+            evicted.engine.dispose()
+        return manager
+
+
+def _release_shared_database_manager(manager: DatabaseManager):
+    """Stop sharing manager if get_database_manager() handed it out."""
+    with _shared_managers_lock:
+        if _shared_managers.get(manager.database_url) is manager:
+            del _shared_managers[manager.database_url]
\ No newline at end of file
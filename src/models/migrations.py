@@ -4,11 +4,15 @@ Database migration utilities for the Price Monitor application.
 
 import os
 import sqlite3
-from typing import List, Tuple
+from contextlib import contextmanager
+from typing import FrozenSet, List, Optional, Set, Tuple
 from datetime import datetime
-from sqlalchemy import text
+from sqlalchemy import Connection, text
 from .database import DatabaseManager, Base
 
+# Bump whenever a migration is added to run_migrations()
+SCHEMA_VERSION = 5
+
 
 class MigrationManager:
     """Handles database migrations and schema versioning."""
@@ -16,66 +20,121 @@ class MigrationManager:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.migrations_table = 'schema_migrations'
+        # Applied versions, loaded on first use and kept in step by apply_migration
+        self._applied: Optional[Set[str]] = None
+    
+    @contextmanager
+    def _transaction(self):
+        """
+        Open a connection with a transaction covering DDL as well as DML.
+        
+        The sqlite3 driver only begins transactions implicitly before
+        INSERT/UPDATE/DELETE, so CREATE statements would otherwise each
+        autocommit (and fsync) on their own. An explicit BEGIN makes all
+        statements on the connection commit or roll back together.
+        
+        Yields:
+            Connection inside the open transaction
+        """
+        with self.db_manager.engine.begin() as connection:
+            if connection.dialect.name == 'sqlite':
+                connection.exec_driver_sql("BEGIN")
+            yield connection
     
-    def _ensure_migrations_table(self):
+    def _ensure_migrations_table(self, connection: Connection):
         """Ensure the migrations tracking table exists."""
-        with self.db_manager.get_session() as session:
-            # Create migrations table if it doesn't exist
-            session.execute(text(f"""
-                CREATE TABLE IF NOT EXISTS {self.migrations_table} (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    version TEXT UNIQUE NOT NULL,
-                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    description TEXT
-                )
-            """))
-            session.commit()
-    
-    def get_applied_migrations(self) -> List[str]:
-        """Get list of applied migration versions."""
-        self._ensure_migrations_table()
+        connection.exec_driver_sql(f"""
+            CREATE TABLE IF NOT EXISTS {self.migrations_table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                version TEXT UNIQUE NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                description TEXT
+            )
+        """)
+    
+    def _get_applied_migrations(self, connection: Connection) -> Set[str]:
+        """Get applied migration versions, querying the open connection only on first use."""
+        if self._applied is None:
+            self._ensure_migrations_table(connection)
+            result = connection.exec_driver_sql(f"SELECT version FROM {self.migrations_table}")
+            self._applied = {row[0] for row in result}
+        return self._applied
+    
+    def get_schema_version(self) -> int:
+        """
+        Get the schema version stamped on the database.
+        
+        Uses SQLite's ``user_version`` header field, which is read without
+        touching any table. Other backends always report 0.
+        """
+        if self.db_manager.engine.dialect.name != 'sqlite':
+            return 0
         
-        with self.db_manager.get_session() as session:
-            result = session.execute(text(f"SELECT version FROM {self.migrations_table} ORDER BY version"))
-            return [row[0] for row in result.fetchall()]
+        with self.db_manager.engine.connect() as connection:
+            return connection.exec_driver_sql("PRAGMA user_version").scalar() or 0
+    
+    def set_schema_version(self, version: int):
+        """Stamp the database with the given schema version (SQLite only)."""
+        if self.db_manager.engine.dialect.name != 'sqlite':
+            return
+        
+        with self.db_manager.engine.begin() as connection:
+            connection.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+    
+    def get_applied_migrations(self) -> FrozenSet[str]:
+        """
+        Get the applied migration versions.
+        
+        Returns a frozen copy, so callers cannot change the cached set
+        apply_migration() relies on.
+        """
+        if self._applied is None:
+            with self._transaction() as connection:
+                self._get_applied_migrations(connection)
+        return frozenset(self._applied)
     
     def apply_migration(self, version: str, description: str, sql_statements: List[str]):
         """
         Apply a migration.
         
+        Creating the tracking table, the applied check, the migration
+        statements and the bookkeeping insert all run in one transaction.
+        The applied versions are read once per manager and the cached set
+        is only updated after the transaction commits.
+        
         Args:
             version: Migration version (e.g., '001_initial_schema')
             description: Human-readable description
             sql_statements: List of SQL statements to execute
         """
-        applied_migrations = self.get_applied_migrations()
-        
-        if version in applied_migrations:
-            print(f"Migration {version} already applied, skipping.")
-            return
-        
-        print(f"Applying migration {version}: {description}")
-        
-        with self.db_manager.get_session() as session:
-            try:
-                # Execute migration statements
+        try:
+            with self._transaction() as connection:
+                if version in self._get_applied_migrations(connection):
+                    print(f"Migration {version} already applied, skipping.")
+                    return
+                
+                print(f"Applying migration {version}: {description}")
+                
+                # Migration statements carry no bind parameters, so they go
+                # straight to the driver without text() compilation
                 for statement in sql_statements:
                     if statement.strip():
-                        session.execute(text(statement))
+                        connection.exec_driver_sql(statement)
                 
                 # Record migration as applied
-                session.execute(text(f"""
+                connection.execute(text(f"""
                     INSERT INTO {self.migrations_table} (version, description)
                     VALUES (:version, :description)
                 """), {"version": version, "description": description})
-                
-                session.commit()
-                print(f"Migration {version} applied successfully.")
-                
-            except Exception as e:
-                session.rollback()
-                print(f"Error applying migration {version}: {e}")
-                raise
+            
+            self._applied.add(version)
+            print(f"Migration {version} applied successfully.")
+            
+        except Exception as e:
+            # The rolled-back transaction may have created the tracking table
+            self._applied = None
+            print(f"Error applying migration {version}: {e}")
+            raise
     
     def run_initial_migration(self):
         """Run the initial database schema migration."""
@@ -88,6 +147,62 @@ class MigrationManager:
             description='Create initial products and price_history tables',
             sql_statements=[]  # Tables already created by SQLAlchemy
         )
+    
+    def run_price_history_index_migration(self):
+        """Add the price history index used by per-product history lookups."""
+        self.apply_migration(
+            version='002_price_history_product_recorded_index',
+            description='Index price_history on (product_id, recorded_at DESC)',
+            sql_statements=[
+                """
+                CREATE INDEX IF NOT EXISTS idx_price_history_product_recorded
+                ON price_history (product_id, recorded_at DESC)
+                """
+            ]
+        )
+    
+    def run_product_sort_indexes_migration(self):
+        """Add the product indexes used by the paginated product listing."""
+        self.apply_migration(
+            version='003_product_sort_indexes',
+            description='Index products on (is_active, <sort field>) for each listing sort',
+            sql_statements=[
+                "CREATE INDEX IF NOT EXISTS idx_products_active_name_lower ON products (is_active, lower(name))",
+                "CREATE INDEX IF NOT EXISTS idx_products_active_current_price ON products (is_active, current_price)",
+                "CREATE INDEX IF NOT EXISTS idx_products_active_previous_price ON products (is_active, coalesce(previous_price, 0))",
+                "CREATE INDEX IF NOT EXISTS idx_products_active_lowest_price ON products (is_active, lowest_price)",
+                "CREATE INDEX IF NOT EXISTS idx_products_active_created ON products (is_active, created_at)",
+                "CREATE INDEX IF NOT EXISTS idx_products_active_last_checked ON products (is_active, last_checked)",
+            ]
+        )
+    
+    def run_product_name_index_migration(self):
+        """Add the name index used when listing inactive products as well."""
+        self.apply_migration(
+            version='004_product_name_lower_index',
+            description='Index products on lower(name) for case-insensitive name sorts',
+            sql_statements=[
+                "CREATE INDEX IF NOT EXISTS idx_products_name_lower ON products (lower(name))",
+            ]
+        )
+    
+    def run_product_name_casefold_migration(self):
+        """
+        Rebuild the name sort indexes on py_casefold(name).
+        
+        SQLite's lower() only folds ASCII, so name sorts and searches now use
+        the Unicode-aware casefold() expression registered by DatabaseManager.
+        """
+        self.apply_migration(
+            version='005_product_name_casefold_indexes',
+            description='Index products on py_casefold(name) instead of lower(name)',
+            sql_statements=[
+                "DROP INDEX IF EXISTS idx_products_active_name_lower",
+                "DROP INDEX IF EXISTS idx_products_name_lower",
+                "CREATE INDEX IF NOT EXISTS idx_products_active_name_folded ON products (is_active, py_casefold(name))",
+                "CREATE INDEX IF NOT EXISTS idx_products_name_folded ON products (py_casefold(name))",
+            ]
+        )
 
 
 def run_migrations(db_manager: DatabaseManager):
@@ -99,9 +214,19 @@ def run_migrations(db_manager: DatabaseManager):
     """
     migration_manager = MigrationManager(db_manager)
     
-    # Run initial migration
+    # Fast path: an up-to-date database needs a single header read
+    if migration_manager.get_schema_version() >= SCHEMA_VERSION:
+        print("Database schema is up to date.")
+        return
+    
+    # Run migrations in version order
     migration_manager.run_initial_migration()
+    migration_manager.run_price_history_index_migration()
+    migration_manager.run_product_sort_indexes_migration()
+    migration_manager.run_product_name_index_migration()
+    migration_manager.run_product_name_casefold_migration()
     
+    migration_manager.set_schema_version(SCHEMA_VERSION)
     print("All migrations completed successfully.")
 
 
@@ -121,7 +246,8 @@ def reset_database(db_manager: DatabaseManager):
     # Recreate tables
     db_manager.create_tables()
     
-    # Run migrations
+    # Run migrations, ignoring the version stamp of the dropped schema
+    MigrationManager(db_manager).set_schema_version(0)
     run_migrations(db_manager)
     
     print("Database reset completed.")
\ No newline at end of file
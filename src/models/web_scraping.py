@@ -6,7 +6,7 @@ from typing import Optional, Dict, List
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class PageContent:
     """Represents the content of a web page."""
     url: str
@@ -21,7 +21,7 @@ class PageContent:
             self.fetched_at = datetime.now()
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductInfo:
     """Represents extracted product information."""
     name: Optional[str] = None
@@ -36,7 +36,7 @@ class ProductInfo:
         return self.name is not None and self.price is not None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ScrapingResult:
     """Result of a web scraping operation."""
     success: bool
@@ -1,16 +1,132 @@
 """
 AI-powered parser for extracting product information from web pages.
 """
+import dataclasses
+import hashlib
 import json
+import os
 import re
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Sequence
+from urllib.parse import urljoin, urlsplit
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from ..models.web_scraping import PageContent, ProductInfo
 from .product_parser import ProductParser, ParsingResult
 
 
+_CLASS_TEST = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+
+# Main content areas to send to the AI, most specific first: main,
+# [role="main"], .main-content, .product-details, .product-info,
+# .pdp-content, #main and #content
+MAIN_CONTENT_PREDICATES = (
+    "self::main",
+    "@role='main'",
+    _CLASS_TEST.format('main-content'),
+    _CLASS_TEST.format('product-details'),
+    _CLASS_TEST.format('product-info'),
+    _CLASS_TEST.format('pdp-content'),
+    "@id='main'",
+    "@id='content'",
+)
+_MAIN_CONTENT_XPATH = etree.XPath("//*[{}]".format(" or ".join(MAIN_CONTENT_PREDICATES)))
+_MAIN_CONTENT_MATCHERS = tuple(
+    etree.XPath(f"boolean(self::*[{predicate}])") for predicate in MAIN_CONTENT_PREDICATES
+)
+
+# Known sites, keyed by a hostname fragment such as "amazon.", mapped to XPath
+# expressions for their name, price and image. Pages from these sites are read
+# with the expressions and only sent to the AI if they no longer match.
+DOMAIN_RULES_PATH = os.path.join(os.path.dirname(__file__), 'domain_rules.json')
+DOMAIN_RULES_CONFIDENCE = 0.95
+
+
+def _load_domain_rules(path: str) -> Dict[str, Dict[str, etree.XPath]]:
+    """Load the per-site extraction rules, compiling each expression once."""
+    with open(path, encoding='utf-8') as rules_file:
+        raw_rules = json.load(rules_file)
+    return {
+        domain: {field: etree.XPath(expression) for field, expression in fields.items()}
+        for domain, fields in raw_rules.items()
+    }
+
+
+DOMAIN_RULES = _load_domain_rules(DOMAIN_RULES_PATH)
+
+# Patterns for pulling JSON out of AI responses
+_JSON_BLOB_RE = re.compile(r'\{.*\}', re.DOTALL)
+_TRAILING_COMMA_OBJ_RE = re.compile(r',\s*}')
+_TRAILING_COMMA_ARR_RE = re.compile(r',\s*]')
+_NON_NUMERIC_RE = re.compile(r'[^\d\.]')
+_WHITESPACE_RUN_RE = re.compile(r'\s+')
+
+# XML declaration opening an XHTML page, e.g. <?xml version="1.0" encoding="UTF-8"?>
+_XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+def _parse_document(html: str):
+    """
+    Parse page text into an lxml HTML document.
+    
+    lxml refuses str input carrying an XML encoding declaration, so the
+    declaration of an XHTML page is dropped first; the text is already decoded.
+    
+    Returns:
+        Document root element, or None if the page is empty or cannot be parsed
+    """
+    try:
+        return lxml_html.document_fromstring(_XML_DECLARATION_RE.sub('', html, count=1))
+    except (ValueError, etree.ParserError):
+        return None
+
+# Page HTML budget per prompt, in tokens, and the characters per token assumed
+# when converting it to a character limit (HTML averages a little under 4)
+MAX_HTML_TOKENS = 2000
+APPROX_CHARS_PER_TOKEN = 4
+MAX_HTML_CHARS = MAX_HTML_TOKENS * APPROX_CHARS_PER_TOKEN
+
+# Extraction prompt, split around the page URL and HTML so the fixed text is
+# built once rather than formatted into a new string on every call
+_PROMPT_PREFIX = """
+You are a web scraping expert. Extract product information from the following HTML content from URL: """
+_PROMPT_MID = """
+
+Please extract the following information and return it as a JSON object:
+- name: Product name/title
+- price: Numeric price value (just the number, no currency symbols)
+- currency: Currency code (USD, EUR, GBP, etc.)
+- image_url: Main product image URL (make it absolute if relative)
+- availability: Stock status (In Stock, Out of Stock, etc.)
+- description: Brief product description
+
+Rules:
+1. Return ONLY a valid JSON object, no other text
+2. If you cannot find a field, set it to null
+3. For price, extract only the numeric value (e.g., 29.99, not $29.99)
+4. For image_url, make sure it's a complete URL
+5. Be conservative - only extract information you're confident about
+
+HTML Content:
+"""
+_PROMPT_SUFFIX = """
+
+JSON Response:
+"""
+
+# Keep-alive connections to the AI endpoint, shared by threads using the parser
+AI_API_POOL_SIZE = 16
+
+# Extraction results kept per parser, keyed by a hash of the URL and cleaned
+# HTML; least recently used evicted first
+EXTRACTION_CACHE_MAX_ENTRIES = 2048
+
+
 class AIParser(ProductParser):
     """Parser that uses AI/LLM services to extract product information."""
     
@@ -23,6 +139,47 @@ class AIParser(ProductParser):
         # Default to OpenAI-compatible endpoint if not specified
         if not self.api_endpoint and self.api_key:
             self.api_endpoint = "https://api.openai.com/v1/chat/completions"
+        
+        # Reuse connections (and TLS sessions) to the API across calls
+        self.session = self._create_session()
+        
+        # BLAKE2b of the URL and cleaned HTML -> product info the AI extracted
+        self._extraction_cache: 'OrderedDict[bytes, ProductInfo]' = OrderedDict()
+        self._extraction_cache_lock = threading.Lock()
+    
+    def _create_session(self) -> requests.Session:
+        """Create a pooled requests session for AI API calls."""
+        session = requests.Session()
+        
+        # Retry rate limiting and server errors; the last response is returned
+        # rather than raised so its status is logged like any other failure.
+        # Completions are billed and not idempotent, so only failures to
+        # connect are retried otherwise: a read timeout or dropped connection
+        # may follow a request the API already ran.
+        retry_strategy = Retry(
+            total=3,
+            read=False,
+            other=0,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["POST"],
+            raise_on_status=False
+        )
+        
+        adapter = HTTPAdapter(
+            pool_connections=AI_API_POOL_SIZE,
+            pool_maxsize=AI_API_POOL_SIZE,
+            max_retries=retry_strategy
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        
+        session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+        })
+        
+        return session
     
     def can_parse(self, content: PageContent) -> bool:
         """
@@ -53,9 +210,22 @@ class AIParser(ProductParser):
             return ParsingResult.error_result("AI API key not configured", self.name)
         
         try:
+            # Known sites are read with their own rules, without an API call
+            product_info = self._parse_with_domain_rules(content)
+            if product_info is not None:
+                self.logger.info(f"Parsed product with site rules: {product_info.name} - ${product_info.price}")
+                return ParsingResult.success_result(product_info, self.name, DOMAIN_RULES_CONFIDENCE)
+            
             # Clean and prepare the HTML content
             cleaned_html = self._clean_html_for_ai(content.html)
             
+            # Pages often come back unchanged between checks; skip the API call
+            cache_key = self._extraction_cache_key(content.url, cleaned_html)
+            cached_info = self._get_cached_extraction(cache_key)
+            if cached_info is not None:
+                self.logger.debug(f"Reusing AI extraction for unchanged page: {content.url}")
+                return ParsingResult.success_result(cached_info, self.name, 0.8)
+            
             # Create the prompt for the AI
             prompt = self._create_extraction_prompt(cleaned_html, content.url)
             
@@ -66,6 +236,7 @@ class AIParser(ProductParser):
                 product_info = self._parse_ai_response(response, content.url)
                 if product_info and product_info.is_valid():
                     confidence = 0.8  # Good confidence for AI parsing
+                    self._cache_extraction(cache_key, product_info)
                     self.logger.info(f"AI successfully parsed product: {product_info.name} - ${product_info.price}")
                     return ParsingResult.success_result(product_info, self.name, confidence)
                 else:
@@ -82,6 +253,93 @@ class AIParser(ProductParser):
             self.logger.error(error_msg)
             return ParsingResult.error_result(error_msg, self.name)
     
+    def parse_many(self, contents: Sequence[PageContent],
+                   max_workers: int = AI_API_POOL_SIZE) -> List[ParsingResult]:
+        """
+        Parse several pages, running their AI calls concurrently.
+        
+        Each call spends nearly all its time waiting on the API, so batch
+        wall time drops roughly by the number of calls in flight. The default
+        matches the session's connection pool, so every worker has a
+        keep-alive connection.
+        
+        Args:
+            contents: Pages to parse
+            max_workers: Maximum number of pages parsed at once
+        
+        Returns:
+            ParsingResult for each page, in the same order as contents
+        """
+        if len(contents) <= 1:
+            return [self.parse(content) for content in contents]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(contents))) as executor:
+            return list(executor.map(self.parse, contents))
+    
+    def _parse_with_domain_rules(self, content: PageContent) -> Optional[ProductInfo]:
+        """
+        Extract product information using the rules for a known site.
+        
+        Args:
+            content: Page content to parse
+        
+        Returns:
+            ProductInfo with at least a name and price, or None if the site has
+            no rules, the page cannot be parsed or it does not match the rules
+        """
+        hostname = urlsplit(content.url).hostname or ''
+        rules = next((fields for domain, fields in DOMAIN_RULES.items() if domain in hostname), None)
+        if rules is None:
+            return None
+        
+        document = _parse_document(content.html)
+        if document is None:
+            self.logger.debug(f"Could not parse page from {hostname} for site rules, falling back to AI")
+            return None
+        values = {}
+        for field, xpath in rules.items():
+            matches = xpath(document)
+            if matches:
+                match = matches[0]
+                text = match if isinstance(match, str) else match.text_content()
+                values[field] = text.strip() or None
+        
+        price_text = values.get('price')
+        product_info = ProductInfo(
+            name=values.get('name'),
+            price=self._extract_price_from_text(price_text),
+            image_url=urljoin(content.url, values['image']) if values.get('image') else None,
+            currency=self._extract_currency_from_text(price_text)
+        )
+        if not product_info.is_valid():
+            self.logger.debug(f"Site rules for {hostname} did not match, falling back to AI")
+            return None
+        return product_info
+    
+    @staticmethod
+    def _extraction_cache_key(url: str, cleaned_html: str) -> bytes:
+        """Hash the inputs that determine an extraction result."""
+        digest = hashlib.blake2b(url.encode(), digest_size=16)
+        digest.update(b'\0')
+        digest.update(cleaned_html.encode())
+        return digest.digest()
+    
+    def _get_cached_extraction(self, cache_key: bytes) -> Optional[ProductInfo]:
+        """Return a copy of a cached extraction result, if any."""
+        with self._extraction_cache_lock:
+            product_info = self._extraction_cache.get(cache_key)
+            if product_info is None:
+                return None
+            self._extraction_cache.move_to_end(cache_key)
+        return dataclasses.replace(product_info)
+    
+    def _cache_extraction(self, cache_key: bytes, product_info: ProductInfo):
+        """Remember a successful extraction result."""
+        with self._extraction_cache_lock:
+            self._extraction_cache[cache_key] = dataclasses.replace(product_info)
+            if len(self._extraction_cache) > EXTRACTION_CACHE_MAX_ENTRIES:
+                self._extraction_cache.popitem(last=False)
+    
     def _clean_html_for_ai(self, html: str) -> str:
         """
         Clean and simplify HTML content for AI processing.
@@ -93,53 +351,61 @@ class AIParser(ProductParser):
             Cleaned HTML suitable for AI processing
         """
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "noscript"]):
-                script.decompose()
-            
-            # Remove comments
-            from bs4 import Comment
-            for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-                comment.extract()
+            document = _parse_document(html)
+            if document is None:
+                return ''
             
-            # Focus on main content areas
-            main_content_selectors = [
-                'main',
-                '[role="main"]',
-                '.main-content',
-                '.product-details',
-                '.product-info',
-                '.pdp-content',
-                '#main',
-                '#content',
-            ]
+            # Remove script and style elements, and comments
+            etree.strip_elements(document, 'script', 'style', 'noscript', etree.Comment, with_tail=False)
             
-            main_content = None
-            for selector in main_content_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    main_content = element
-                    break
+            main_content = self._find_main_content(document)
             
             # If we found main content, use that; otherwise use body
-            if main_content:
-                content_html = str(main_content)
-            else:
-                body = soup.find('body')
-                content_html = str(body) if body else str(soup)
+            if main_content is None:
+                main_content = document.find('body')
+                if main_content is None:
+                    main_content = document
+            content_html = lxml_html.tostring(main_content, encoding='unicode', with_tail=False)
+            
+            # Indentation and blank lines cost tokens without telling the AI
+            # anything, so collapse them before applying the budget
+            content_html = _WHITESPACE_RUN_RE.sub(' ', content_html)
             
             # Limit content length to avoid API limits
-            if len(content_html) > 8000:  # Reasonable limit for most APIs
-                content_html = content_html[:8000] + "..."
+            if len(content_html) > MAX_HTML_CHARS:
+                content_html = content_html[:MAX_HTML_CHARS] + "..."
             
             return content_html
             
         except Exception as e:
             self.logger.warning(f"Error cleaning HTML: {str(e)}")
             # Return truncated original HTML as fallback
-            return html[:8000] + "..." if len(html) > 8000 else html
+            return html[:MAX_HTML_CHARS] + "..." if len(html) > MAX_HTML_CHARS else html
+    
+    def _find_main_content(self, document):
+        """
+        Find the main content element of a page.
+        
+        A single XPath walk collects elements matching any of the
+        MAIN_CONTENT_PREDICATES, then the match for the earliest predicate is
+        picked, so the result is the same as trying each one in turn.
+        
+        Args:
+            document: Parsed lxml document
+            
+        Returns:
+            Main content element, or None if nothing matches
+        """
+        best_element = None
+        best_rank = len(_MAIN_CONTENT_MATCHERS)
+        for element in _MAIN_CONTENT_XPATH(document):
+            for rank in range(best_rank):
+                if _MAIN_CONTENT_MATCHERS[rank](element):
+                    best_element, best_rank = element, rank
+                    break
+            if best_rank == 0:
+                break
+        return best_element
     
     def _create_extraction_prompt(self, html_content: str, url: str) -> str:
         """
@@ -152,30 +418,7 @@ class AIParser(ProductParser):
         Returns:
             Formatted prompt for AI
         """
-        prompt = f"""
-You are a web scraping expert. Extract product information from the following HTML content from URL: {url}
-
-Please extract the following information and return it as a JSON object:
-- name: Product name/title
-- price: Numeric price value (just the number, no currency symbols)
-- currency: Currency code (USD, EUR, GBP, etc.)
-- image_url: Main product image URL (make it absolute if relative)
-- availability: Stock status (In Stock, Out of Stock, etc.)
-- description: Brief product description
-
-Rules:
-1. Return ONLY a valid JSON object, no other text
-2. If you cannot find a field, set it to null
-3. For price, extract only the numeric value (e.g., 29.99, not $29.99)
-4. For image_url, make sure it's a complete URL
-5. Be conservative - only extract information you're confident about
-
-HTML Content:
-{html_content}
-
-JSON Response:
-"""
-        return prompt
+        return "".join((_PROMPT_PREFIX, url, _PROMPT_MID, html_content, _PROMPT_SUFFIX))
     
     def _call_ai_api(self, prompt: str) -> Optional[Dict[str, Any]]:
         """
@@ -188,11 +431,6 @@ JSON Response:
             API response data or None if failed
         """
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json',
-            }
-            
             # OpenAI-compatible API format
             payload = {
                 'model': 'gpt-3.5-turbo',  # Default model
@@ -206,9 +444,8 @@ JSON Response:
                 'temperature': 0.1,  # Low temperature for consistent extraction
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.api_endpoint,
-                headers=headers,
                 json=payload,
                 timeout=30
             )
@@ -251,7 +488,7 @@ JSON Response:
             
             # Try to parse JSON from the response
             # Sometimes AI includes extra text, so try to extract JSON
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
+            json_match = _JSON_BLOB_RE.search(content)
             if json_match:
                 json_str = json_match.group()
             else:
@@ -261,8 +498,8 @@ JSON Response:
                 data = json.loads(json_str)
             except json.JSONDecodeError:
                 # Try to clean up common JSON issues
-                json_str = re.sub(r',\s*}', '}', json_str)  # Remove trailing commas
-                json_str = re.sub(r',\s*]', ']', json_str)
+                json_str = _TRAILING_COMMA_OBJ_RE.sub('}', json_str)  # Remove trailing commas
+                json_str = _TRAILING_COMMA_ARR_RE.sub(']', json_str)
                 data = json.loads(json_str)
             
             # Extract and validate the data
@@ -276,13 +513,12 @@ JSON Response:
             # Convert price to float if it's a string
             if isinstance(price, str):
                 try:
-                    price = float(re.sub(r'[^\d\.]', '', price))
+                    price = float(_NON_NUMERIC_RE.sub('', price))
                 except (ValueError, TypeError):
                     price = None
             
             # Make image URL absolute if it's relative
             if image_url and not image_url.startswith(('http://', 'https://')):
-                from urllib.parse import urljoin
                 image_url = urljoin(base_url, image_url)
             
             return ProductInfo(
@@ -1,15 +1,63 @@
 """
 HTML/CSS selector-based parser for common e-commerce patterns.
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from bs4 import BeautifulSoup, Tag
 from urllib.parse import urljoin
 import re
+import threading
+import soupsieve
 
 from ..models.web_scraping import PageContent, ProductInfo
 from .product_parser import ProductParser, ParsingResult
 
 
+# Patterns used on every page, compiled once
+_SCHEMA_PRODUCT_RE = re.compile(r'schema\.org/Product')
+_PRODUCT_CLASS_RE = re.compile(r'product', re.I)
+_PRICE_CLASS_RE = re.compile(r'price', re.I)
+_PRODUCT_ID_RE = re.compile(r'product|price', re.I)
+_ADD_TO_CART_RE = re.compile(r'add to cart|buy now|purchase', re.I)
+_ADD_TO_CART_TESTID_RE = re.compile(r'add.*cart|buy', re.I)
+_TITLE_SUFFIX_RE = re.compile(r'\s*[-|]\s*(Amazon|eBay|Shop|Store|Buy).*$', re.I)
+_IMAGE_EXTENSION_RE = re.compile(r'\.(jpg|jpeg|png|gif|webp)(\?|$)', re.I)
+
+
+class SelectorQuery:
+    """
+    A prioritized selector list run as one combined CSS query.
+    
+    The combined query walks the document once; the few matches are then
+    ranked back into selector order, so results come out exactly as if each
+    selector had been queried in turn.
+    """
+    
+    def __init__(self, selectors: List[str]):
+        self.selectors = tuple(selectors)
+        self._combined = soupsieve.compile(', '.join(self.selectors))
+        self._patterns = tuple(soupsieve.compile(selector) for selector in self.selectors)
+    
+    def select(self, soup: BeautifulSoup, first_only: bool = False) -> List[Tag]:
+        """
+        Find matching elements in selector priority order.
+        
+        Args:
+            soup: Document to search
+            first_only: Keep only the first match of each selector, like
+                calling select_one per selector
+            
+        Returns:
+            Matches ordered by selector, then by document position. An element
+            matching several selectors appears once per selector.
+        """
+        ranked: List[List[Tag]] = [[] for _ in self._patterns]
+        for element in self._combined.select(soup):
+            for group, pattern in zip(ranked, self._patterns):
+                if not (first_only and group) and pattern.match(element):
+                    group.append(element)
+        return [element for group in ranked for element in group]
+
+
 class HtmlCssParser(ProductParser):
     """Parser that uses HTML/CSS selectors to extract product information."""
     
@@ -64,6 +112,84 @@ class HtmlCssParser(ProductParser):
             '.product-img',
             'img.product-image',  # explicit img with class
         ]
+        
+        self.availability_selectors = [
+            '[data-testid*="availability"]',
+            '.availability',
+            '.stock-status',
+            '.product-availability',
+            '[itemprop="availability"]',
+        ]
+        
+        self.description_selectors = [
+            '[data-testid*="description"]',
+            '.product-description',
+            '.product-details',
+            '.description',
+            '[itemprop="description"]',
+            '.product-summary',
+        ]
+        
+        # Each selector list as a single query, so a field costs one DOM walk
+        self._name_query = SelectorQuery(self.name_selectors)
+        self._price_query = SelectorQuery(self.price_selectors)
+        self._image_query = SelectorQuery(self.image_selectors)
+        self._availability_query = SelectorQuery(self.availability_selectors)
+        self._description_query = SelectorQuery(self.description_selectors)
+        
+        # Last tree built per thread, so can_parse followed by parse on the
+        # same page only builds it once
+        self._soup_cache = threading.local()
+    
+    def _make_soup(self, html: str) -> BeautifulSoup:
+        """
+        Build the document tree for a page.
+        
+        Uses the lxml tree builder so tokenizing and tree construction run in
+        C rather than in the pure-Python html.parser. The whole document is
+        kept: the add-to-cart indicator matches text anywhere on the page.
+        
+        Args:
+            html: Raw page HTML
+            
+        Returns:
+            Parsed BeautifulSoup document
+        """
+        return BeautifulSoup(html, 'lxml')
+    
+    def _get_soup(self, content: PageContent) -> BeautifulSoup:
+        """
+        Get the document tree for a page, reusing the one built last on this thread.
+        
+        Args:
+            content: Page content to parse
+            
+        Returns:
+            Parsed BeautifulSoup document
+        """
+        cache = self._soup_cache
+        if getattr(cache, 'content', None) is content and cache.html is content.html:
+            return cache.soup
+        
+        soup = self._make_soup(content.html)
+        cache.content, cache.html, cache.soup = content, content.html, soup
+        return soup
+    
+    def _find_indicators(self, soup: BeautifulSoup) -> Iterator[Any]:
+        """Yield the product page indicators one lookup at a time."""
+        # Common product page elements
+        yield soup.find(attrs={'itemtype': _SCHEMA_PRODUCT_RE})
+        yield soup.find('meta', attrs={'property': 'product:price:amount'})
+        yield soup.find('meta', attrs={'property': 'og:type', 'content': 'product'})
+        
+        # Common class patterns - check separately for better detection
+        yield soup.find(class_=_PRODUCT_CLASS_RE)
+        yield soup.find(class_=_PRICE_CLASS_RE)
+        yield soup.find(id=_PRODUCT_ID_RE)
+        
+        # Shopping cart or buy buttons
+        yield soup.find(string=_ADD_TO_CART_RE)
+        yield soup.find(attrs={'data-testid': _ADD_TO_CART_TESTID_RE})
     
     def can_parse(self, content: PageContent) -> bool:
         """
@@ -76,28 +202,16 @@ class HtmlCssParser(ProductParser):
             True if content appears to be a product page
         """
         try:
-            soup = BeautifulSoup(content.html, 'html.parser')
-            
-            # Look for common e-commerce indicators
-            indicators = [
-                # Common product page elements
-                soup.find(attrs={'itemtype': re.compile(r'schema\.org/Product')}),
-                soup.find('meta', attrs={'property': 'product:price:amount'}),
-                soup.find('meta', attrs={'property': 'og:type', 'content': 'product'}),
-                
-                # Common class patterns - check separately for better detection
-                soup.find(class_=re.compile(r'product', re.I)),
-                soup.find(class_=re.compile(r'price', re.I)),
-                soup.find(id=re.compile(r'product|price', re.I)),
-                
-                # Shopping cart or buy buttons
-                soup.find(string=re.compile(r'add to cart|buy now|purchase', re.I)),
-                soup.find(attrs={'data-testid': re.compile(r'add.*cart|buy', re.I)}),
-            ]
+            soup = self._get_soup(content)
             
             # If we find at least 2 indicators, consider it parseable
-            found_indicators = sum(1 for indicator in indicators if indicator)
-            return found_indicators >= 2
+            found_indicators = 0
+            for indicator in self._find_indicators(soup):
+                if indicator:
+                    found_indicators += 1
+                    if found_indicators >= 2:
+                        return True
+            return False
             
         except Exception as e:
             self.logger.error(f"Error checking if content can be parsed: {str(e)}")
@@ -114,7 +228,7 @@ class HtmlCssParser(ProductParser):
             ParsingResult with extracted product information
         """
         try:
-            soup = BeautifulSoup(content.html, 'html.parser')
+            soup = self._get_soup(content)
             
             # Extract product information
             name = self._extract_product_name(soup)
@@ -152,22 +266,17 @@ class HtmlCssParser(ProductParser):
     
     def _extract_product_name(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract product name using CSS selectors."""
-        for selector in self.name_selectors:
-            try:
-                element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(strip=True)
-                    if text and len(text) > 3:  # Reasonable name length
-                        return self._clean_text(text)
-            except Exception:
-                continue
+        for element in self._name_query.select(soup, first_only=True):
+            text = element.get_text(strip=True)
+            if text and len(text) > 3:  # Reasonable name length
+                return self._clean_text(text)
         
         # Fallback to page title if no specific product name found
         title_tag = soup.find('title')
         if title_tag:
             title = title_tag.get_text(strip=True)
             # Remove common suffixes from title
-            title = re.sub(r'\s*[-|]\s*(Amazon|eBay|Shop|Store|Buy).*$', '', title, flags=re.I)
+            title = _TITLE_SUFFIX_RE.sub('', title)
             if title and len(title) > 3:
                 return self._clean_text(title)
         
@@ -175,25 +284,20 @@ class HtmlCssParser(ProductParser):
     
     def _extract_product_price(self, soup: BeautifulSoup) -> Optional[float]:
         """Extract product price using CSS selectors."""
-        for selector in self.price_selectors:
-            try:
-                elements = soup.select(selector)
-                for element in elements:
-                    # Try different ways to get price text
-                    price_texts = [
-                        element.get_text(strip=True),
-                        element.get('content', ''),
-                        element.get('data-price', ''),
-                        element.get('value', ''),
-                    ]
-                    
-                    for price_text in price_texts:
-                        if price_text:
-                            price = self._extract_price_from_text(price_text)
-                            if price:
-                                return price
-            except Exception:
-                continue
+        for element in self._price_query.select(soup):
+            # Try different ways to get price text
+            price_texts = [
+                element.get_text(strip=True),
+                element.get('content', ''),
+                element.get('data-price', ''),
+                element.get('value', ''),
+            ]
+            
+            for price_text in price_texts:
+                if price_text:
+                    price = self._extract_price_from_text(price_text)
+                    if price:
+                        return price
         
         # Fallback: search for price patterns in meta tags
         meta_price_selectors = [
@@ -219,27 +323,22 @@ class HtmlCssParser(ProductParser):
     
     def _extract_product_image(self, soup: BeautifulSoup, base_url: str) -> Optional[str]:
         """Extract product image URL using CSS selectors."""
-        for selector in self.image_selectors:
-            try:
-                element = soup.select_one(selector)
-                if element:
-                    # Try different image source attributes
-                    img_sources = [
-                        element.get('src'),
-                        element.get('data-src'),
-                        element.get('data-lazy-src'),
-                        element.get('data-original'),
-                    ]
-                    
-                    for src in img_sources:
-                        if src and not src.startswith('data:'):  # Skip data URLs
-                            # Convert relative URLs to absolute
-                            absolute_url = urljoin(base_url, src)
-                            # Basic validation that it looks like an image URL or just return any valid URL
-                            if re.search(r'\.(jpg|jpeg|png|gif|webp)(\?|$)', absolute_url, re.I) or src:
-                                return absolute_url
-            except Exception:
-                continue
+        for element in self._image_query.select(soup, first_only=True):
+            # Try different image source attributes
+            img_sources = [
+                element.get('src'),
+                element.get('data-src'),
+                element.get('data-lazy-src'),
+                element.get('data-original'),
+            ]
+            
+            for src in img_sources:
+                if src and not src.startswith('data:'):  # Skip data URLs
+                    # Convert relative URLs to absolute
+                    absolute_url = urljoin(base_url, src)
+                    # Basic validation that it looks like an image URL or just return any valid URL
+                    if _IMAGE_EXTENSION_RE.search(absolute_url) or src:
+                        return absolute_url
         
         # Fallback: look for Open Graph image
         try:
@@ -273,71 +372,39 @@ class HtmlCssParser(ProductParser):
                 continue
         
         # Look for currency symbols in price elements
-        for selector in self.price_selectors:
-            try:
-                element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(strip=True)
-                    currency = self._extract_currency_from_text(text)
-                    if currency:
-                        return currency
-            except Exception:
-                continue
+        for element in self._price_query.select(soup, first_only=True):
+            text = element.get_text(strip=True)
+            currency = self._extract_currency_from_text(text)
+            if currency:
+                return currency
         
         return None
     
     def _extract_availability(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract product availability status."""
-        availability_selectors = [
-            '[data-testid*="availability"]',
-            '.availability',
-            '.stock-status',
-            '.product-availability',
-            '[itemprop="availability"]',
-        ]
-        
-        for selector in availability_selectors:
-            try:
-                element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(strip=True)
-                    if text:
-                        # Normalize availability text
-                        text_lower = text.lower()
-                        if any(word in text_lower for word in ['in stock', 'available', 'ready']):
-                            return 'In Stock'
-                        elif any(word in text_lower for word in ['out of stock', 'unavailable', 'sold out']):
-                            return 'Out of Stock'
-                        else:
-                            return self._clean_text(text)
-            except Exception:
-                continue
+        for element in self._availability_query.select(soup, first_only=True):
+            text = element.get_text(strip=True)
+            if text:
+                # Normalize availability text
+                text_lower = text.lower()
+                if any(word in text_lower for word in ['in stock', 'available', 'ready']):
+                    return 'In Stock'
+                elif any(word in text_lower for word in ['out of stock', 'unavailable', 'sold out']):
+                    return 'Out of Stock'
+                else:
+                    return self._clean_text(text)
         
         return None
     
     def _extract_description(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract product description."""
-        description_selectors = [
-            '[data-testid*="description"]',
-            '.product-description',
-            '.product-details',
-            '.description',
-            '[itemprop="description"]',
-            '.product-summary',
-        ]
-        
-        for selector in description_selectors:
-            try:
-                element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(strip=True)
-                    if text and len(text) > 10:  # Reasonable description length
-                        # Truncate very long descriptions
-                        if len(text) > 500:
-                            text = text[:500] + "..."
-                        return self._clean_text(text)
-            except Exception:
-                continue
+        for element in self._description_query.select(soup, first_only=True):
+            text = element.get_text(strip=True)
+            if text and len(text) > 10:  # Reasonable description length
+                # Truncate very long descriptions
+                if len(text) > 500:
+                    text = text[:500] + "..."
+                return self._clean_text(text)
         
         # Fallback to meta description
         try:
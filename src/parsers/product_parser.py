@@ -10,6 +10,40 @@ from dataclasses import dataclass
 from ..models.web_scraping import PageContent, ProductInfo
 
 
+# Text normalization patterns used by _clean_text
+_WHITESPACE_RE = re.compile(r'\s+')
+_UNWANTED_CHARS_RE = re.compile(r'[^\w\s\-\.\,\$\€\£\¥\(\)\/\:]')
+
+# Common price patterns - order matters!
+_PRICE_PATTERNS = tuple(re.compile(pattern) for pattern in [
+    # US format with thousands separators (must come before European)
+    r'[\$\€\£\¥]?\s*(\d{1,3}(?:,\d{3})+(?:\.\d{2})?)',  # $1,234.56, €1,234.56
+    r'(\d{1,3}(?:,\d{3})+(?:\.\d{2})?)\s*[\$\€\£\¥]',   # 1,234.56$, 1,234.56€
+
+    # European format (dot as thousands, comma as decimal)
+    r'(\d+(?:\.\d{3})*,\d{1,2})\s*[\$\€\£\¥]?',     # 1.234,56€
+    r'[\$\€\£\¥]?\s*(\d+(?:\.\d{3})*,\d{1,2})',      # €1.234,56
+
+    # Simple formats
+    r'(\d+,\d{1,2})\s*[\$\€\£\¥]?',                 # 123,45€ (European decimal)
+    r'[\$\€\£\¥]?\s*(\d+,\d{1,2})',                 # €123,45
+    r'[\$\€\£\¥]?\s*(\d+(?:\.\d{2})?)',             # $123.45, €123
+    r'(\d+(?:\.\d{2})?)\s*[\$\€\£\¥]',              # 123.45$, 123€
+])
+
+# Common currency patterns
+_CURRENCY_PATTERNS = tuple((re.compile(pattern, re.IGNORECASE), currency) for pattern, currency in [
+    (r'[\$]', 'USD'),
+    (r'[€]', 'EUR'),
+    (r'[£]', 'GBP'),
+    (r'[¥]', 'JPY'),
+    (r'\bUSD\b', 'USD'),
+    (r'\bEUR\b', 'EUR'),
+    (r'\bGBP\b', 'GBP'),
+    (r'\bJPY\b', 'JPY'),
+])
+
+
 @dataclass
 class ParsingResult:
     """Result of a product parsing operation."""
@@ -92,10 +126,10 @@ class ProductParser(ABC):
             return ""
         
         # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', text.strip())
+        text = _WHITESPACE_RE.sub(' ', text.strip())
         
         # Remove common unwanted characters but keep colons
-        text = re.sub(r'[^\w\s\-\.\,\$\€\£\¥\(\)\/\:]', '', text)
+        text = _UNWANTED_CHARS_RE.sub('', text)
         
         return text
     
@@ -112,25 +146,8 @@ class ProductParser(ABC):
         if not text:
             return None
         
-        # Common price patterns - order matters!
-        price_patterns = [
-            # US format with thousands separators (must come before European)
-            r'[\$\€\£\¥]?\s*(\d{1,3}(?:,\d{3})+(?:\.\d{2})?)',  # $1,234.56, €1,234.56
-            r'(\d{1,3}(?:,\d{3})+(?:\.\d{2})?)\s*[\$\€\£\¥]',   # 1,234.56$, 1,234.56€
-            
-            # European format (dot as thousands, comma as decimal)
-            r'(\d+(?:\.\d{3})*,\d{1,2})\s*[\$\€\£\¥]?',     # 1.234,56€
-            r'[\$\€\£\¥]?\s*(\d+(?:\.\d{3})*,\d{1,2})',      # €1.234,56
-            
-            # Simple formats
-            r'(\d+,\d{1,2})\s*[\$\€\£\¥]?',                 # 123,45€ (European decimal)
-            r'[\$\€\£\¥]?\s*(\d+,\d{1,2})',                 # €123,45
-            r'[\$\€\£\¥]?\s*(\d+(?:\.\d{2})?)',             # $123.45, €123
-            r'(\d+(?:\.\d{2})?)\s*[\$\€\£\¥]',              # 123.45$, 123€
-        ]
-        
-        for pattern in price_patterns:
-            matches = re.findall(pattern, text)
+        for pattern in _PRICE_PATTERNS:
+            matches = pattern.findall(text)
             if matches:
                 try:
                     # Handle different decimal separators
@@ -177,20 +194,8 @@ class ProductParser(ABC):
         if not text:
             return None
         
-        # Common currency patterns
-        currency_patterns = [
-            (r'[\$]', 'USD'),
-            (r'[€]', 'EUR'),
-            (r'[£]', 'GBP'),
-            (r'[¥]', 'JPY'),
-            (r'\bUSD\b', 'USD'),
-            (r'\bEUR\b', 'EUR'),
-            (r'\bGBP\b', 'GBP'),
-            (r'\bJPY\b', 'JPY'),
-        ]
-        
-        for pattern, currency in currency_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
+        for pattern, currency in _CURRENCY_PATTERNS:
+            if pattern.search(text):
                 return currency
         
         return None
\ No newline at end of file
@@ -0,0 +1,6 @@
+"""
+HTTP routes for the price monitoring API.
+"""
+from .products import products_bp
+
+__all__ = ['products_bp']
@@ -0,0 +1,713 @@
+"""
+Product and statistics API routes.
+
+The views are module-level functions registered on products_bp; they reach
+the application's services through the SecureFlaskApp stored in
+current_app.extensions['price_monitor'].
+"""
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, Iterator, Optional, Tuple
+
+from flask import Blueprint, current_app, g, jsonify, request, stream_with_context
+
+from ..security.auth_middleware import require_authentication
+from ..services.product_service import PRODUCT_SORT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+products_bp = Blueprint('products', __name__)
+
+# Unpaginated listings matching more products than this are streamed row by
+# row instead of being serialized, cached and ETagged as a whole
+PRODUCTS_STREAM_MIN_COUNT = 1000
+
+# Add/update payloads are a handful of short fields; larger bodies are
+# rejected with 413 before they are read or parsed
+MAX_JSON_BODY_BYTES = 4096
+
+# Validation errors returned before any work is done for the request
+_BODY_TOO_LARGE_ERROR = {
+    'error': 'Request too large',
+    'message': f'Request body must not exceed {MAX_JSON_BODY_BYTES} bytes'
+}
+_URL_REQUIRED_ERROR = {'error': 'Invalid request', 'message': 'URL is required'}
+_URL_EMPTY_ERROR = {'error': 'Invalid request', 'message': 'URL cannot be empty'}
+_PRICE_REQUIRED_ERROR = {'error': 'Invalid request', 'message': 'Price is required'}
+_INVALID_PRICE_ERROR = {'error': 'Invalid price', 'message': 'Price must be a positive number'}
+
+
+# Sort fields whose cursor values are datetimes, carried as ISO 8601 strings
+_DATETIME_SORT_FIELDS = frozenset({'created_at', 'last_checked'})
+
+
+def _encode_products_cursor(sort_by: str, sort_order: str, product) -> str:
+    """
+    Encode the last product on a page as an opaque cursor.
+    
+    The cursor carries the product's sort value as well as its id, so the
+    next page does not depend on that product still existing unchanged.
+    """
+    sort_value = product.sort_value
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps({
+        'sort_by': sort_by,
+        'sort_order': sort_order,
+        'value': sort_value,
+        'id': product.id
+    }).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def _decode_products_cursor(cursor: str, sort_by: str, sort_order: str) -> Optional[Tuple[Any, int]]:
+    """
+    Decode a cursor from _encode_products_cursor into a (sort value, id) anchor.
+    
+    Returns None if the cursor is malformed or was issued for another sort.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        sort_value, product_id = data['value'], data['id']
+        if data['sort_by'] != sort_by or data['sort_order'] != sort_order:
+            return None
+        if sort_by in _DATETIME_SORT_FIELDS and sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+    except (ValueError, TypeError, KeyError):
+        return None
+    
+    if not isinstance(product_id, int) or isinstance(product_id, bool):
+        return None
+    if sort_value is None:
+        # Only last_checked can be NULL
+        return (None, product_id) if sort_by == 'last_checked' else None
+    if sort_by == 'name':
+        valid_value = isinstance(sort_value, str)
+    elif sort_by in _DATETIME_SORT_FIELDS:
+        valid_value = True
+    else:
+        valid_value = isinstance(sort_value, (int, float)) and not isinstance(sort_value, bool)
+    return (sort_value, product_id) if valid_value else None
+
+
+# Product fields shown in the delete confirmation and price history responses
+_DELETE_CONFIRMATION_FIELDS = ('id', 'name', 'url', 'current_price')
+_HISTORY_SUMMARY_FIELDS = (
+    'id', 'name', 'url', 'current_price', 'previous_price', 'lowest_price',
+    'created_at', 'last_checked'
+)
+
+# Marks products whose price change was not computed by the database
+_NOT_COMPUTED = object()
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    """Format a datetime for JSON, passing None through."""
+    return value.isoformat() if value else None
+
+
+def _product_price_change(product) -> Optional[dict]:
+    """Describe the move from previous_price to current_price, or None if unchanged."""
+    # Products from ProductService listings arrive with the change computed in SQL
+    change_amount = getattr(product, 'price_change_amount', _NOT_COMPUTED)
+    if change_amount is _NOT_COMPUTED:
+        previous_price = product.previous_price
+        if not previous_price or previous_price == product.current_price:
+            return None
+        change_amount = product.current_price - previous_price
+        change_percentage = (change_amount / previous_price) * 100
+    elif change_amount is None:
+        return None
+    else:
+        change_percentage = product.price_change_percentage
+    return {
+        'amount': change_amount,
+        'percentage': change_percentage,
+        'direction': 'drop' if change_amount < 0 else 'rise'
+    }
+
+
+def _serialize_product(product, include_price_change: bool = False) -> dict:
+    """Convert a product to the JSON shape shared by the product endpoints."""
+    product_data = {
+        'id': product.id,
+        'url': product.url,
+        'name': product.name,
+        'current_price': product.current_price,
+        'previous_price': product.previous_price,
+        'lowest_price': product.lowest_price,
+        'image_url': product.image_url,
+        'created_at': _isoformat(product.created_at),
+        'last_checked': _isoformat(product.last_checked),
+        'is_active': product.is_active
+    }
+    if include_price_change:
+        product_data['price_change'] = _product_price_change(product)
+    return product_data
+
+
+def _summarize_product(product, fields: tuple) -> dict:
+    """Serialize a product and keep only the given fields."""
+    product_data = _serialize_product(product)
+    return {field: product_data[field] for field in fields}
+
+
+def _serialize_price_history(history) -> list:
+    """Convert price history entries to JSON-serializable dicts."""
+    return [
+        {
+            'id': entry.id,
+            'price': entry.price,
+            'recorded_at': _isoformat(entry.recorded_at),
+            'source': entry.source
+        }
+        for entry in history
+    ]
+
+
+def _read_json_body() -> Tuple[bool, Any]:
+    """
+    Read and parse the request body as JSON without raising on malformed input.
+    
+    At most MAX_JSON_BODY_BYTES + 1 bytes are read from the stream, so chunked
+    or undeclared-length bodies are bounded the same way as declared ones.
+    
+    Returns:
+        (too_large, data): too_large is True if the body exceeds
+        MAX_JSON_BODY_BYTES; data is the parsed JSON value, or None if the
+        body is missing, not JSON, invalid or too large
+    """
+    if (request.content_length or 0) > MAX_JSON_BODY_BYTES:
+        return True, None
+    raw = request.stream.read(MAX_JSON_BODY_BYTES + 1)
+    if len(raw) > MAX_JSON_BODY_BYTES:
+        return True, None
+    if not request.is_json or not raw:
+        return False, None
+    try:
+        return False, json.loads(raw)
+    except ValueError:
+        return False, None
+
+
+def _price_monitor():
+    """Return the SecureFlaskApp serving the current request."""
+    return current_app.extensions['price_monitor']
+
+
+def _build_products_page(price_monitor, active_only: bool, search: str, sort_by: str,
+                         sort_order: str, limit: Optional[int], offset: int,
+                         after: Optional[Tuple[Any, int]] = None,
+                         total_count: Optional[int] = None) -> str:
+    """
+    Query one page of products and serialize the /api/products response body.
+    
+    total_count is the number of matching products when the caller has
+    already counted them, so the query does not count them again.
+    """
+    # Filtering, sorting and pagination all happen in the database,
+    # so only the requested page is loaded
+    products, total_count = price_monitor.product_service.query_products(
+        active_only=active_only,
+        search=search,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        limit=limit,
+        offset=offset,
+        after=after,
+        total_count=total_count
+    )
+    
+    # A full page may have more products after it
+    next_cursor = None
+    if limit is not None and len(products) == limit:
+        next_cursor = _encode_products_cursor(sort_by, sort_order, products[-1])
+    
+    # Convert products to JSON-serializable format
+    products_data = [
+        _serialize_product(product, include_price_change=True)
+        for product in products
+    ]
+    
+    return current_app.json.dumps({
+        'products': products_data,
+        'count': len(products_data),
+        'total_count': total_count,
+        'offset': offset,
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'filters': {
+            'active_only': active_only,
+            'search': search,
+            'sort_by': sort_by,
+            'sort_order': sort_order
+        },
+        'client_id': g.client_id
+    })
+
+
+def _stream_products(price_monitor, active_only: bool, search: str, sort_by: str,
+                     sort_order: str, total_count: int) -> Iterator[str]:
+    """
+    Yield an unpaginated /api/products response body in chunks.
+    
+    The body has the same keys as _build_products_page() output, but
+    only one product is held in memory at a time. count and total_count
+    are counted before streaming starts, so products added or removed
+    while the body is streamed can make them differ from the array.
+    """
+    # The remaining keys are serialized whole and appended after the
+    # array, without their opening brace
+    rest = current_app.json.dumps({
+        'count': total_count,
+        'total_count': total_count,
+        'offset': 0,
+        'limit': None,
+        'next_cursor': None,
+        'filters': {
+            'active_only': active_only,
+            'search': search,
+            'sort_by': sort_by,
+            'sort_order': sort_order
+        },
+        'client_id': g.client_id
+    })
+    
+    yield '{"products": ['
+    separator = ''
+    for product in price_monitor.product_service.iter_products(
+        active_only=active_only, search=search, sort_by=sort_by, sort_order=sort_order
+    ):
+        yield separator + current_app.json.dumps(_serialize_product(product, include_price_change=True))
+        separator = ', '
+    yield '], ' + rest[1:]
+
+
+@products_bp.route('/products', methods=['GET'])
+@require_authentication
+def get_products():
+    """
+    Get all monitored products with filtering and sorting.
+    
+    Pages can be requested with offset or with the opaque cursor
+    returned as next_cursor. A cursor page is as cheap at any depth as
+    the first page, but only allows stepping forward; offset allows
+    jumping to any page and is kept for that.
+    """
+    price_monitor = _price_monitor()
+    try:
+        # Get query parameters for filtering
+        active_only = request.args.get('active_only', 'true').lower() == 'true'
+        sort_by = request.args.get('sort_by', 'created_at')  # name, current_price, lowest_price, created_at, last_checked
+        sort_order = request.args.get('sort_order', 'desc').lower()  # asc, desc
+        search = request.args.get('search', '').strip()
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
+        cursor = request.args.get('cursor')
+        
+        # Validate sort parameters; the whitelist also guards the ORDER BY,
+        # and each allowed field has a matching products sort index
+        valid_sort_fields = PRODUCT_SORT_FIELDS
+        if sort_by not in valid_sort_fields:
+            return jsonify({
+                'error': 'Invalid sort field',
+                'message': f'sort_by must be one of: {", ".join(valid_sort_fields)}'
+            }), 400
+        
+        if sort_order not in ['asc', 'desc']:
+            return jsonify({
+                'error': 'Invalid sort order',
+                'message': 'sort_order must be "asc" or "desc"'
+            }), 400
+        
+        if limit is not None and limit <= 0:
+            return jsonify({
+                'error': 'Invalid limit',
+                'message': 'limit must be a positive number'
+            }), 400
+        
+        if offset < 0:
+            return jsonify({
+                'error': 'Invalid offset',
+                'message': 'offset must be non-negative'
+            }), 400
+        
+        after = None
+        if cursor:
+            after = _decode_products_cursor(cursor, sort_by, sort_order)
+            if after is None:
+                return jsonify({
+                    'error': 'Invalid cursor',
+                    'message': 'cursor must be a next_cursor value from a previous response'
+                }), 400
+        
+        cache_key = (g.client_id, active_only, search, sort_by, sort_order, limit, offset, after)
+        body = price_monitor.get_cached_products_page(cache_key)
+        if body is None:
+            # An unpaginated listing is counted first, so a large one is
+            # streamed without loading any of its rows beforehand
+            total_count = None
+            if limit is None and offset == 0 and after is None:
+                total_count = price_monitor.product_service.count_products(
+                    active_only=active_only, search=search
+                )
+                if total_count > PRODUCTS_STREAM_MIN_COUNT:
+                    return current_app.response_class(
+                        stream_with_context(_stream_products(
+                            price_monitor, active_only, search, sort_by, sort_order, total_count
+                        )),
+                        mimetype='application/json'
+                    )
+            
+            body = _build_products_page(
+                price_monitor, active_only, search, sort_by, sort_order, limit, offset, after,
+                total_count
+            )
+            price_monitor.cache_products_page(cache_key, body)
+        
+        # Clients sending the ETag back get a 304 without the body
+        response = current_app.response_class(body, mimetype='application/json')
+        response.add_etag()
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        logger.error(f"Error getting products: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'Failed to retrieve products'
+        }), 500
+
+
+@products_bp.route('/products', methods=['POST'])
+@require_authentication
+def add_product():
+    """Add a new product to monitor."""
+    price_monitor = _price_monitor()
+    try:
+        too_large, data = _read_json_body()
+        if too_large:
+            return jsonify(_BODY_TOO_LARGE_ERROR), 413
+        
+        if not isinstance(data, dict) or not isinstance(data.get('url'), str):
+            return jsonify(_URL_REQUIRED_ERROR), 400
+        
+        url = data['url'].strip()
+        if not url:
+            return jsonify(_URL_EMPTY_ERROR), 400
+        
+        # Check if product already exists
+        existing_product = price_monitor.product_service.get_product_by_url(url)
+        if existing_product:
+            return jsonify({
+                'error': 'Product already exists',
+                'message': f'Product with URL {url} is already being monitored',
+                'product_id': existing_product.id
+            }), 409
+        
+        # Fetch and parse product information
+        logger.info(f"Adding new product: {url}")
+        
+        # Fetch page content
+        scraping_result = price_monitor.web_scraping_service.fetch_page_content(url)
+        if not scraping_result.success:
+            return jsonify({
+                'error': 'Failed to fetch product page',
+                'message': scraping_result.error_message
+            }), 400
+        
+        # Parse product information
+        parsing_result = price_monitor.parser_service.parse_product(url, scraping_result.page_content)
+        if not parsing_result.success:
+            return jsonify({
+                'error': 'Failed to parse product information',
+                'message': parsing_result.error_message
+            }), 400
+        
+        product_info = parsing_result.product_info
+        if not product_info or product_info.price is None:
+            return jsonify({
+                'error': 'Invalid product information',
+                'message': 'Could not extract price information from the page'
+            }), 400
+        
+        # Add product to database
+        product = price_monitor.product_service.add_product(
+            url=url,
+            name=product_info.name or 'Unknown Product',
+            price=product_info.price,
+            image_url=product_info.image_url
+        )
+        
+        if not product:
+            return jsonify({
+                'error': 'Failed to add product',
+                'message': 'Could not save product to database'
+            }), 500
+        
+        # Return product data
+        product_data = _serialize_product(product)
+        
+        price_monitor.invalidate_products_cache()
+        logger.info(f"Successfully added product: {product.name} (ID: {product.id})")
+        
+        return jsonify({
+            'message': 'Product added successfully',
+            'product': product_data,
+            'client_id': g.client_id
+        }), 201
+        
+    except Exception as e:
+        logger.error(f"Error adding product: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'Failed to add product'
+        }), 500
+
+
+@products_bp.route('/products/<int:product_id>', methods=['DELETE'])
+@require_authentication
+def delete_product(product_id):
+    """Delete a monitored product."""
+    price_monitor = _price_monitor()
+    try:
+        logger.info(f"DELETE request for product {product_id}, args: {request.args}")
+        
+        # Check for confirmation parameter
+        confirm = request.args.get('confirm', 'false').lower() == 'true'
+        logger.info(f"Confirmation parameter: {confirm}")
+        
+        # Check if product exists
+        product = price_monitor.get_product_cached(product_id)
+        if not product:
+            logger.warning(f"Product {product_id} not found")
+            return jsonify({
+                'error': 'Product not found',
+                'message': f'Product with ID {product_id} does not exist'
+            }), 404
+        
+        # If no confirmation, return product info for confirmation dialog
+        if not confirm:
+            logger.info(f"No confirmation, returning product info for {product_id}")
+            return jsonify({
+                'requires_confirmation': True,
+                'product': _summarize_product(product, _DELETE_CONFIRMATION_FIELDS),
+                'message': 'Deletion requires confirmation. Add ?confirm=true to proceed.',
+                'client_id': g.client_id
+            }), 200
+        
+        # Delete the product
+        logger.info(f"Attempting to delete product {product_id}: {product.name}")
+        success = price_monitor.product_service.delete_product(product_id)
+        
+        if not success:
+            logger.error(f"Failed to delete product {product_id} from database")
+            return jsonify({
+                'error': 'Failed to delete product',
+                'message': 'Could not delete product from database'
+            }), 500
+        
+        price_monitor.invalidate_products_cache()
+        logger.info(f"Successfully deleted product: {product.name} (ID: {product_id})")
+        
+        return jsonify({
+            'message': 'Product deleted successfully',
+            'product_id': product_id,
+            'product_name': product.name,
+            'client_id': g.client_id
+        })
+        
+    except Exception as e:
+        logger.error(f"Error deleting product {product_id}: {str(e)}", exc_info=True)
+        return jsonify({
+            'error': 'Internal server error',
+            'message': f'Failed to delete product: {str(e)}'
+        }), 500
+
+
+@products_bp.route('/products/<int:product_id>/price', methods=['PUT'])
+@require_authentication
+def update_product_price(product_id):
+    """Manually update a product's price."""
+    price_monitor = _price_monitor()
+    try:
+        too_large, data = _read_json_body()
+        if too_large:
+            return jsonify(_BODY_TOO_LARGE_ERROR), 413
+        
+        if not isinstance(data, dict) or 'price' not in data:
+            return jsonify(_PRICE_REQUIRED_ERROR), 400
+        
+        try:
+            price = float(data['price'])
+            if price < 0:
+                raise ValueError("Price cannot be negative")
+        except (ValueError, TypeError):
+            return jsonify(_INVALID_PRICE_ERROR), 400
+        
+        # Check if product exists
+        product = price_monitor.get_product_cached(product_id)
+        if not product:
+            return jsonify({
+                'error': 'Product not found',
+                'message': f'Product with ID {product_id} does not exist'
+            }), 404
+        
+        if not product.is_active:
+            return jsonify({
+                'error': 'Product not active',
+                'message': 'Cannot update price for inactive product'
+            }), 400
+        
+        # Use the price monitor service for manual updates (includes email notifications)
+        result = price_monitor.price_monitor_service.update_product_price_manually(product_id, price)
+        
+        if not result.success:
+            return jsonify({
+                'error': 'Failed to update price',
+                'message': result.error_message
+            }), 500
+        
+        price_monitor.invalidate_products_cache()
+        
+        # Get updated product data
+        updated_product = price_monitor.get_product_cached(product_id, refresh=True)
+        product_data = _serialize_product(updated_product)
+        
+        response_data = {
+            'message': 'Price updated successfully',
+            'product': product_data,
+            'price_change': {
+                'old_price': result.old_price,
+                'new_price': result.new_price,
+                'price_dropped': result.price_dropped,
+                'is_new_lowest': result.is_new_lowest
+            },
+            'notification': {
+                'sent': result.notification_sent,
+                'error': result.notification_error
+            },
+            'client_id': g.client_id
+        }
+        
+        logger.info(f"Successfully updated price for product {product_id}: ${result.old_price:.2f} -> ${result.new_price:.2f}")
+        
+        return jsonify(response_data)
+        
+    except Exception as e:
+        logger.error(f"Error updating price for product {product_id}: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'Failed to update product price'
+        }), 500
+
+
+@products_bp.route('/products/<int:product_id>/history', methods=['GET'])
+@require_authentication
+def get_price_history(product_id):
+    """Get price history for a product."""
+    price_monitor = _price_monitor()
+    try:
+        # Check if product exists
+        product = price_monitor.get_product_cached(product_id)
+        if not product:
+            return jsonify({
+                'error': 'Product not found',
+                'message': f'Product with ID {product_id} does not exist'
+            }), 404
+        
+        # Get query parameters
+        limit = request.args.get('limit', type=int)
+        if limit is not None and limit <= 0:
+            return jsonify({
+                'error': 'Invalid limit',
+                'message': 'Limit must be a positive number'
+            }), 400
+        
+        # Get price history
+        history = price_monitor.product_service.get_price_history(product_id, limit=limit)
+        
+        # Convert to JSON-serializable format
+        history_data = _serialize_price_history(history)
+        
+        # Get product summary
+        product_data = _summarize_product(product, _HISTORY_SUMMARY_FIELDS)
+        
+        return jsonify({
+            'product': product_data,
+            'history': history_data,
+            'count': len(history_data),
+            'client_id': g.client_id
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting price history for product {product_id}: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'Failed to retrieve price history'
+        }), 500
+
+
+@products_bp.route('/products/<int:product_id>', methods=['GET'])
+@require_authentication
+def get_product_details(product_id):
+    """Get detailed information for a specific product."""
+    price_monitor = _price_monitor()
+    try:
+        # Get product with its recent price history (last 10 entries)
+        product, recent_history = price_monitor.product_service.get_product_with_recent_history(
+            product_id, limit=10
+        )
+        if not product:
+            return jsonify({
+                'error': 'Product not found',
+                'message': f'Product with ID {product_id} does not exist'
+            }), 404
+        
+        # Convert to JSON-serializable format
+        product_data = _serialize_product(product)
+        history_data = _serialize_price_history(recent_history)
+        
+        return jsonify({
+            'product': product_data,
+            'recent_history': history_data,
+            'client_id': g.client_id
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting product details for {product_id}: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'Failed to retrieve product details'
+        }), 500
+
+
+@products_bp.route('/stats', methods=['GET'])
+@require_authentication
+def get_statistics():
+    """Get system statistics."""
+    price_monitor = _price_monitor()
+    try:
+        # Get product statistics
+        product_stats = price_monitor.product_service.get_product_statistics()
+        
+        # Get monitoring statistics
+        monitoring_stats = price_monitor.price_monitor_service.get_monitoring_stats()
+        
+        # Get next scheduled run
+        next_run = price_monitor.price_monitor_service.get_next_scheduled_run()
+        
+        return jsonify({
+            'products': product_stats,
+            'monitoring': monitoring_stats,
+            'next_scheduled_run': next_run.isoformat() if next_run else None,
+            'client_id': g.client_id
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting statistics: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'Failed to retrieve statistics'
+        }), 500
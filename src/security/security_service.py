@@ -3,8 +3,12 @@ Security service for mTLS certificate management and validation.
 """
 import ssl
 import os
+import hashlib
 import logging
-from typing import Optional, List
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, List, Tuple
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric import padding
@@ -13,6 +17,20 @@ from datetime import datetime, timezone
 
 from .models import CertificateBundle, AuthenticationResult, CertificateInfo
 
+# Successful client certificate validations are reused for at most this long,
+# and never past the certificate's NotAfter
+VALIDATION_CACHE_TTL_SECONDS = 300
+
+# The validation cache is dropped wholesale once it holds this many certificates
+VALIDATION_CACHE_MAX_ENTRIES = 1024
+
+# Parsed client certificates kept for reuse, least recently used evicted first
+CERTIFICATE_CACHE_MAX_ENTRIES = 256
+
+# TLS 1.3 session tickets issued per handshake; a client can resume one
+# connection per ticket without a full handshake
+TLS_SESSION_TICKETS = 2
+
 
 class SecurityService:
     """Service for handling mTLS authentication and certificate management."""
@@ -22,9 +40,21 @@ class SecurityService:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self._certificate_bundle: Optional[CertificateBundle] = None
+        # Parsed CA certificate, keyed by the PEM it was parsed from
+        self._ca_cert: Optional[Tuple[str, x509.Certificate]] = None
+        # SHA-256 of the client PEM -> (result, expiry as a Unix timestamp)
+        self._validation_cache: Dict[bytes, Tuple[AuthenticationResult, float]] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        # SHA-256 of a PEM -> certificate parsed from it
+        self._cert_cache: 'OrderedDict[bytes, x509.Certificate]' = OrderedDict()
+        # Guards both caches; mTLS requests are validated on many threads
+        self._cache_lock = threading.Lock()
         
     def load_certificates(self) -> CertificateBundle:
         """Load certificates from configured paths."""
+        with self._cache_lock:
+            self._validation_cache.clear()
+        
         # Skip certificate loading if mTLS is disabled
         if not getattr(self.config, 'enable_mtls', False):
             self.logger.info("mTLS disabled, skipping certificate loading")
@@ -98,10 +128,25 @@ class SecurityService:
         return client_certs
     
     def validate_client_certificate(self, cert_pem: str) -> AuthenticationResult:
-        """Validate a client certificate against the CA."""
+        """
+        Validate a client certificate against the CA.
+        
+        Successful results are cached by the SHA-256 of the whole PEM, so a
+        presented chain only hits the cache if every certificate in it is
+        unchanged. Failures are always re-validated.
+        """
+        cache_key = hashlib.sha256(cert_pem.encode()).digest()
+        with self._cache_lock:
+            cached = self._validation_cache.get(cache_key)
+            if cached is not None:
+                result, expires_at = cached
+                if time.time() < expires_at and self._is_ca_current():
+                    return result
+                self._validation_cache.pop(cache_key, None)
+        
         try:
             # Parse the client certificate
-            cert = x509.load_pem_x509_certificate(cert_pem.encode(), default_backend())
+            cert = self._load_certificate(cert_pem, cache_key)
             
             # Get certificate info
             cert_info = self._get_certificate_info(cert)
@@ -126,12 +171,19 @@ class SecurityService:
             client_id = self._extract_client_id(cert)
             
             self.logger.info(f"Successfully authenticated client: {client_id}")
-            return AuthenticationResult(
+            result = AuthenticationResult(
                 is_authenticated=True,
                 client_id=client_id,
                 error_message=None
             )
             
+            expires_at = min(time.time() + VALIDATION_CACHE_TTL_SECONDS, cert_info.not_after.timestamp())
+            with self._cache_lock:
+                if len(self._validation_cache) >= VALIDATION_CACHE_MAX_ENTRIES:
+                    self._validation_cache.clear()
+                self._validation_cache[cache_key] = (result, expires_at)
+            return result
+            
         except Exception as e:
             self.logger.error(f"Certificate validation failed: {e}")
             return AuthenticationResult(
@@ -174,11 +226,7 @@ class SecurityService:
             if not self._certificate_bundle:
                 raise ValueError("Certificate bundle not loaded")
             
-            # Load CA certificate
-            ca_cert = x509.load_pem_x509_certificate(
-                self._certificate_bundle.ca_cert.encode(), 
-                default_backend()
-            )
+            ca_cert = self._get_ca_certificate()
             
             # Check if the certificate was issued by the CA
             # Compare issuer of the cert with subject of the CA
@@ -231,6 +279,48 @@ class SecurityService:
             self.logger.error(f"CA validation failed: {e}")
             return False
     
+    def _load_certificate(self, cert_pem: str, cache_key: Optional[bytes] = None) -> x509.Certificate:
+        """
+        Parse a PEM certificate, reusing the result for a PEM seen before.
+        
+        Args:
+            cert_pem: PEM encoded certificate
+            cache_key: SHA-256 of cert_pem if the caller already computed it
+            
+        Returns:
+            Parsed certificate
+        """
+        if cache_key is None:
+            cache_key = hashlib.sha256(cert_pem.encode()).digest()
+        
+        with self._cache_lock:
+            cert = self._cert_cache.get(cache_key)
+            if cert is not None:
+                self._cert_cache.move_to_end(cache_key)
+                return cert
+        
+        cert = x509.load_pem_x509_certificate(cert_pem.encode(), default_backend())
+        with self._cache_lock:
+            self._cert_cache[cache_key] = cert
+            if len(self._cert_cache) > CERTIFICATE_CACHE_MAX_ENTRIES:
+                self._cert_cache.popitem(last=False)
+        return cert
+    
+    def _is_ca_current(self) -> bool:
+        """Check that the parsed CA certificate matches the loaded bundle."""
+        return (self._certificate_bundle is not None and self._ca_cert is not None
+                and self._ca_cert[0] == self._certificate_bundle.ca_cert)
+    
+    def _get_ca_certificate(self) -> x509.Certificate:
+        """Return the parsed CA certificate, parsing it only when the bundle's CA changes."""
+        ca_pem = self._certificate_bundle.ca_cert
+        if self._ca_cert is None or self._ca_cert[0] != ca_pem:
+            self._ca_cert = (ca_pem, x509.load_pem_x509_certificate(ca_pem.encode(), default_backend()))
+            # Results validated against a different CA no longer apply
+            with self._cache_lock:
+                self._validation_cache.clear()
+        return self._ca_cert[1]
+    
     def _extract_client_id(self, cert: x509.Certificate) -> str:
         """Extract client ID from certificate subject."""
         try:
@@ -272,12 +362,31 @@ class SecurityService:
         context.minimum_version = ssl.TLSVersion.TLSv1_2
         context.set_ciphers('ECDHE+AESGCM:ECDHE+CHACHA20:DHE+AESGCM:DHE+CHACHA20:!aNULL:!MD5:!DSS')
         
+        # Let returning clients resume instead of repeating the full handshake.
+        # The server session cache (TLS 1.2) and session tickets (TLS 1.3) are
+        # per context, so the same context must serve every connection.
+        context.num_tickets = TLS_SESSION_TICKETS
+        
+        self._ssl_context = context
         self.logger.info("SSL context configured for mTLS")
         return context
     
+    def get_tls_session_stats(self) -> Dict[str, int]:
+        """
+        Get TLS session statistics for the context from setup_mtls_context().
+        
+        Returns:
+            Dictionary with OpenSSL session counters, e.g. 'accept' for full
+            handshakes and 'hits' for resumed sessions; empty if no context
+            has been created
+        """
+        if self._ssl_context is None:
+            return {}
+        return self._ssl_context.session_stats()
+    
     def get_certificate_info(self, cert_pem: str) -> CertificateInfo:
         """Get detailed information about a certificate."""
-        cert = x509.load_pem_x509_certificate(cert_pem.encode(), default_backend())
+        cert = self._load_certificate(cert_pem)
         return self._get_certificate_info(cert)
     
     def is_certificate_valid(self, cert_pem: str) -> bool:
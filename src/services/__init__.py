@@ -2,10 +2,23 @@
 Services package for the Price Monitor application.
 """
 
-from .config_service import ConfigService
-from .product_service import ProductService
+import importlib
+
+# Resolved on first access; ProductService needs SQLAlchemy, ConfigService does not.
+_LAZY_EXPORTS = {
+    'ConfigService': '.config_service',
+    'ProductService': '.product_service',
+}
 
 __all__ = [
     'ConfigService',
     'ProductService'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
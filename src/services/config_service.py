@@ -2,6 +2,9 @@
 Configuration service for loading and validating application settings.
 """
 import os
+import re
+import copy
+import functools
 import configparser
 from pathlib import Path
 from typing import Optional, Dict, Any
@@ -10,12 +13,59 @@ import logging
 from ..models.config import Config, ConfigValidationError, ConfigValidationResult
 
 
+# Compiled once at import time; validate_config runs on every (re)load
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Template written by create_default_config_file
+_DEFAULT_CONFIG_CONTENT = """# Price Monitor Configuration File
+
+[database]
+path = data/database.db
+
+[email]
+smtp_server = smtp.gmail.com
+smtp_port = 587
+username = your-email@gmail.com
+password = your-app-password
+recipient = recipient@example.com
+
+[monitoring]
+check_frequency_hours = 24
+check_time = 09:00
+max_retry_attempts = 3
+request_timeout_seconds = 30
+
+[ai]
+api_key = 
+api_endpoint = 
+enable_parsing = false
+
+[security]
+enable_mtls = false
+server_cert_path = certs/server.crt
+server_key_path = certs/server.key
+ca_cert_path = certs/ca.crt
+client_cert_required = true
+api_port = 5000
+
+[app]
+log_level = INFO
+log_file_path = logs/price_monitor.log
+"""
+
+
 class ConfigService:
     """Service for loading and validating application configuration."""
     
+    # Config built from _DEFAULT_CONFIG_CONTENT, shared by all instances
+    _default_config: Optional[Config] = None
+    
     def __init__(self, config_path: Optional[str] = None):
         self.logger = logging.getLogger(__name__)
         self._config = None
+        # Parsed configs keyed by (path, mtime, size), so reloading an
+        # unchanged file skips reading and parsing it again
+        self._parse_config_cached = functools.lru_cache(maxsize=8)(self._parse_config_file)
         if config_path:
             self._config = self.load_config(config_path)
     
@@ -50,11 +100,12 @@ class ConfigService:
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
         
-        # Load configuration from file
-        config_data = self._load_config_file(config_path)
-        
-        # Create Config object
-        config = self._create_config_from_data(config_data)
+        # Load and parse the file, reusing the previous parse if it is unchanged.
+        # Callers get their own copy so mutating it cannot poison the cache.
+        stat = os.stat(config_path)
+        config = copy.copy(self._parse_config_cached(
+            os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size
+        ))
         
         # Validate configuration
         validation_result = self.validate_config(config)
@@ -72,6 +123,16 @@ class ConfigService:
         self._config = config
         return config
     
+    def _parse_config_file(self, config_path: str, mtime_ns: int, size: int) -> Config:
+        """
+        Read and parse a configuration file into a Config object.
+        
+        The modification time and size are not used directly; they are part
+        of the cache key so that edits to the file invalidate the cached parse.
+        """
+        config_data = self._load_config_file(config_path)
+        return self._create_config_from_data(config_data)
+    
     def _load_config_file(self, config_path: str) -> Dict[str, Any]:
         """Load configuration data from file."""
         config_parser = configparser.ConfigParser()
@@ -81,6 +142,10 @@ class ConfigService:
         except configparser.Error as e:
             raise ValueError(f"Failed to parse configuration file: {e}")
         
+        return self._config_parser_to_dict(config_parser)
+    
+    def _config_parser_to_dict(self, config_parser: configparser.ConfigParser) -> Dict[str, Any]:
+        """Flatten parsed sections into a ``section.key`` dictionary."""
         # Convert to flat dictionary
         config_data = {}
         for section in config_parser.sections():
@@ -154,6 +219,10 @@ class ConfigService:
             "log_level": ("log_level", str),
             "app.log_file_path": ("log_file_path", str),
             "log_file_path": ("log_file_path", str),
+            
+            # Logging and monitoring settings
+            "logging.enable_server_timing": ("enable_server_timing", bool),
+            "enable_server_timing": ("enable_server_timing", bool),
         }
         
         # Start with default Config
@@ -225,7 +294,7 @@ class ConfigService:
                 "recipient_email", 
                 "Recipient email is required for notifications"
             ))
-        elif "@" not in config.recipient_email:
+        elif not _EMAIL_RE.match(config.recipient_email):
             errors.append(ConfigValidationError(
                 "recipient_email", 
                 "Recipient email must be a valid email address"
@@ -295,60 +364,36 @@ class ConfigService:
                 "warning"
             ))
         
-        all_issues = errors + warnings
         return ConfigValidationResult(
             is_valid=len(errors) == 0,
-            errors=all_issues,
-            warnings=[]
+            errors=errors,
+            warnings=warnings
         )
     
-    def create_default_config_file(self, config_path: str) -> None:
+    def create_default_config_file(self, config_path: str) -> Config:
         """
         Create a default configuration file with example settings.
         
         Args:
             config_path: Path where to create the config file
+            
+        Returns:
+            Config matching the file that was written, so callers do not
+            need to read and parse it back
         """
-        config_content = """# Price Monitor Configuration File
-
-[database]
-path = data/database.db
-
-[email]
-smtp_server = smtp.gmail.com
-smtp_port = 587
-username = your-email@gmail.com
-password = your-app-password
-recipient = recipient@example.com
-
-[monitoring]
-check_frequency_hours = 24
-check_time = 09:00
-max_retry_attempts = 3
-request_timeout_seconds = 30
-
-[ai]
-api_key = 
-api_endpoint = 
-enable_parsing = false
-
-[security]
-enable_mtls = false
-server_cert_path = certs/server.crt
-server_key_path = certs/server.key
-ca_cert_path = certs/ca.crt
-client_cert_required = true
-api_port = 5000
-
-[app]
-log_level = INFO
-log_file_path = logs/price_monitor.log
-"""
-        
         # Ensure directory exists
         os.makedirs(os.path.dirname(config_path), exist_ok=True)
         
         with open(config_path, 'w') as f:
-            f.write(config_content)
+            f.write(_DEFAULT_CONFIG_CONTENT)
+        
+        self.logger.info(f"Created default configuration file: {config_path}")
         
-        self.logger.info(f"Created default configuration file: {config_path}")
\ No newline at end of file
+        # The template never changes, so it is parsed at most once per process
+        if ConfigService._default_config is None:
+            config_parser = configparser.ConfigParser()
+            config_parser.read_string(_DEFAULT_CONFIG_CONTENT)
+            ConfigService._default_config = self._create_config_from_data(
+                self._config_parser_to_dict(config_parser)
+            )
+        return copy.copy(ConfigService._default_config)
\ No newline at end of file
@@ -1,10 +1,12 @@
 """
 Comprehensive logging and monitoring service for the price monitoring application.
 """
+import atexit
 import json
 import logging
 import logging.handlers
 import os
+import queue
 import sys
 import time
 import traceback
@@ -15,6 +17,8 @@ from dataclasses import dataclass, asdict
 from contextlib import contextmanager
 import threading
 
+from ..models.config import LOG_LEVELS
+
 
 @dataclass
 class LogEntry:
@@ -86,6 +90,47 @@ class JSONFormatter(logging.Formatter):
         return json.dumps(asdict(log_entry), default=str)
 
 
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler for a QueueListener in the same process.
+    
+    The stock handler formats each record before queueing it and drops the
+    exception info, which would leave JSONFormatter without the structured
+    exception data. Records here only have their message merged, and the
+    listener's handlers do all formatting.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the message arguments and pass the record on otherwise unchanged."""
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _detach_queue_handler(handler: LocalQueueHandler):
+    """
+    Stop a queue handler's listener and log through its handlers directly.
+    
+    Queued records are written first, and the listener's handlers then
+    replace the queue handler on the root logger so later log calls land.
+    """
+    listener = handler.listener
+    listener.stop()
+    handler.listener = None
+    root_logger = logging.getLogger()
+    root_logger.removeHandler(handler)
+    for listener_handler in listener.handlers:
+        root_logger.addHandler(listener_handler)
+
+
+@atexit.register
+def _stop_queue_listeners():
+    """Write out queued records on exit; the listener thread is a daemon and would drop them."""
+    for handler in logging.getLogger().handlers[:]:
+        if isinstance(handler, LocalQueueHandler) and handler.listener:
+            _detach_queue_handler(handler)
+
+
 class PerformanceMonitor:
     """Performance monitoring and metrics collection."""
     
@@ -273,6 +318,9 @@ class LoggingService:
         self.config = config
         self.performance_monitor = PerformanceMonitor()
         self.error_tracker = ErrorTracker()
+        self._log_queue = None
+        self._queue_handler = None
+        self._listener = None
         self._setup_logging()
         self.logger = logging.getLogger(__name__)
         self.logger.info("Logging service initialized")
@@ -283,13 +331,16 @@ class LoggingService:
         log_dir = Path(self.config.log_file_path).parent
         log_dir.mkdir(parents=True, exist_ok=True)
         
-        # Clear existing handlers
+        # Clear existing handlers, stopping the listener of a previous service
         root_logger = logging.getLogger()
         for handler in root_logger.handlers[:]:
             root_logger.removeHandler(handler)
+            if isinstance(handler, LocalQueueHandler) and handler.listener:
+                handler.listener.stop()
+                handler.listener = None
         
         # Set log level
-        log_level = getattr(logging, self.config.log_level.upper(), logging.INFO)
+        log_level = LOG_LEVELS.get(self.config.log_level.upper(), logging.INFO)
         root_logger.setLevel(log_level)
         
         # Create formatters
@@ -324,10 +375,20 @@ class LoggingService:
         error_handler.setFormatter(json_formatter)
         error_handler.setLevel(logging.ERROR)
         
-        # Add handlers to root logger
-        root_logger.addHandler(file_handler)
-        root_logger.addHandler(console_handler)
-        root_logger.addHandler(error_handler)
+        # Log calls only enqueue records; a background listener thread writes
+        # them, so request handlers never wait on disk or console I/O
+        self._log_queue = queue.Queue()
+        self._listener = logging.handlers.QueueListener(
+            self._log_queue,
+            file_handler,
+            console_handler,
+            error_handler,
+            respect_handler_level=True
+        )
+        self._queue_handler = LocalQueueHandler(self._log_queue)
+        self._queue_handler.listener = self._listener
+        self._listener.start()
+        root_logger.addHandler(self._queue_handler)
         
         # Setup log retention cleanup
         self._setup_log_retention()
@@ -347,6 +408,23 @@ class LoggingService:
             except Exception as e:
                 self.logger.warning(f"Failed to clean up log file {log_file}: {e}")
     
+    def flush(self):
+        """Block until every record logged so far has been written."""
+        if self._queue_handler and self._queue_handler.listener:
+            self._log_queue.join()
+    
+    def shutdown(self):
+        """
+        Stop the background log writer.
+        
+        Queued records are written first, and the writer's handlers are then
+        attached to the root logger directly so later log calls still land.
+        """
+        if not self._queue_handler or not self._queue_handler.listener:
+            return
+        
+        _detach_queue_handler(self._queue_handler)
+    
     def log_with_context(self, level: str, message: str, **context):
         """Log message with additional context data."""
         logger = logging.getLogger('app')
@@ -172,18 +172,20 @@ class PriceMonitorService:
         self._failed_urls: Dict[str, datetime] = {}  # URL -> last failure time
         self._consecutive_failures: Dict[int, int] = {}  # product_id -> failure count
     
-    def check_product(self, product_id: int) -> PriceCheckResult:
+    def check_product(self, product_id: int, product: Optional[Product] = None) -> PriceCheckResult:
         """
         Check the price for a single product with retry logic.
         
         Args:
             product_id: ID of the product to check
+            product: Already loaded product, to skip looking it up again
             
         Returns:
             PriceCheckResult with the check outcome
         """
         # Get the product
-        product = self.product_service.get_product(product_id)
+        if product is None:
+            product = self.product_service.get_product(product_id)
         if not product:
             return PriceCheckResult.error_result(
                 product_id, "Unknown", "", f"Product with ID {product_id} not found"
@@ -417,9 +419,10 @@ class PriceMonitorService:
         
         # Use ThreadPoolExecutor for concurrent processing
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
+            # Submit all tasks. Fetches overlap across workers; each task reuses
+            # the product loaded above instead of querying it again.
             future_to_product = {
-                executor.submit(self.check_product, product.id): product 
+                executor.submit(self.check_product, product.id, product): product 
                 for product in products
             }
             
@@ -501,12 +504,7 @@ class PriceMonitorService:
             return
         
         self.schedule_daily_checks(check_time)
-        self._stop_scheduler.clear()
-        self._scheduler_running = True
-        
-        # Start scheduler thread
-        self._scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-        self._scheduler_thread.start()
+        self._start_scheduler_thread()
         
         self.logger.info("Price monitoring scheduler started")
     
@@ -539,12 +537,7 @@ class PriceMonitorService:
             frequency_minutes = int(frequency_hours * 60)
             schedule.every(frequency_minutes).minutes.do(self._scheduled_check_wrapper)
         
-        self._stop_scheduler.clear()
-        self._scheduler_running = True
-        
-        # Start scheduler thread
-        self._scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-        self._scheduler_thread.start()
+        self._start_scheduler_thread()
         
         self.logger.info(f"Price monitoring scheduler started (every {frequency_hours} hours)")
     
@@ -559,19 +552,42 @@ class PriceMonitorService:
         
         if self._scheduler_thread and self._scheduler_thread.is_alive():
             self._scheduler_thread.join(timeout=5)
+            if self._scheduler_thread.is_alive():
+                # A check in progress keeps running; its loop exits on its
+                # own stop event once the check returns
+                self.logger.warning("Scheduler thread still finishing a price check; it will stop afterwards")
         
         schedule.clear()
         self.logger.info("Price monitoring scheduler stopped")
     
-    def _run_scheduler(self) -> None:
-        """Run the scheduler loop."""
-        while not self._stop_scheduler.is_set():
+    def _start_scheduler_thread(self) -> None:
+        """Start the scheduler loop in a background thread."""
+        # Each thread gets its own stop event, so restarting the scheduler can
+        # never revive a previous loop that is still finishing a check
+        self._stop_scheduler = threading.Event()
+        self._scheduler_running = True
+        
+        self._scheduler_thread = threading.Thread(
+            target=self._run_scheduler,
+            args=(self._stop_scheduler,),
+            daemon=True
+        )
+        self._scheduler_thread.start()
+    
+    def _run_scheduler(self, stop_event: threading.Event) -> None:
+        """
+        Run the scheduler loop until stop_event is set.
+        
+        Args:
+            stop_event: Event that ends the loop; waiting on it instead of
+                sleeping lets stop_scheduler() return without delay
+        """
+        while not stop_event.is_set():
             try:
                 schedule.run_pending()
-                time.sleep(60)  # Check every minute
             except Exception as e:
                 self.logger.error(f"Error in scheduler loop: {str(e)}")
-                time.sleep(60)
+            stop_event.wait(60)  # Check every minute
     
     def _scheduled_check_wrapper(self) -> None:
         """Wrapper for scheduled checks with error handling."""
@@ -772,17 +788,11 @@ class PriceMonitorService:
             if not product:
                 return {'error': 'Product not found'}
             
-            # Get price history for the period
-            price_history = self.product_service.get_price_history(product_id)
-            
-            # Filter by date range
+            # Get prices for the period, oldest first
             cutoff_date = datetime.now() - timedelta(days=days)
-            recent_history = [
-                entry for entry in price_history 
-                if entry.recorded_at >= cutoff_date
-            ]
+            _, prices = self.product_service.get_price_series(product_id, since=cutoff_date)
             
-            if not recent_history:
+            if not prices:
                 return {
                     'product_name': product.name,
                     'current_price': product.current_price,
@@ -792,15 +802,14 @@ class PriceMonitorService:
                     'price_trend': 'stable'
                 }
             
-            prices = [entry.price for entry in recent_history]
-            price_changes = len(recent_history) - 1
+            price_changes = len(prices) - 1
             average_price = sum(prices) / len(prices)
             
-            # Determine trend (prices[0] is most recent, prices[-1] is oldest)
+            # Determine trend (prices[0] is oldest, prices[-1] is most recent)
             if len(prices) >= 2:
-                if prices[0] > prices[-1]:  # Most recent > oldest = increasing
+                if prices[-1] > prices[0]:  # Most recent > oldest = increasing
                     trend = 'increasing'
-                elif prices[0] < prices[-1]:  # Most recent < oldest = decreasing
+                elif prices[-1] < prices[0]:  # Most recent < oldest = decreasing
                     trend = 'decreasing'
                 else:
                     trend = 'stable'
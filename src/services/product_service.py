@@ -2,13 +2,235 @@
 Product service for managing products and price history in the Price Monitor application.
 """
 
+import functools
+import time
+from array import array
 from datetime import datetime
-from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, insert, update, select, bindparam, case, literal_column, true, tuple_
 
-from ..models.database import Product, PriceHistory, DatabaseManager
+from ..models.database import Product, PriceHistory, DatabaseManager, casefold
+
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER; multi-row inserts stay below it
+SQLITE_MAX_VARIABLES = 999
+
+# Upper bound on rows per multi-row INSERT statement
+MAX_ROWS_PER_INSERT = 100
+
+_PRODUCT_INSERT_COLUMNS = (
+    'url', 'name', 'current_price', 'previous_price', 'lowest_price',
+    'image_url', 'created_at', 'last_checked', 'is_active'
+)
+_PRICE_HISTORY_INSERT_COLUMNS = ('product_id', 'price', 'recorded_at', 'source')
+
+# get_product_statistics() results are reused for this long. Writes made
+# through the same ProductService clear them immediately; writes from other
+# instances show up after at most this delay.
+STATISTICS_CACHE_TTL_SECONDS = 30
+
+# Fields query_products() can sort by
+PRODUCT_SORT_FIELDS = (
+    'name', 'current_price', 'previous_price', 'lowest_price', 'created_at', 'last_checked'
+)
+_NULLABLE_SORT_FIELDS = frozenset({'last_checked'})
+
+
+def _chunked(rows: List[Any], max_rows: int) -> List[List[Any]]:
+    """Split rows into chunks of at most max_rows rows."""
+    return [rows[i:i + max_rows] for i in range(0, len(rows), max_rows)]
+
+
+# DBAPI paramstyles whose placeholders _multi_row_insert_sql() can write
+_MULTI_ROW_INSERT_PARAMSTYLES = frozenset({'qmark', 'format', 'pyformat'})
+
+
+@functools.lru_cache(maxsize=32)
+def _multi_row_insert_sql(table: str, columns: Sequence[str], row_count: int,
+                          placeholder: str, returning: str = '') -> str:
+    """
+    Build an ``INSERT ... VALUES (...), (...)`` statement for row_count rows.
+    
+    Statements are cached per size, so a bulk load only ever builds the
+    full-chunk statement and one for the leftover rows.
+    """
+    row = "(" + ",".join([placeholder] * len(columns)) + ")"
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {','.join([row] * row_count)}"
+    if returning:
+        sql += f" RETURNING {returning}"
+    return sql
+
+
+def _supports_multi_row_insert(dialect) -> bool:
+    """
+    Whether the raw multi-row INSERT ... RETURNING statements can be used.
+    
+    They need RETURNING on INSERT and a positional paramstyle that the
+    ``?`` or ``%s`` placeholders cover.
+    """
+    return (
+        dialect.insert_returning
+        and dialect.paramstyle in _MULTI_ROW_INSERT_PARAMSTYLES
+    )
+
+
+def _to_cents(price: Any) -> int:
+    """Convert a float or Decimal price to whole cents, rounding half up."""
+    return int((Decimal(str(price)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _normalize_price(price: Any) -> float:
+    """Round a price to whole cents so stored values compare exactly."""
+    return _to_cents(price) / 100
+
+
+# SQL expression query_products() orders by for each sort field. Expressions
+# must stay identical to the products sort indexes declared in
+# models.database, or SQLite cannot use them. NULL timestamps sort first
+# ascending and last descending in SQLite, the same as treating them as the
+# oldest possible value. Names sort by their Unicode case fold, matching
+# Python's ordering of str.casefold() values.
+_PRODUCT_SORT_COLUMNS = {
+    'name': casefold(Product.name),
+    'current_price': Product.current_price,
+    'previous_price': func.coalesce(Product.previous_price, literal_column('0')),
+    'lowest_price': Product.lowest_price,
+    'created_at': Product.created_at,
+    'last_checked': Product.last_checked,
+}
+
+# ORDER BY clauses keyed by (sort field, descending), with id breaking ties
+_PRODUCT_ORDER_BY = {
+    (sort_by, descending): (
+        (column.desc(), Product.id.desc()) if descending else (column.asc(), Product.id.asc())
+    )
+    for sort_by, column in _PRODUCT_SORT_COLUMNS.items()
+    for descending in (False, True)
+}
+
+
+# Change from previous_price to current_price, NULL when there is no previous
+# price or it did not change. Listings select these alongside each product so
+# the API does not redo the arithmetic per row.
+_PRICE_CHANGE_AMOUNT = case(
+    ((Product.previous_price != 0) & (Product.previous_price != Product.current_price),
+     Product.current_price - Product.previous_price)
+)
+_PRICE_CHANGE_COLUMNS = (
+    _PRICE_CHANGE_AMOUNT.label('price_change_amount'),
+    (_PRICE_CHANGE_AMOUNT / Product.previous_price * 100).label('price_change_percentage'),
+)
+
+
+# A price drop, compared in whole cents like _to_cents() so float noise in
+# the stored prices cannot register as one. False when there is no previous
+# price.
+_products = Product.__table__
+_PRICE_DROPPED = func.round(_products.c.current_price * 100) < func.round(_products.c.previous_price * 100)
+
+
+def _listed_product(product: Product, change_amount: Optional[float],
+                    change_percentage: Optional[float]) -> Product:
+    """Detach a listed product, carrying its _PRICE_CHANGE_COLUMNS values as attributes."""
+    detached_product = Product(
+        id=product.id,
+        url=product.url,
+        name=product.name,
+        current_price=product.current_price,
+        previous_price=product.previous_price,
+        lowest_price=product.lowest_price,
+        image_url=product.image_url,
+        created_at=product.created_at,
+        last_checked=product.last_checked,
+        is_active=product.is_active
+    )
+    detached_product.price_change_amount = change_amount
+    detached_product.price_change_percentage = change_percentage
+    return detached_product
+
+
+def _filter_products(query, active_only: bool, search: Optional[str]):
+    """Apply the product listing filters to a Product query."""
+    if active_only:
+        query = query.filter(Product.is_active == True)
+    if search:
+        if query.session.get_bind().dialect.name == 'sqlite':
+            # SQLite's LIKE and lower() only ignore ASCII case, so both sides
+            # are folded with str.casefold() to also match accented letters
+            # in either case
+            folded_search = search.casefold()
+            query = query.filter(
+                casefold(Product.name).contains(folded_search, autoescape=True) |
+                casefold(Product.url).contains(folded_search, autoescape=True)
+            )
+        else:
+            # LIKE is case-sensitive on other backends such as PostgreSQL
+            query = query.filter(
+                Product.name.icontains(search, autoescape=True) |
+                Product.url.icontains(search, autoescape=True)
+            )
+    return query
+
+
+def _keyset_condition(sort_by: str, sort_column, sort_order: str, anchor_value: Any, anchor_id: int):
+    """
+    Build the WHERE clause selecting rows after an anchor row in listing order.
+    
+    Rows are ordered by (sort_column, id). Only last_checked can be NULL;
+    SQLite puts NULLs first ascending and last descending, which the extra
+    branches account for.
+    """
+    if sort_order == 'desc':
+        if sort_by not in _NULLABLE_SORT_FIELDS:
+            return tuple_(sort_column, Product.id) < tuple_(anchor_value, anchor_id)
+        if anchor_value is None:
+            return sort_column.is_(None) & (Product.id < anchor_id)
+        return (tuple_(sort_column, Product.id) < tuple_(anchor_value, anchor_id)) | sort_column.is_(None)
+    
+    if sort_by not in _NULLABLE_SORT_FIELDS or anchor_value is not None:
+        return tuple_(sort_column, Product.id) > tuple_(anchor_value, anchor_id)
+    return sort_column.isnot(None) | (sort_column.is_(None) & (Product.id > anchor_id))
+
+
+def _db_datetime(value: datetime) -> str:
+    """Format a datetime the way SQLAlchemy stores DateTime columns in SQLite."""
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def _build_price_update_statement():
+    """
+    Build the UPDATE that records a new price for one product.
+    
+    Expects ``product_id``, ``new_price`` and ``checked_at`` bind parameters.
+    The previous and lowest prices are derived from the stored row in SQL,
+    so no SELECT is needed beforehand.
+    """
+    products = Product.__table__
+    new_price = bindparam('new_price')
+    return (
+        update(products)
+        .where(products.c.id == bindparam('product_id'))
+        .values(
+            previous_price=products.c.current_price,
+            current_price=new_price,
+            lowest_price=case(
+                (new_price < products.c.lowest_price, new_price),
+                else_=products.c.lowest_price
+            ),
+            last_checked=bindparam('checked_at')
+        )
+    )
+
+
+# Statements used on every price update are built once and reused, so each
+# call only binds parameters; SQLAlchemy's compiled cache and sqlite3's
+# per-connection statement cache then skip recompiling and re-preparing them.
+_PRICE_UPDATE_STMT = _build_price_update_statement()
+_PRICE_HISTORY_INSERT_STMT = insert(PriceHistory.__table__)
 
 
 class ProductService:
@@ -22,6 +244,8 @@ class ProductService:
             db_manager: Database manager instance
         """
         self.db_manager = db_manager
+        # (expiry as a monotonic timestamp, statistics) or None
+        self._statistics_cache: Optional[Tuple[float, dict]] = None
     
     def add_product(self, url: str, name: str, price: float, image_url: Optional[str] = None) -> Optional[Product]:
         """
@@ -37,6 +261,7 @@ class ProductService:
             Product instance if successful, None if failed
         """
         try:
+            price = _normalize_price(price)
             session = self.db_manager.get_session()
             try:
                 # Check if product with this URL already exists
@@ -59,6 +284,7 @@ class ProductService:
                 
                 session.add(product)
                 session.commit()
+                self._statistics_cache = None
                 session.refresh(product)
                 
                 # Add initial price history entry
@@ -93,6 +319,141 @@ class ProductService:
             print(f"Error adding product: {e}")
             return None
     
+    def add_products_bulk(self, records: List[Dict[str, Any]]) -> List[Product]:
+        """
+        Add several products in a single transaction.
+        
+        Each record is a dict with the same keys as ``add_product`` arguments
+        (``url``, ``name``, ``price`` and optional ``image_url``). All products
+        and their initial price history entries are written inside one
+        transaction, so the batch costs a single commit. Multi-row INSERT
+        statements are used where the database supports them, and executemany
+        everywhere else.
+        
+        Args:
+            records: List of product records
+            
+        Returns:
+            List of detached Product instances in input order, empty list if failed
+        """
+        if not records:
+            return []
+        
+        try:
+            session = self.db_manager.get_session()
+            try:
+                urls = [record['url'] for record in records]
+                if len(set(urls)) != len(urls):
+                    raise ValueError("Duplicate URLs in bulk product records")
+                
+                for url_chunk in _chunked(urls, SQLITE_MAX_VARIABLES):
+                    existing_url = session.execute(
+                        select(Product.url).where(Product.url.in_(url_chunk)).limit(1)
+                    ).scalar()
+                    if existing_url:
+                        raise ValueError(f"Product with URL {existing_url} already exists")
+                
+                now = datetime.now()
+                product_rows = [
+                    {
+                        'url': record['url'],
+                        'name': record['name'],
+                        'current_price': _normalize_price(record['price']),
+                        'previous_price': None,
+                        'lowest_price': _normalize_price(record['price']),
+                        'image_url': record.get('image_url'),
+                        'created_at': now,
+                        'last_checked': now,
+                        'is_active': True
+                    }
+                    for record in records
+                ]
+                
+                connection = session.connection()
+                if _supports_multi_row_insert(connection.dialect):
+                    product_ids = self._insert_products_multi_row(connection, product_rows, now)
+                else:
+                    # Portable path: executemany without RETURNING, then the
+                    # new ids are mapped back by their unique URLs
+                    session.execute(insert(Product), product_rows)
+                    ids_by_url = {}
+                    for url_chunk in _chunked(urls, SQLITE_MAX_VARIABLES):
+                        ids_by_url.update(session.execute(
+                            select(Product.url, Product.id).where(Product.url.in_(url_chunk))
+                        ).all())
+                    product_ids = [ids_by_url[row['url']] for row in product_rows]
+                    session.execute(insert(PriceHistory), [
+                        {
+                            'product_id': product_id,
+                            'price': row['current_price'],
+                            'recorded_at': now,
+                            'source': 'manual'
+                        }
+                        for product_id, row in zip(product_ids, product_rows)
+                    ])
+                
+                session.commit()
+                self._statistics_cache = None
+                
+                return [
+                    Product(id=product_id, **row)
+                    for product_id, row in zip(product_ids, product_rows)
+                ]
+                
+            finally:
+                session.close()
+                
+        except SQLAlchemyError as e:
+            print(f"Database error adding products: {e}")
+            return []
+        except Exception as e:
+            print(f"Error adding products: {e}")
+            return []
+    
+    def _insert_products_multi_row(self, connection, product_rows: List[Dict[str, Any]],
+                                   now: datetime) -> List[int]:
+        """
+        Insert products and their initial price history with multi-row VALUES.
+        
+        The statements are built once per chunk size and executed directly on
+        the DBAPI cursor, so a batch costs a handful of statements instead of
+        one per row. Only used when _supports_multi_row_insert() allows it.
+        
+        Returns:
+            The new product ids in product_rows order
+        """
+        placeholder = '?' if connection.dialect.paramstyle == 'qmark' else '%s'
+        db_now = _db_datetime(now)
+        
+        ids_by_url = {}
+        rows_per_insert = min(MAX_ROWS_PER_INSERT, SQLITE_MAX_VARIABLES // len(_PRODUCT_INSERT_COLUMNS))
+        for chunk in _chunked(product_rows, rows_per_insert):
+            sql = _multi_row_insert_sql(
+                Product.__tablename__, _PRODUCT_INSERT_COLUMNS, len(chunk), placeholder, 'id, url'
+            )
+            params = tuple(chain.from_iterable(
+                (row['url'], row['name'], row['current_price'], None, row['lowest_price'],
+                 row['image_url'], db_now, db_now, True)
+                for row in chunk
+            ))
+            ids_by_url.update(
+                (url, product_id) for product_id, url in connection.exec_driver_sql(sql, params)
+            )
+        product_ids = [ids_by_url[row['url']] for row in product_rows]
+        
+        rows_per_insert = min(MAX_ROWS_PER_INSERT, SQLITE_MAX_VARIABLES // len(_PRICE_HISTORY_INSERT_COLUMNS))
+        history_rows = [
+            (product_id, row['current_price'], db_now, 'manual')
+            for product_id, row in zip(product_ids, product_rows)
+        ]
+        for chunk in _chunked(history_rows, rows_per_insert):
+            sql = _multi_row_insert_sql(
+                PriceHistory.__tablename__, _PRICE_HISTORY_INSERT_COLUMNS, len(chunk), placeholder
+            )
+            connection.exec_driver_sql(sql, tuple(chain.from_iterable(chunk)))
+        
+        return product_ids
+    
     def get_product(self, product_id: int) -> Optional[Product]:
         """
         Get a product by ID.
@@ -165,47 +526,175 @@ class ProductService:
             print(f"Database error getting product by URL: {e}")
             return None
     
+    def iter_products(self, active_only: bool = True, chunk_size: int = 1000,
+                      search: Optional[str] = None, sort_by: str = 'created_at',
+                      sort_order: str = 'desc') -> Iterator[Product]:
+        """
+        Stream products without materialising the whole catalogue.
+        
+        Rows are fetched from the database chunk_size at a time and yielded
+        as detached Product instances, newest first unless another order is
+        requested. Filtering, sorting and the price change attributes match
+        query_products().
+        
+        Args:
+            active_only: If True, only yield active products
+            chunk_size: Number of rows to fetch per round-trip
+            search: Optional text to match against product name or URL
+            sort_by: Field to sort by; one of PRODUCT_SORT_FIELDS
+            sort_order: 'asc' or 'desc'
+            
+        Returns:
+            Iterator of Product instances
+            
+        Raises:
+            ValueError: If sort_by is not sortable; raised by this call,
+                before any row is fetched
+            SQLAlchemyError: From the iterator, if the database fails while
+                rows are streamed, so a cut-off listing is not mistaken for a
+                full one
+        """
+        if sort_by not in PRODUCT_SORT_FIELDS:
+            raise ValueError(f"Invalid sort field: {sort_by}")
+        
+        return self._iter_products(active_only, chunk_size, search, sort_by, sort_order)
+    
+    def _iter_products(self, active_only: bool, chunk_size: int, search: Optional[str],
+                       sort_by: str, sort_order: str) -> Iterator[Product]:
+        """Generator behind iter_products(), which validates its arguments."""
+        try:
+            session = self.db_manager.get_session()
+            try:
+                query = _filter_products(session.query(Product), active_only, search)
+                query = query.add_columns(*_PRICE_CHANGE_COLUMNS)
+                query = query.order_by(*_PRODUCT_ORDER_BY[sort_by, sort_order == 'desc'])
+                query = query.yield_per(chunk_size)
+                
+                for product, change_amount, change_percentage in query:
+                    yield _listed_product(product, change_amount, change_percentage)
+            finally:
+                session.close()
+        except SQLAlchemyError as e:
+            print(f"Database error iterating products: {e}")
+            raise
+    
     def get_all_products(self, active_only: bool = True) -> List[Product]:
         """
         Get all products.
         
+        Prefer iter_products() when the result is only iterated once.
+        
         Args:
             active_only: If True, only return active products
             
         Returns:
             List of Product instances
         """
+        try:
+            return list(self.iter_products(active_only=active_only))
+        except SQLAlchemyError as e:
+            print(f"Database error getting all products: {e}")
+            return []
+    
+    def query_products(self, active_only: bool = True, search: Optional[str] = None,
+                       sort_by: str = 'created_at', sort_order: str = 'desc',
+                       limit: Optional[int] = None, offset: int = 0,
+                       after: Optional[Tuple[Any, int]] = None,
+                       total_count: Optional[int] = None) -> Tuple[List[Product], int]:
+        """
+        Get one page of products, filtered and sorted by the database.
+        
+        Only the requested page is loaded. Search is a case-insensitive
+        substring match on name or URL. Products without a previous price sort
+        as 0, and missing timestamps sort as the oldest values.
+        
+        Pages can be addressed by offset or, for deep pages, by keyset: pass
+        the (sort_value, id) of the last product on the previous page as after
+        to get the products that follow it in the same order. The anchor is
+        not re-read, so the page stays correct when that product's price
+        changes or it is deleted. A keyset page costs the same at any depth,
+        while OFFSET still walks every skipped row, but it only supports
+        moving forward one page at a time.
+        
+        Each product also carries price_change_amount and
+        price_change_percentage, computed by the database and None when the
+        price did not change from a previous price, and sort_value, the value
+        it was sorted by.
+        
+        Args:
+            active_only: If True, only return active products
+            search: Optional text to match against product name or URL
+            sort_by: Field to sort by; one of PRODUCT_SORT_FIELDS
+            sort_order: 'asc' or 'desc'
+            limit: Maximum number of products to return, or None for all
+            offset: Number of matching products to skip; ignored with after
+            after: (sort_value, id) of the product the page starts after
+            total_count: Number of matching products, if the caller already
+                counted them with count_products(); skips the count query
+        
+        Returns:
+            Tuple of (products on the page, total number of matching products)
+            
+        Raises:
+            ValueError: If sort_by is not sortable
+        """
+        if sort_by not in PRODUCT_SORT_FIELDS:
+            raise ValueError(f"Invalid sort field: {sort_by}")
+        
         try:
             session = self.db_manager.get_session()
             try:
-                query = session.query(Product)
-                if active_only:
-                    query = query.filter(Product.is_active == True)
-                products = query.order_by(Product.created_at.desc()).all()
+                query = _filter_products(session.query(Product), active_only, search)
                 
-                # Create detached instances
-                detached_products = []
-                for product in products:
-                    product_data = {
-                        'id': product.id,
-                        'url': product.url,
-                        'name': product.name,
-                        'current_price': product.current_price,
-                        'previous_price': product.previous_price,
-                        'lowest_price': product.lowest_price,
-                        'image_url': product.image_url,
-                        'created_at': product.created_at,
-                        'last_checked': product.last_checked,
-                        'is_active': product.is_active
-                    }
-                    detached_products.append(Product(**product_data))
+                if total_count is None:
+                    total_count = query.order_by(None).count()
+                
+                sort_column = _PRODUCT_SORT_COLUMNS[sort_by]
+                if after is not None:
+                    anchor_value, anchor_id = after
+                    query = query.filter(
+                        _keyset_condition(sort_by, sort_column, sort_order, anchor_value, anchor_id)
+                    )
+                
+                query = query.add_columns(*_PRICE_CHANGE_COLUMNS, sort_column)
+                query = query.order_by(*_PRODUCT_ORDER_BY[sort_by, sort_order == 'desc'])
+                if offset and after is None:
+                    query = query.offset(offset)
+                if limit is not None:
+                    query = query.limit(limit)
                 
-                return detached_products
+                products = []
+                for product, change_amount, change_percentage, sort_value in query:
+                    listed_product = _listed_product(product, change_amount, change_percentage)
+                    listed_product.sort_value = sort_value
+                    products.append(listed_product)
+                return products, total_count
             finally:
                 session.close()
         except SQLAlchemyError as e:
-            print(f"Database error getting all products: {e}")
-            return []
+            print(f"Database error querying products: {e}")
+            return [], 0
+    
+    def count_products(self, active_only: bool = True, search: Optional[str] = None) -> int:
+        """
+        Count the products query_products() would match.
+        
+        Args:
+            active_only: If True, only count active products
+            search: Optional text to match against product name or URL
+            
+        Returns:
+            Number of matching products
+        """
+        try:
+            session = self.db_manager.get_session()
+            try:
+                return _filter_products(session.query(Product), active_only, search).count()
+            finally:
+                session.close()
+        except SQLAlchemyError as e:
+            print(f"Database error counting products: {e}")
+            return 0
     
     def update_product_price(self, product_id: int, new_price: float, source: str = 'automatic') -> bool:
         """
@@ -221,24 +710,28 @@ class ProductService:
         """
         try:
             with self.db_manager.get_session() as session:
-                product = session.query(Product).filter(Product.id == product_id).first()
-                if not product:
+                # Shift the prices and check existence in one UPDATE; the
+                # matched row count says whether the product exists
+                now = datetime.now()
+                new_price = _normalize_price(new_price)
+                result = session.execute(
+                    _PRICE_UPDATE_STMT,
+                    {'product_id': product_id, 'new_price': new_price, 'checked_at': now}
+                )
+                if result.rowcount == 0:
                     print(f"Product with ID {product_id} not found")
                     return False
                 
-                # Update previous price and current price
-                product.previous_price = product.current_price
-                product.current_price = new_price
-                product.last_checked = datetime.now()
-                
-                # Update lowest price if this is lower
-                if new_price < product.lowest_price:
-                    product.lowest_price = new_price
-                
                 # Add price history entry
-                self._add_price_history(session, product_id, new_price, source)
+                session.execute(_PRICE_HISTORY_INSERT_STMT, {
+                    'product_id': product_id,
+                    'price': new_price,
+                    'recorded_at': now,
+                    'source': source
+                })
                 
                 session.commit()
+                self._statistics_cache = None
                 return True
                 
         except SQLAlchemyError as e:
@@ -248,6 +741,69 @@ class ProductService:
             print(f"Error updating product price: {e}")
             return False
     
+    def update_prices_bulk(self, updates: List[Tuple[int, float, str]]) -> int:
+        """
+        Update the prices of several products in a single transaction.
+        
+        The shared UPDATE and price history INSERT statements are each run
+        with executemany over the whole batch. A product listed more than once
+        gets each of its updates in order. Updates for product IDs that do
+        not exist are skipped and reported.
+        
+        Args:
+            updates: List of (product_id, new_price, source) tuples
+            
+        Returns:
+            Number of distinct products updated
+        """
+        if not updates:
+            return 0
+        
+        try:
+            with self.db_manager.get_session() as session:
+                product_ids = {product_id for product_id, _, _ in updates}
+                existing_ids = set()
+                for id_chunk in _chunked(list(product_ids), SQLITE_MAX_VARIABLES):
+                    existing_ids.update(session.scalars(
+                        select(Product.id).where(Product.id.in_(id_chunk))
+                    ))
+                for product_id in product_ids - existing_ids:
+                    print(f"Product with ID {product_id} not found")
+                
+                rows = [
+                    (product_id, _normalize_price(new_price), source)
+                    for product_id, new_price, source in updates
+                    if product_id in existing_ids
+                ]
+                if not rows:
+                    return 0
+                
+                now = datetime.now()
+                session.execute(_PRICE_UPDATE_STMT, [
+                    {'product_id': product_id, 'new_price': price, 'checked_at': now}
+                    for product_id, price, _ in rows
+                ])
+                session.execute(_PRICE_HISTORY_INSERT_STMT, [
+                    {
+                        'product_id': product_id,
+                        'price': price,
+                        'recorded_at': now,
+                        'source': source
+                    }
+                    for product_id, price, source in rows
+                ])
+                
+                session.commit()
+                self._statistics_cache = None
+                return len(product_ids & existing_ids)
+                
+        except SQLAlchemyError as e:
+            print(f"Database error updating product prices: {e}")
+            return 0
+        except Exception as e:
+            print(f"Error updating product prices: {e}")
+            return 0
+    
     def delete_product(self, product_id: int) -> bool:
         """
         Delete a product and its price history.
@@ -270,6 +826,7 @@ class ProductService:
                 # Delete product (price history will be deleted due to cascade)
                 session.delete(product)
                 session.commit()
+                self._statistics_cache = None
                 
                 print(f"Successfully deleted product {product_id} from database")
                 return True
@@ -304,12 +861,80 @@ class ProductService:
                 
                 product.is_active = False
                 session.commit()
+                self._statistics_cache = None
                 return True
                 
         except SQLAlchemyError as e:
             print(f"Database error deactivating product: {e}")
             return False
     
+    def get_product_with_recent_history(self, product_id: int,
+                                        limit: int = 10) -> Tuple[Optional[Product], List[PriceHistory]]:
+        """
+        Get a product and its most recent price history in one query.
+        
+        The product is outer-joined to its latest history entries, so the
+        pair costs a single round trip instead of get_product() followed by
+        get_price_history().
+        
+        Args:
+            product_id: Product ID
+            limit: Maximum number of history entries to return
+            
+        Returns:
+            Tuple of (product or None if not found, history entries newest first)
+        """
+        try:
+            session = self.db_manager.get_session()
+            try:
+                recent_history = (
+                    select(PriceHistory)
+                    .where(PriceHistory.product_id == product_id)
+                    .order_by(desc(PriceHistory.recorded_at))
+                    .limit(limit)
+                    .subquery()
+                )
+                history_entry = aliased(PriceHistory, recent_history)
+                rows = session.execute(
+                    select(Product, history_entry)
+                    .outerjoin(history_entry, true())
+                    .where(Product.id == product_id)
+                    .order_by(desc(history_entry.recorded_at))
+                ).all()
+                if not rows:
+                    return None, []
+                
+                product = rows[0][0]
+                detached_product = Product(
+                    id=product.id,
+                    url=product.url,
+                    name=product.name,
+                    current_price=product.current_price,
+                    previous_price=product.previous_price,
+                    lowest_price=product.lowest_price,
+                    image_url=product.image_url,
+                    created_at=product.created_at,
+                    last_checked=product.last_checked,
+                    is_active=product.is_active
+                )
+                detached_history = [
+                    PriceHistory(
+                        id=entry.id,
+                        product_id=entry.product_id,
+                        price=entry.price,
+                        recorded_at=entry.recorded_at,
+                        source=entry.source
+                    )
+                    for _, entry in rows
+                    if entry is not None
+                ]
+                return detached_product, detached_history
+            finally:
+                session.close()
+        except SQLAlchemyError as e:
+            print(f"Database error getting product with history: {e}")
+            return None, []
+    
     def get_price_history(self, product_id: int, limit: Optional[int] = None) -> List[PriceHistory]:
         """
         Get price history for a product.
@@ -353,6 +978,24 @@ class ProductService:
             print(f"Database error getting price history: {e}")
             return []
     
+    def get_price_series(self, product_id: int,
+                         since: Optional[datetime] = None) -> Tuple[array, array]:
+        """
+        Get a product's price history as parallel arrays for analysis.
+        
+        Args:
+            product_id: Product ID
+            since: Only include entries recorded at or after this time
+        
+        Returns:
+            Tuple of (Unix timestamps, prices), oldest first; empty arrays on error
+        """
+        try:
+            return self.db_manager.load_price_series(product_id, since)
+        except SQLAlchemyError as e:
+            print(f"Database error getting price series: {e}")
+            return array('d'), array('d')
+    
     def get_lowest_price(self, product_id: int) -> Optional[float]:
         """
         Get the lowest price ever recorded for a product.
@@ -387,13 +1030,91 @@ class ProductService:
                 if not product or product.previous_price is None:
                     return False, None, None
                 
-                has_dropped = product.current_price < product.previous_price
+                has_dropped = _to_cents(product.current_price) < _to_cents(product.previous_price)
                 return has_dropped, product.previous_price, product.current_price
                 
         except SQLAlchemyError as e:
             print(f"Database error checking price drop: {e}")
             return False, None, None
     
+    def get_products_with_drop_status(self, active_only: bool = True) -> List[Tuple[Product, Optional[float], Optional[float], bool]]:
+        """
+        Get all products together with their price drop status in one query.
+        
+        This is the batch equivalent of calling has_price_dropped() for every
+        product returned by get_all_products().
+        
+        Args:
+            active_only: If True, only return active products
+            
+        Returns:
+            List of (product, previous_price, current_price, has_dropped) tuples
+        """
+        try:
+            session = self.db_manager.get_session()
+            try:
+                query = session.query(Product)
+                if active_only:
+                    query = query.filter(Product.is_active == True)
+                products = query.order_by(Product.created_at.desc()).all()
+                
+                results = []
+                for product in products:
+                    product_data = {
+                        'id': product.id,
+                        'url': product.url,
+                        'name': product.name,
+                        'current_price': product.current_price,
+                        'previous_price': product.previous_price,
+                        'lowest_price': product.lowest_price,
+                        'image_url': product.image_url,
+                        'created_at': product.created_at,
+                        'last_checked': product.last_checked,
+                        'is_active': product.is_active
+                    }
+                    previous_price = product.previous_price
+                    if previous_price is None:
+                        results.append((Product(**product_data), None, None, False))
+                    else:
+                        results.append((
+                            Product(**product_data),
+                            previous_price,
+                            product.current_price,
+                            _to_cents(product.current_price) < _to_cents(previous_price)
+                        ))
+                
+                return results
+            finally:
+                session.close()
+        except SQLAlchemyError as e:
+            print(f"Database error getting products with drop status: {e}")
+            return []
+    
+    def get_dropped_product_ids(self, active_only: bool = True) -> List[int]:
+        """
+        Get the IDs of products whose current price is below the previous one.
+        
+        The comparison runs inside SQLite over whole cents and only the ID
+        column is returned, so no Product instances are built. Use this when
+        only the set of dropped products is needed.
+        
+        Args:
+            active_only: If True, only consider active products
+            
+        Returns:
+            List of product IDs, in ascending order
+        """
+        query = select(_products.c.id).where(_PRICE_DROPPED)
+        if active_only:
+            query = query.where(_products.c.is_active == True)
+        
+        try:
+            with self.db_manager.engine.connect() as connection:
+                return list(connection.execute(query.order_by(_products.c.id)).scalars())
+        except SQLAlchemyError as e:
+            print(f"Database error getting dropped products: {e}")
+            return []
+    
     def get_products_for_monitoring(self) -> List[Product]:
         """
         Get all active products that should be monitored.
@@ -425,26 +1146,38 @@ class ProductService:
         """
         Get statistics about monitored products.
         
+        Results are cached for STATISTICS_CACHE_TTL_SECONDS and dropped
+        whenever this service changes a product.
+        
         Returns:
             Dictionary with product statistics
         """
+        cached = self._statistics_cache
+        if cached is not None and time.monotonic() < cached[0]:
+            return dict(cached[1])
+        
         try:
-            with self.db_manager.get_session() as session:
-                total_products = session.query(Product).count()
-                active_products = session.query(Product).filter(Product.is_active == True).count()
-                
-                # Get products with recent price drops
-                recent_drops = session.query(Product).filter(
-                    Product.current_price < Product.previous_price,
-                    Product.is_active == True
-                ).count()
+            products = Product.__table__
+            # Single pass over products instead of one COUNT query per figure.
+            # A Core select on a plain connection skips the ORM session and
+            # result processing, which buys nothing for three integers.
+            stats_query = select(
+                func.count(),
+                func.count().filter(products.c.is_active == True),
+                func.count().filter(_PRICE_DROPPED, products.c.is_active == True)
+            ).select_from(products)
+            
+            with self.db_manager.engine.connect() as connection:
+                total_products, active_products, recent_drops = connection.execute(stats_query).one()
                 
-                return {
+                stats = {
                     'total_products': total_products,
                     'active_products': active_products,
                     'inactive_products': total_products - active_products,
                     'recent_price_drops': recent_drops
                 }
+                self._statistics_cache = (time.monotonic() + STATISTICS_CACHE_TTL_SECONDS, stats)
+                return dict(stats)
                 
         except SQLAlchemyError as e:
             print(f"Database error getting statistics: {e}")
@@ -87,7 +87,7 @@ class TestProductAPIIntegration(unittest.TestCase):
                     from flask import g
                     g.client_id = 'test_client'
                     
-                    with patch.object(app.product_service, 'get_all_products', return_value=[sample_product]):
+                    with patch.object(app.product_service, 'query_products', return_value=([sample_product], 1)):
                         response = client.get('/api/products')
                         
                         self.assertEqual(response.status_code, 200)
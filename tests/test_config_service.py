@@ -177,6 +177,16 @@ class TestConfigValidationResult(unittest.TestCase):
         self.assertIn("field1 - Error 1", summary)
         self.assertIn("field2 - Warning 1", summary)
     
+    def test_validation_result_keeps_partitioned_lists(self):
+        """Test that already separated errors and warnings are used as given."""
+        errors = [ConfigValidationError("field1", "Error 1")]
+        warnings = [ConfigValidationError("field2", "Warning 1", "warning")]
+        
+        result = ConfigValidationResult(is_valid=False, errors=errors, warnings=warnings)
+        
+        self.assertIs(result.errors, errors)
+        self.assertIs(result.warnings, warnings)
+    
     def test_validation_result_valid(self):
         """Test validation result when valid."""
         result = ConfigValidationResult(is_valid=True, errors=[], warnings=[])
@@ -225,6 +235,9 @@ max_retry_attempts = 5
 [security]
 enable_mtls = false
 api_port = 8080
+
+[logging]
+enable_server_timing = true
 """
         
         config_path = os.path.join(self.temp_dir, "test.conf")
@@ -243,6 +256,42 @@ api_port = 8080
         self.assertEqual(config.max_retry_attempts, 5)
         self.assertFalse(config.enable_mtls)
         self.assertEqual(config.api_port, 8080)
+        self.assertTrue(config.enable_server_timing)
+    
+    def _cache_test_config(self, api_port):
+        """Build a minimal valid config for the parse cache tests."""
+        return f"""[email]
+smtp_server = test.smtp.com
+username = test@example.com
+password = testpass
+recipient = recipient@example.com
+
+[security]
+enable_mtls = false
+api_port = {api_port}
+"""
+    
+    def test_load_config_reuses_parse_until_file_changes(self):
+        """Test that unchanged config files are parsed only once."""
+        config_path = os.path.join(self.temp_dir, "cached.conf")
+        with open(config_path, 'w') as f:
+            f.write(self._cache_test_config(8080))
+        
+        first = self.config_service.load_config(config_path)
+        second = self.config_service.load_config(config_path)
+        
+        self.assertEqual(self.config_service._parse_config_cached.cache_info().misses, 1)
+        self.assertIsNot(first, second)
+        
+        # Changing the file contents must trigger a fresh parse
+        with open(config_path, 'w') as f:
+            f.write(self._cache_test_config(9090))
+        stat = os.stat(config_path)
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        third = self.config_service.load_config(config_path)
+        self.assertEqual(third.api_port, 9090)
+        self.assertEqual(self.config_service._parse_config_cached.cache_info().misses, 2)
     
     def test_load_config_with_validation_errors(self):
         """Test loading config that fails validation."""
@@ -319,6 +368,12 @@ recipient = invalid-email
         self.assertFalse(result.is_valid)
         error_messages = [error.message for error in result.errors]
         self.assertTrue(any("valid email address" in msg for msg in error_messages))
+        
+        # Addresses need a domain with a dot and no whitespace
+        for email in ("user@localhost", "user @example.com", "@example.com"):
+            config.recipient_email = email
+            result = self.config_service.validate_config(config)
+            self.assertFalse(result.is_valid, email)
     
     def test_validate_config_mtls_missing_certs(self):
         """Test validation with mTLS enabled but missing certificates."""
@@ -363,7 +418,7 @@ recipient = invalid-email
         """Test creating a default configuration file."""
         config_path = os.path.join(self.temp_dir, "default.conf")
         
-        self.config_service.create_default_config_file(config_path)
+        config = self.config_service.create_default_config_file(config_path)
         
         # Verify file was created
         self.assertTrue(os.path.exists(config_path))
@@ -377,6 +432,9 @@ recipient = invalid-email
         self.assertIn("[security]", content)
         self.assertIn("smtp_server", content)
         self.assertIn("enable_mtls", content)
+        
+        # The returned Config matches what loading the file produces
+        self.assertEqual(config, self.config_service.load_config(config_path))
     
     def test_config_with_alternative_key_formats(self):
         """Test configuration loading with different key formats."""
@@ -5,10 +5,16 @@ Unit tests for database models and database manager.
 import unittest
 import tempfile
 import os
+import threading
 from datetime import datetime
+from unittest.mock import patch
 
-from src.models.database import get_database_manager, Product, PriceHistory, DatabaseManager
-from src.models.migrations import run_migrations
+from sqlalchemy import text
+
+from src.models.database import (
+    get_database_manager, Product, PriceHistory, DatabaseManager, MAX_SHARED_DATABASE_MANAGERS
+)
+from src.models.migrations import MigrationManager, SCHEMA_VERSION, run_migrations
 
 
 class TestDatabaseModels(unittest.TestCase):
@@ -26,6 +32,7 @@ class TestDatabaseModels(unittest.TestCase):
     
     def tearDown(self):
         """Clean up test database."""
+        self.db_manager.close()
         os.unlink(self.temp_db.name)
     
     def test_database_manager_creation(self):
@@ -34,6 +41,57 @@ class TestDatabaseModels(unittest.TestCase):
         self.assertIsNotNone(self.db_manager.engine)
         self.assertIsNotNone(self.db_manager.SessionLocal)
     
+    def test_sqlite_pragmas_applied(self):
+        """Test that SQLite connections use WAL and tuned synchronous mode."""
+        with self.db_manager.engine.connect() as connection:
+            journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+            synchronous = connection.exec_driver_sql("PRAGMA synchronous").scalar()
+            foreign_keys = connection.exec_driver_sql("PRAGMA foreign_keys").scalar()
+        
+        self.assertEqual(journal_mode.lower(), 'wal')
+        self.assertEqual(synchronous, 1)  # NORMAL
+        self.assertEqual(foreign_keys, 1)
+    
+    def test_reads_during_open_write_and_close(self):
+        """Test that a reader is not blocked by another session's open write, and close() releases the pool."""
+        with self.db_manager.get_session() as writer, self.db_manager.get_session() as reader:
+            writer.add(Product(url="https://example.com/pending", name="Pending",
+                               current_price=1.0, lowest_price=1.0))
+            writer.flush()
+            
+            # The uncommitted write holds the WAL write lock; reads still proceed
+            self.assertEqual(reader.query(Product).count(), 0)
+            self.assertIsNot(writer.connection().connection.dbapi_connection,
+                             reader.connection().connection.dbapi_connection)
+            writer.rollback()
+        
+        self.assertGreater(self.db_manager.engine.pool.checkedin(), 0)
+        self.db_manager.close()
+        self.assertEqual(self.db_manager.engine.pool.checkedin(), 0)
+        
+        # The manager reconnects on next use
+        with self.db_manager.get_session() as session:
+            self.assertEqual(session.query(Product).count(), 0)
+    
+    def test_connection_pool_configuration(self):
+        """Test pool sizing for file databases and a shared connection for in-memory ones."""
+        self.assertEqual(self.db_manager.engine.pool.size(), 10)
+        
+        memory_manager = DatabaseManager("sqlite:///:memory:")
+        memory_manager.create_tables()
+        counts = []
+        
+        def count_products():
+            with memory_manager.get_session() as session:
+                counts.append(session.query(Product).count())
+        
+        # Another thread sees the same in-memory database and its tables
+        worker = threading.Thread(target=count_products)
+        worker.start()
+        worker.join()
+        self.assertEqual(counts, [0])
+        memory_manager.close()
+    
     def test_database_manager_default_path(self):
         """Test database manager with default path."""
         # Create manager without specifying path
@@ -41,6 +99,41 @@ class TestDatabaseModels(unittest.TestCase):
         self.assertIsInstance(default_manager, DatabaseManager)
         self.assertTrue(default_manager.database_url.startswith('sqlite:///'))
     
+    def test_database_manager_shared_per_url(self):
+        """Test that the factory returns one shared manager per database URL."""
+        same_manager = get_database_manager(f"sqlite:///{self.temp_db.name}")
+        self.assertIs(same_manager, self.db_manager)
+        self.assertIs(get_database_manager(), get_database_manager())
+        
+        other_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        other_db.close()
+        try:
+            other_manager = get_database_manager(f"sqlite:///{other_db.name}")
+            self.assertIsNot(other_manager, self.db_manager)
+        finally:
+            other_manager.close()
+            os.unlink(other_db.name)
+    
+    def test_closed_database_manager_not_shared(self):
+        """Test that closing a shared manager releases it from the factory."""
+        self.db_manager.close()
+        
+        new_manager = get_database_manager(f"sqlite:///{self.temp_db.name}")
+        self.assertIsNot(new_manager, self.db_manager)
+        self.db_manager = new_manager
+    
+    def test_shared_database_managers_bounded(self):
+        """Test that the factory keeps at most MAX_SHARED_DATABASE_MANAGERS managers."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            urls = [f"sqlite:///{temp_dir}/shared{i}.db" for i in range(MAX_SHARED_DATABASE_MANAGERS + 1)]
+            managers = [get_database_manager(url) for url in urls]
+            
+            # The least recently used manager was evicted; the rest are still shared
+            self.assertIsNot(get_database_manager(urls[0]), managers[0])
+            self.assertIs(get_database_manager(urls[-1]), managers[-1])
+            for manager in managers + [get_database_manager(urls[0])]:
+                manager.close()
+    
     def test_product_model_creation(self):
         """Test creating a Product model instance."""
         with self.db_manager.get_session() as session:
@@ -128,6 +221,66 @@ class TestDatabaseModels(unittest.TestCase):
             self.assertEqual(price_history.price, 99.99)
             self.assertEqual(price_history.source, 'manual')
     
+    def test_bulk_insert_price_history(self):
+        """Test inserting price history rows in batches."""
+        with self.db_manager.get_session() as session:
+            product = Product(url="https://example.com/bulk", name="Bulk Product",
+                              current_price=10.0, lowest_price=10.0)
+            session.add(product)
+            session.commit()
+            product_id = product.id
+        
+        rows = [{'product_id': product_id, 'price': 10.0 + i, 'source': 'automatic'}
+                for i in range(120)]
+        self.assertEqual(self.db_manager.bulk_insert_price_history(rows, batch_size=50), 120)
+        self.assertEqual(self.db_manager.bulk_insert_price_history([]), 0)
+        
+        with self.db_manager.get_session() as session:
+            history = session.query(PriceHistory).filter_by(product_id=product_id).all()
+            self.assertEqual(len(history), 120)
+            self.assertEqual(sorted(entry.price for entry in history)[-1], 129.0)
+            self.assertTrue(all(entry.recorded_at is not None for entry in history))
+    
+    def test_bulk_upsert_products(self):
+        """Test that bulk upsert inserts new URLs and updates tracked ones."""
+        records = [
+            {'url': f"https://example.com/upsert{i}", 'name': f"Product {i}",
+             'current_price': 10.0 + i, 'lowest_price': 10.0 + i}
+            for i in range(3)
+        ]
+        self.assertEqual(self.db_manager.bulk_upsert_products(records), 3)
+        
+        records[0] = dict(records[0], name="Renamed", current_price=5.0)
+        self.assertEqual(self.db_manager.bulk_upsert_products(records[:1]), 1)
+        self.assertEqual(self.db_manager.bulk_upsert_products([]), 0)
+        
+        with self.db_manager.get_session() as session:
+            self.assertEqual(session.query(Product).count(), 3)
+            product = session.query(Product).filter_by(url="https://example.com/upsert0").one()
+            self.assertEqual(product.name, "Renamed")
+            self.assertEqual(product.current_price, 5.0)
+            self.assertTrue(product.is_active)
+            self.assertIsNotNone(product.created_at)
+    
+    def test_bulk_upsert_products_without_on_conflict(self):
+        """Test the per-row upsert used on backends without ON CONFLICT."""
+        records = [
+            {'url': f"https://example.com/upsert{i}", 'name': f"Product {i}",
+             'current_price': 10.0 + i, 'lowest_price': 10.0 + i}
+            for i in range(2)
+        ]
+        self.db_manager.bulk_upsert_products(records[:1])
+        
+        records[0] = dict(records[0], name="Renamed")
+        with patch.object(self.db_manager.engine.dialect, 'name', 'mysql'):
+            self.assertEqual(self.db_manager.bulk_upsert_products(records), 2)
+        
+        with self.db_manager.get_session() as session:
+            self.assertEqual(session.query(Product).count(), 2)
+            self.assertEqual(
+                session.query(Product).filter_by(url="https://example.com/upsert0").one().name, "Renamed"
+            )
+    
     def test_product_price_history_relationship(self):
         """Test the relationship between Product and PriceHistory."""
         with self.db_manager.get_session() as session:
@@ -247,9 +400,108 @@ class TestDatabaseModels(unittest.TestCase):
                 retrieved_product = session.query(Product).filter(Product.url == "https://example.com/test").first()
                 self.assertIsNotNone(retrieved_product)
                 self.assertEqual(retrieved_product.name, "Migration Test")
+                
+                # Verify the price history index exists and backs history lookups
+                plan = session.execute(text(
+                    "EXPLAIN QUERY PLAN SELECT * FROM price_history "
+                    "WHERE product_id = 1 ORDER BY recorded_at DESC"
+                )).fetchall()
+                plan_details = " ".join(str(row[-1]) for row in plan)
+                self.assertIn("idx_price_history_product_recorded", plan_details)
+                self.assertNotIn("TEMP B-TREE", plan_details)
         
         finally:
+            db_manager.close()
             os.unlink(temp_db.name)
+    
+    def test_product_sort_indexes(self):
+        """Test that paginated product listings are served by the sort indexes."""
+        run_migrations(self.db_manager)
+        
+        with self.db_manager.get_session() as session:
+            for order_by, index_name in (
+                ("py_casefold(name), id", "idx_products_active_name_folded"),
+                ("coalesce(previous_price, 0) DESC, id DESC", "idx_products_active_previous_price"),
+                ("created_at DESC, id DESC", "idx_products_active_created"),
+            ):
+                plan = session.execute(text(
+                    f"EXPLAIN QUERY PLAN SELECT * FROM products "
+                    f"WHERE is_active = 1 ORDER BY {order_by} LIMIT 20"
+                )).fetchall()
+                plan_details = " ".join(str(row[-1]) for row in plan)
+                self.assertIn(index_name, plan_details)
+                self.assertNotIn("TEMP B-TREE", plan_details)
+            
+            # Listings including inactive products still sort by name via an index
+            plan = session.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM products ORDER BY py_casefold(name), id LIMIT 20"
+            )).fetchall()
+            plan_details = " ".join(str(row[-1]) for row in plan)
+            self.assertIn("idx_products_name_folded", plan_details)
+            self.assertNotIn("TEMP B-TREE", plan_details)
+    
+    def test_migrations_skipped_when_schema_current(self):
+        """Test that run_migrations stamps the schema version and then short-circuits."""
+        migration_manager = MigrationManager(self.db_manager)
+        self.assertEqual(migration_manager.get_schema_version(), 0)
+        
+        run_migrations(self.db_manager)
+        self.assertEqual(migration_manager.get_schema_version(), SCHEMA_VERSION)
+        
+        with patch.object(MigrationManager, 'run_initial_migration') as mock_initial:
+            run_migrations(self.db_manager)
+            mock_initial.assert_not_called()
+    
+    def test_failed_migration_rolls_back_ddl(self):
+        """Test that a failing migration leaves neither its DDL nor its record behind."""
+        migration_manager = MigrationManager(self.db_manager)
+        
+        with self.assertRaises(Exception):
+            migration_manager.apply_migration(
+                version='999_broken',
+                description='Index then fail',
+                sql_statements=[
+                    "CREATE INDEX idx_test_rollback ON products (name)",
+                    "CREATE INDEX idx_test_rollback_bad ON missing_table (name)",
+                ]
+            )
+        
+        with self.db_manager.engine.connect() as connection:
+            index_count = connection.exec_driver_sql(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name = 'idx_test_rollback'"
+            ).scalar()
+        self.assertEqual(index_count, 0)
+        self.assertNotIn('999_broken', migration_manager.get_applied_migrations())
+        
+        migration_manager.apply_migration('998_ok', 'No-op', [])
+        self.assertIn('998_ok', migration_manager.get_applied_migrations())
+    
+    def test_applied_migrations_cached(self):
+        """Test that applied versions are queried once and updated after each migration."""
+        migration_manager = MigrationManager(self.db_manager)
+        migration_manager.apply_migration('001_first', 'First', [])
+        
+        with patch.object(migration_manager, '_ensure_migrations_table') as mock_ensure:
+            migration_manager.apply_migration('002_second', 'Second', [])
+            migration_manager.apply_migration('002_second', 'Second', [])
+            mock_ensure.assert_not_called()
+        
+        self.assertEqual(migration_manager.get_applied_migrations(), {'001_first', '002_second'})
+        self.assertEqual(MigrationManager(self.db_manager).get_applied_migrations(), {'001_first', '002_second'})
+    
+    def test_applied_migrations_not_mutable_by_callers(self):
+        """Test that the returned versions are a copy of the cache."""
+        migration_manager = MigrationManager(self.db_manager)
+        migration_manager.apply_migration('001_first', 'First', [])
+        
+        applied = migration_manager.get_applied_migrations()
+        with self.assertRaises(AttributeError):
+            applied.discard('001_first')
+        
+        with patch.object(migration_manager, '_ensure_migrations_table') as mock_ensure:
+            migration_manager.apply_migration('001_first', 'First', [])
+            mock_ensure.assert_not_called()
+        self.assertEqual(migration_manager.get_applied_migrations(), {'001_first'})
 
 
 if __name__ == '__main__':
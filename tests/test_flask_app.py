@@ -368,6 +368,10 @@ class TestSecureFlaskApp(unittest.TestCase):
         
         self.assertEqual(context, mock_context)
         mock_setup_context.assert_called_once()
+        
+        # The context is reused rather than rebuilt
+        self.assertIs(app.create_ssl_context(), context)
+        mock_setup_context.assert_called_once()
 
 
 if __name__ == '__main__':
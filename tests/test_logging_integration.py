@@ -179,6 +179,7 @@ error_retention_hours = 168
             user_id=123,
             operation='test_operation'
         )
+        app.logging_service.flush()
         
         # Read the log file and verify JSON structure
         log_file_path = os.path.join(self.temp_dir, "test.log")
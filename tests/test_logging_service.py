@@ -307,6 +307,7 @@ class TestLoggingService(unittest.TestCase):
         )
         
         # Verify log file exists and has content
+        self.logging_service.flush()
         self.assertTrue(os.path.exists(self.config.log_file_path))
         
         with open(self.config.log_file_path, 'r') as f:
@@ -395,12 +396,54 @@ class TestLoggingIntegration(unittest.TestCase):
         log_files = list(Path(self.temp_dir).glob("*.log*"))
         self.assertGreater(len(log_files), 0)
     
+    def test_records_written_by_background_listener(self):
+        """Test that log calls are queued and written with their exception info."""
+        root_logger = logging.getLogger()
+        self.assertIn(self.logging_service._queue_handler, root_logger.handlers)
+        
+        try:
+            raise ValueError("Queued failure")
+        except ValueError:
+            logging.getLogger('test').exception("Operation %s failed", "sync")
+        self.logging_service.flush()
+        
+        with open(self.config.log_file_path, 'r') as f:
+            entries = [json.loads(line) for line in f if 'Operation sync failed' in line]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['exception_info']['type'], 'ValueError')
+        
+        # After shutdown, records are written directly by the same handlers
+        self.logging_service.shutdown()
+        self.assertNotIn(self.logging_service._queue_handler, root_logger.handlers)
+        for handler in self.logging_service._listener.handlers:
+            self.assertIn(handler, root_logger.handlers)
+        logging.getLogger('test').warning("After shutdown")
+        with open(self.config.log_file_path, 'r') as f:
+            self.assertIn('After shutdown', f.read())
+    
+    def test_exit_hook_writes_queued_records(self):
+        """Test that one exit hook drains the running listener, without one per service."""
+        logging_service_module = sys.modules[LoggingService.__module__]
+        
+        with patch.object(logging_service_module.atexit, 'register') as mock_register:
+            second_service = LoggingService(self.config)
+        mock_register.assert_not_called()
+        
+        logging.getLogger('test').info("Queued before exit")
+        logging_service_module._stop_queue_listeners()
+        
+        self.assertIsNone(second_service._queue_handler.listener)
+        self.assertNotIn(second_service._queue_handler, logging.getLogger().handlers)
+        with open(self.config.log_file_path, 'r') as f:
+            self.assertIn('Queued before exit', f.read())
+    
     def test_error_log_separation(self):
         """Test that errors are logged to separate file."""
         logger = logging.getLogger('test')
         
         # Log an error
         logger.error("Test error message")
+        self.logging_service.flush()
         
         # Check that error log file exists
         error_log_path = str(Path(self.config.log_file_path).with_suffix('.errors.log'))
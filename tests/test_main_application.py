@@ -117,6 +117,27 @@ log_level = INFO
         assert result is False
         mock_config_service.create_default_config_file.assert_called_once_with(missing_config_path)
     
+    def test_ensure_directories(self):
+        """Test that the configured log and database directories are created, skipping URLs."""
+        app = PriceMonitorApplication(config_path=self.config_path)
+        app.config = Config(
+            log_file_path=os.path.join(self.temp_dir, "logs", "app.log"),
+            database_path=os.path.join(self.temp_dir, "data", "app.db")
+        )
+        
+        app._ensure_directories()
+        
+        assert os.path.isdir(os.path.join(self.temp_dir, "logs"))
+        assert os.path.isdir(os.path.join(self.temp_dir, "data"))
+        
+        app.config = Config(
+            log_file_path=os.path.join(self.temp_dir, "logs", "app.log"),
+            database_path=f"sqlite:///{os.path.join(self.temp_dir, 'url_data', 'app.db')}"
+        )
+        with patch('src.main.os.makedirs') as mock_makedirs:
+            app._ensure_directories()
+        mock_makedirs.assert_called_once_with(os.path.join(self.temp_dir, "logs"), exist_ok=True)
+    
     @patch('src.main.DatabaseManager')
     def test_initialize_database_success(self, mock_db_manager):
         """Test successful database initialization."""
@@ -174,6 +195,55 @@ log_level = INFO
         assert app.email_service is not None
         assert app.price_monitor_service is not None
     
+    @patch('src.main.EmailService')
+    @patch('src.main.PriceMonitorService')
+    @patch('src.main.ParserService')
+    @patch('src.main.WebScrapingService')
+    @patch('src.main.ProductService')
+    def test_initialize_services_does_not_probe_email(self, mock_product_service, mock_web_scraping,
+                                                      mock_parser, mock_price_monitor, mock_email):
+        """Test that service initialization leaves the SMTP connection test to run()."""
+        app = PriceMonitorApplication(config_path=self.config_path)
+        app._setup_basic_logging()
+        app._load_configuration()
+        app.db_manager = Mock()
+        
+        with patch('src.main.threading.Thread') as mock_thread:
+            result = app._initialize_services()
+        
+        assert result is True
+        assert app.email_service is mock_email.return_value
+        mock_thread.assert_not_called()
+        mock_email.return_value.test_email_connection.assert_not_called()
+    
+    @patch('src.main.PriceMonitorApplication.shutdown')
+    def test_run_probes_email_in_background(self, mock_shutdown):
+        """Test that a slow SMTP connection test does not hold up serving."""
+        app = PriceMonitorApplication(config_path=self.config_path)
+        app._setup_basic_logging()
+        app._load_configuration()
+        app._is_running = True
+        app.flask_app = Mock()
+        app.email_service = Mock()
+        
+        release_probe = threading.Event()
+        probe_finished = threading.Event()
+        
+        def slow_connection_test():
+            release_probe.wait(timeout=5)
+            probe_finished.set()
+            return Mock(success=False, message="timed out")
+        
+        app.email_service.test_email_connection.side_effect = slow_connection_test
+        
+        app.run()
+        
+        app.flask_app.run.assert_called_once()
+        assert not probe_finished.is_set()
+        
+        release_probe.set()
+        assert probe_finished.wait(timeout=5)
+    
     @patch('src.main.EmailService')
     @patch('src.main.PriceMonitorService')
     @patch('src.main.ParserService')
@@ -301,6 +371,31 @@ log_level = INFO
         mock_flask.assert_called_once()
         mock_scheduler.assert_called_once()
     
+    @patch('src.main.PriceMonitorApplication._start_monitoring_scheduler')
+    @patch('src.main.PriceMonitorApplication._initialize_flask_app')
+    @patch('src.main.PriceMonitorApplication._initialize_services')
+    @patch('src.main.PriceMonitorApplication._initialize_database')
+    @patch('src.main.PriceMonitorApplication._initialize_logging_service')
+    @patch('src.main.PriceMonitorApplication._load_configuration')
+    @patch('src.main.PriceMonitorApplication._setup_basic_logging')
+    def test_initialization_without_serving(self, mock_logging, mock_config, mock_logging_service, mock_db,
+                                            mock_services, mock_flask, mock_scheduler):
+        """Test that one-shot initialization skips the Flask app and scheduler."""
+        app = PriceMonitorApplication(config_path=self.config_path)
+        app.logger = Mock()
+        
+        mock_config.return_value = True
+        mock_logging_service.return_value = True
+        mock_db.return_value = True
+        mock_services.return_value = True
+        
+        result = app.initialize(serve=False)
+        
+        assert result is True
+        mock_services.assert_called_once()
+        mock_flask.assert_not_called()
+        mock_scheduler.assert_not_called()
+    
     @patch('src.main.PriceMonitorApplication._load_configuration')
     @patch('src.main.PriceMonitorApplication._setup_basic_logging')
     def test_initialization_failure(self, mock_logging, mock_config):
@@ -393,6 +488,34 @@ log_level = INFO
         app.config_service.load_config.assert_called_once_with(app.config_path)
         assert app.config == new_config
     
+    @pytest.mark.skipif(not hasattr(signal, 'SIGHUP'), reason="SIGHUP is not available")
+    def test_sighup_reload_runs_on_worker_thread(self):
+        """Test that SIGHUP only flags a reload, which the worker thread performs once."""
+        with patch('signal.signal') as mock_signal:
+            app = PriceMonitorApplication(config_path=self.config_path)
+        handlers = {call.args[0]: call.args[1] for call in mock_signal.call_args_list}
+        
+        app.logger = Mock()
+        reloaded = threading.Event()
+        app._reload_configuration = Mock(side_effect=reloaded.set)
+        
+        # Two signals before the worker runs are coalesced into one reload
+        handlers[signal.SIGHUP](signal.SIGHUP, None)
+        handlers[signal.SIGHUP](signal.SIGHUP, None)
+        app._reload_configuration.assert_not_called()
+        
+        app._start_reload_worker()
+        assert reloaded.wait(timeout=5)
+        time.sleep(0.05)
+        app._reload_configuration.assert_called_once()
+        
+        # Shutdown ends the worker
+        app._is_running = True
+        app.shutdown()
+        app._reload_thread.join(timeout=5)
+        assert not app._reload_thread.is_alive()
+        app._reload_configuration.assert_called_once()
+    
     def test_get_status(self):
         """Test status information retrieval."""
         app = PriceMonitorApplication(config_path=self.config_path)
@@ -510,7 +633,7 @@ log_level = INFO
             main()
         
         assert exc_info.value.code == 0
-        mock_app.initialize.assert_called_once()
+        mock_app.initialize.assert_called_once_with(serve=False)
         mock_app.get_status.assert_called_once()
     
     @patch('sys.argv', ['main.py', '--config', 'test_config.properties', '--test-email'])
@@ -528,6 +651,7 @@ log_level = INFO
             main()
         
         assert exc_info.value.code == 0
+        mock_app.initialize.assert_called_once_with(serve=False)
         mock_email_service.send_test_notification.assert_called_once()
     
     @patch('sys.argv', ['main.py', '--config', 'test_config.properties', '--test-email'])
@@ -587,6 +711,7 @@ log_level = INFO
         
         main()
         
+        mock_app.initialize.assert_called_once_with(serve=True)
         mock_app.run.assert_called_once_with(host='127.0.0.1', port=8080, debug=True)
     
     @patch('sys.argv', ['main.py'])
@@ -157,6 +157,73 @@ class TestMTLSIntegration(unittest.TestCase):
         self.assertEqual(ssl_context.verify_mode, ssl.CERT_REQUIRED)
         self.assertEqual(ssl_context.minimum_version, ssl.TLSVersion.TLSv1_2)
     
+    def test_ssl_context_session_resumption(self):
+        """Test that the SSL context keeps session tickets and reports session stats."""
+        import ssl
+        security_service = SecurityService(self.config)
+        security_service.load_certificates()
+        self.assertEqual(security_service.get_tls_session_stats(), {})
+        
+        ssl_context = security_service.setup_mtls_context()
+        
+        self.assertFalse(ssl_context.options & ssl.OP_NO_TICKET)
+        self.assertGreater(ssl_context.num_tickets, 0)
+        stats = security_service.get_tls_session_stats()
+        self.assertIn('hits', stats)
+        self.assertIn('misses', stats)
+    
+    def test_mtls_server_handshake_in_request_thread(self):
+        """Test that a client stalled before its handshake does not block other connections."""
+        import socket
+        import ssl
+        import threading
+        from flask import Flask, request
+        from src.app import MTLSWSGIServer
+        
+        security_service = SecurityService(self.config)
+        security_service.load_certificates()
+        
+        app = Flask(__name__)
+        
+        @app.route('/')
+        def index():
+            return 'client cert' if 'SSL_CLIENT_CERT' in request.environ else 'no client cert'
+        
+        server = MTLSWSGIServer('127.0.0.1', 0, app, security_service.setup_mtls_context())
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        
+        # Connect without ever starting the TLS handshake
+        stalled = socket.create_connection(('127.0.0.1', server.port))
+        self.addCleanup(stalled.close)
+        
+        client_cert_path = os.path.join(self.temp_dir, 'client.crt')
+        client_key_path = os.path.join(self.temp_dir, 'client.key')
+        with open(client_cert_path, 'w') as f:
+            f.write(self.client_cert_pem)
+        with open(client_key_path, 'wb') as f:
+            f.write(self.client_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption()
+            ))
+        
+        client_context = ssl.create_default_context(cafile=self.ca_cert_path)
+        client_context.check_hostname = False
+        client_context.load_cert_chain(client_cert_path, client_key_path)
+        
+        connection = socket.create_connection(('127.0.0.1', server.port), timeout=5)
+        with client_context.wrap_socket(connection) as tls_connection:
+            tls_connection.sendall(b'GET / HTTP/1.0\r\nHost: localhost\r\n\r\n')
+            response = b''
+            while chunk := tls_connection.recv(4096):
+                response += chunk
+        
+        self.assertTrue(response.startswith(b'HTTP/1.1 200'))
+        self.assertTrue(response.endswith(b'client cert'))
+        self.assertNotIn(b'no client cert', response)
+    
     def test_certificate_info_extraction(self):
         """Test certificate information extraction."""
         security_service = SecurityService(self.config)
@@ -192,6 +259,48 @@ class TestMTLSIntegration(unittest.TestCase):
         self.assertIsNone(auth_result.client_id)
         self.assertIsNotNone(auth_result.error_message)
 
+    
+    def test_certificate_validation_cache(self):
+        """Test that successful validations are reused until they expire."""
+        security_service = SecurityService(self.config)
+        security_service.load_certificates()
+        
+        with patch.object(security_service, '_validate_against_ca',
+                          wraps=security_service._validate_against_ca) as mock_validate:
+            first = security_service.validate_client_certificate(self.client_cert_pem)
+            second = security_service.validate_client_certificate(self.client_cert_pem)
+            self.assertTrue(second.is_authenticated)
+            self.assertEqual(second.client_id, first.client_id)
+            self.assertEqual(mock_validate.call_count, 1)
+            
+            # Cached results are never used past the certificate's NotAfter
+            expiry = (datetime.now(timezone.utc) + timedelta(days=31)).timestamp()
+            with patch('src.security.security_service.time.time', return_value=expiry):
+                security_service.validate_client_certificate(self.client_cert_pem)
+            self.assertEqual(mock_validate.call_count, 2)
+            
+            # Switching to another CA invalidates cached results
+            other_ca, _ = self._create_test_ca()
+            security_service._certificate_bundle.ca_cert = other_ca.public_bytes(
+                serialization.Encoding.PEM
+            ).decode()
+            result = security_service.validate_client_certificate(self.client_cert_pem)
+            self.assertFalse(result.is_authenticated)
+            self.assertEqual(mock_validate.call_count, 3)
+
+    
+    def test_parsed_certificate_cache(self):
+        """Test that a certificate PEM is parsed once and then reused."""
+        security_service = SecurityService(self.config)
+        
+        with patch('src.security.security_service.x509.load_pem_x509_certificate',
+                   wraps=x509.load_pem_x509_certificate) as mock_load:
+            first = security_service.get_certificate_info(self.client_cert_pem)
+            second = security_service.get_certificate_info(self.client_cert_pem)
+            self.assertEqual(mock_load.call_count, 1)
+        
+        self.assertEqual(first.fingerprint, second.fingerprint)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
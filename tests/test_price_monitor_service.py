@@ -2,6 +2,7 @@
 Tests for the PriceMonitorService.
 """
 import unittest
+from array import array
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timedelta
 import threading
@@ -395,6 +396,24 @@ class TestPriceMonitorService(unittest.TestCase):
         self.service.stop_scheduler()
         self.assertFalse(self.service.is_scheduler_running())
     
+    @patch('src.services.price_monitor_service.schedule')
+    def test_stop_scheduler_joins_thread(self, mock_schedule):
+        """Test that stopping the scheduler ends its thread without waiting out the poll interval."""
+        self.service.start_scheduler("09:00")
+        first_thread = self.service._scheduler_thread
+        time.sleep(0.1)
+        
+        start = time.monotonic()
+        self.service.stop_scheduler()
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertFalse(first_thread.is_alive())
+        
+        # A restart runs a fresh loop with its own stop event
+        self.service.start_scheduler("09:00")
+        self.assertIsNot(self.service._scheduler_thread, first_thread)
+        self.service.stop_scheduler()
+        self.assertFalse(self.service._scheduler_thread.is_alive())
+    
     @patch('src.services.price_monitor_service.schedule')
     def test_start_scheduler_with_frequency_hourly(self, mock_schedule):
         """Test starting scheduler with hourly frequency."""
@@ -517,17 +536,19 @@ class TestPriceMonitorService(unittest.TestCase):
         )
         self.mock_product_service.get_product.return_value = product
         
-        # Mock price history (prices going down over time - most recent first)
-        from src.models.database import PriceHistory
-        price_history = [
-            PriceHistory(id=3, product_id=1, price=95.0, recorded_at=datetime.now(), source='automatic'),
-            PriceHistory(id=2, product_id=1, price=100.0, recorded_at=datetime.now() - timedelta(days=5), source='automatic'),
-            PriceHistory(id=1, product_id=1, price=105.0, recorded_at=datetime.now() - timedelta(days=10), source='automatic')
-        ]
-        self.mock_product_service.get_price_history.return_value = price_history
+        # Mock price series (prices going down over time - oldest first)
+        now = datetime.now()
+        timestamps = array('d', [(now - timedelta(days=10)).timestamp(),
+                                 (now - timedelta(days=5)).timestamp(),
+                                 now.timestamp()])
+        prices = array('d', [105.0, 100.0, 95.0])
+        self.mock_product_service.get_price_series.return_value = (timestamps, prices)
         
         summary = self.service.get_price_comparison_summary(1, 30)
         
+        _, kwargs = self.mock_product_service.get_price_series.call_args
+        self.assertGreaterEqual(kwargs['since'], now - timedelta(days=30))
+        
         self.assertEqual(summary['product_name'], "Test Product")
         self.assertEqual(summary['current_price'], 95.0)
         self.assertEqual(summary['lowest_price'], 85.0)
@@ -544,7 +565,7 @@ class TestPriceMonitorService(unittest.TestCase):
             url="https://example.com", is_active=True
         )
         self.mock_product_service.get_product.return_value = product
-        self.mock_product_service.get_price_history.return_value = []
+        self.mock_product_service.get_price_series.return_value = (array('d'), array('d'))
         
         summary = self.service.get_price_comparison_summary(1, 30)
         
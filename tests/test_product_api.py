@@ -91,7 +91,7 @@ class TestProductAPI(unittest.TestCase):
         """Test getting products when none exist."""
         client, app = self._create_app_client()
         
-        with patch.object(app.product_service, 'get_all_products', return_value=[]):
+        with patch.object(app.product_service, 'query_products', return_value=([], 0)):
             response = client.get('/api/products')
             
             self.assertEqual(response.status_code, 200)
@@ -102,7 +102,7 @@ class TestProductAPI(unittest.TestCase):
     
     def test_get_products_with_data(self, app_client, sample_product):
         """Test getting products with data."""
-        with patch.object(app_client.application.product_service, 'get_all_products', return_value=[sample_product]):
+        with patch.object(app_client.application.product_service, 'query_products', return_value=([sample_product], 1)):
             response = app_client.get('/api/products')
             
             assert response.status_code == 200
@@ -118,18 +118,18 @@ class TestProductAPI(unittest.TestCase):
     
     def test_get_products_active_only_filter(self, app_client):
         """Test getting products with active_only filter."""
-        with patch.object(app_client.application.product_service, 'get_all_products') as mock_get:
+        with patch.object(app_client.application.product_service, 'query_products', return_value=([], 0)) as mock_get:
             # Test active_only=true (default)
             app_client.get('/api/products')
-            mock_get.assert_called_with(active_only=True)
+            assert mock_get.call_args.kwargs['active_only'] is True
             
             # Test active_only=false
             app_client.get('/api/products?active_only=false')
-            mock_get.assert_called_with(active_only=False)
+            assert mock_get.call_args.kwargs['active_only'] is False
     
     def test_get_products_error(self, app_client):
         """Test error handling in get products."""
-        with patch.object(app_client.application.product_service, 'get_all_products', side_effect=Exception("Database error")):
+        with patch.object(app_client.application.product_service, 'query_products', side_effect=Exception("Database error")):
             response = app_client.get('/api/products')
             
             assert response.status_code == 500
@@ -384,8 +384,8 @@ class TestProductAPI(unittest.TestCase):
     
     def test_get_product_details_success(self, app_client, sample_product, sample_price_history):
         """Test successfully getting product details."""
-        with patch.object(app_client.application.product_service, 'get_product', return_value=sample_product), \
-             patch.object(app_client.application.product_service, 'get_price_history', return_value=sample_price_history):
+        with patch.object(app_client.application.product_service, 'get_product_with_recent_history',
+                          return_value=(sample_product, sample_price_history)):
             
             response = app_client.get('/api/products/1')
             
@@ -397,7 +397,8 @@ class TestProductAPI(unittest.TestCase):
     
     def test_get_product_details_not_found(self, app_client):
         """Test getting details for non-existent product."""
-        with patch.object(app_client.application.product_service, 'get_product', return_value=None):
+        with patch.object(app_client.application.product_service, 'get_product_with_recent_history',
+                          return_value=(None, [])):
             response = app_client.get('/api/products/999')
             
             assert response.status_code == 404
@@ -3,10 +3,11 @@ Tests for product listing and management features.
 """
 import unittest
 import json
+import time
 from unittest.mock import Mock, patch
 from datetime import datetime
 
-from src.app import SecureFlaskApp
+from src.app import SecureFlaskApp, PRODUCTS_CACHE_TTL_SECONDS
 from src.services.config_service import ConfigService
 from src.models.database import Product
 
@@ -305,6 +306,27 @@ class TestProductListingFeatures(unittest.TestCase):
         sorted_products = sorted(products_with_none, key=lambda p: p.created_at or datetime.min)
         self.assertEqual(sorted_products[0].id, 1)  # None (treated as min) comes first
 
+    
+    def test_products_page_cache(self):
+        """Test caching and invalidation of serialized product list pages."""
+        with patch('src.app.DatabaseManager'), \
+             patch('src.app.SecurityService'), \
+             patch('src.app.setup_mtls_authentication'):
+            
+            app = SecureFlaskApp(self.mock_config_service)
+            key = ('client', True, '', 'created_at', 'desc', None, 0)
+            
+            self.assertIsNone(app.get_cached_products_page(key))
+            app.cache_products_page(key, '{"products": []}')
+            self.assertEqual(app.get_cached_products_page(key), '{"products": []}')
+            
+            # Entries expire after the TTL
+            with patch('src.app.time.monotonic', return_value=time.monotonic() + PRODUCTS_CACHE_TTL_SECONDS + 1):
+                self.assertIsNone(app.get_cached_products_page(key))
+            
+            # Product mutations drop every cached page
+            app.invalidate_products_cache()
+            self.assertIsNone(app.get_cached_products_page(key))
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
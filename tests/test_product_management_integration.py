@@ -2,13 +2,19 @@
 Integration tests for complete product management workflow.
 """
 import unittest
+import io
 import json
+import os
+import tempfile
 from unittest.mock import Mock, patch
 from datetime import datetime
 
+from flask import g
+
 from src.app import SecureFlaskApp
 from src.services.config_service import ConfigService
-from src.models.database import Product, PriceHistory
+from src.models.database import Product, PriceHistory, DatabaseManager
+from src.services.product_service import ProductService
 from src.models.web_scraping import PageContent, ProductInfo
 from src.services.parser_service import ParsingServiceResult
 from src.services.web_scraping_service import ScrapingResult
@@ -104,19 +110,37 @@ class TestProductManagementIntegration(unittest.TestCase):
             app = SecureFlaskApp(self.mock_config_service)
             app.app.config['TESTING'] = True
             
-            client = app.app.test_client()
-            
-            # Mock the g.client_id for authentication
-            with app.app.app_context():
-                from flask import g
+            # mTLS setup is patched out, so authenticate every request the
+            # way its before_request hook would
+            @app.app.before_request
+            def authenticate_test_client():
+                g.authenticated = True
                 g.client_id = 'test_client'
-                return client, app
+            
+            return app.app.test_client(), app
+    
+    def _create_seeded_product_service(self):
+        """Create a product service on a temporary database holding the sample products."""
+        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        temp_db.close()
+        self.addCleanup(os.unlink, temp_db.name)
+        
+        db_manager = DatabaseManager(f"sqlite:///{temp_db.name}")
+        db_manager.create_tables()
+        self.addCleanup(db_manager.engine.dispose)
+        
+        with db_manager.get_session() as session:
+            for product in self.sample_products:
+                session.merge(product)
+            session.commit()
+        
+        return ProductService(db_manager)
     
     def test_product_listing_with_filtering_and_sorting(self):
         """Test product listing with various filtering and sorting options."""
         client, app = self._create_app_client()
         
-        with patch.object(app.product_service, 'get_all_products', return_value=self.sample_products):
+        with patch.object(app, 'product_service', self._create_seeded_product_service()):
             # Test default listing (active only, sorted by created_at desc)
             response = client.get('/api/products')
             self.assertEqual(response.status_code, 200)
@@ -223,7 +247,12 @@ class TestProductManagementIntegration(unittest.TestCase):
         # Step 1: Add a new product
         mock_scraping_result = ScrapingResult(
             success=True,
-            page_content=PageContent(html="<html>Test</html>", url="https://example.com/new-product")
+            page_content=PageContent(
+                url="https://example.com/new-product",
+                html="<html>Test</html>",
+                status_code=200,
+                headers={}
+            )
         )
         
         mock_product_info = ProductInfo(
@@ -264,8 +293,7 @@ class TestProductManagementIntegration(unittest.TestCase):
             self.assertEqual(data['product']['name'], 'New Test Product')
         
         # Step 2: Get product details
-        with patch.object(app.product_service, 'get_product', return_value=new_product), \
-             patch.object(app.product_service, 'get_price_history', return_value=[]):
+        with patch.object(app.product_service, 'get_product_with_recent_history', return_value=(new_product, [])):
             
             response = client.get('/api/products/4')
             self.assertEqual(response.status_code, 200)
@@ -351,7 +379,8 @@ class TestProductManagementIntegration(unittest.TestCase):
         """Test that price change information is calculated correctly."""
         client, app = self._create_app_client()
         
-        with patch.object(app.product_service, 'get_all_products', return_value=self.sample_products):
+        with patch.object(app.product_service, 'count_products', return_value=3), \
+             patch.object(app.product_service, 'query_products', return_value=(self.sample_products, 3)):
             response = client.get('/api/products')
             self.assertEqual(response.status_code, 200)
             data = json.loads(response.data)
@@ -368,6 +397,36 @@ class TestProductManagementIntegration(unittest.TestCase):
             product_without_change = next(p for p in data['products'] if p['id'] == 2)
             self.assertIsNone(product_without_change['price_change'])
     
+    def test_large_listing_streamed_without_loading_rows_first(self):
+        """Test that a large unpaginated listing is counted once and streamed."""
+        client, app = self._create_app_client()
+        
+        with patch.object(app.product_service, 'count_products', return_value=1001) as mock_count, \
+             patch.object(app.product_service, 'iter_products',
+                          return_value=iter(self.sample_products)) as mock_iter, \
+             patch.object(app.product_service, 'query_products') as mock_query:
+            response = client.get('/api/products')
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.get_data())
+        
+        mock_count.assert_called_once()
+        mock_iter.assert_called_once()
+        mock_query.assert_not_called()
+        self.assertEqual(data['total_count'], 1001)
+        self.assertEqual([p['id'] for p in data['products']], [p.id for p in self.sample_products])
+    
+    def test_small_listing_counted_once(self):
+        """Test that an unpaginated listing under the streaming threshold reuses its count."""
+        client, app = self._create_app_client()
+        
+        with patch.object(app.product_service, 'count_products', return_value=3), \
+             patch.object(app.product_service, 'query_products',
+                          return_value=(self.sample_products, 3)) as mock_query:
+            response = client.get('/api/products')
+            self.assertEqual(response.status_code, 200)
+        
+        self.assertEqual(mock_query.call_args.kwargs['total_count'], 3)
+    
     def test_error_handling_in_workflow(self):
         """Test error handling throughout the product management workflow."""
         client, app = self._create_app_client()
@@ -379,7 +438,7 @@ class TestProductManagementIntegration(unittest.TestCase):
         self.assertEqual(response.status_code, 400)
         
         # Test getting non-existent product
-        with patch.object(app.product_service, 'get_product', return_value=None):
+        with patch.object(app.product_service, 'get_product_with_recent_history', return_value=(None, [])):
             response = client.get('/api/products/999')
             self.assertEqual(response.status_code, 404)
         
@@ -399,6 +458,50 @@ class TestProductManagementIntegration(unittest.TestCase):
         with patch.object(app.product_service, 'get_product', return_value=None):
             response = client.get('/api/products/999/history')
             self.assertEqual(response.status_code, 404)
+    
+    def test_request_body_validation(self):
+        """Test that malformed and oversized request bodies are rejected before any work."""
+        client, app = self._create_app_client()
+        
+        with patch.object(app.product_service, 'get_product_by_url') as mock_get_by_url:
+            # Malformed JSON is treated as a missing URL
+            response = client.post('/api/products', data='{"url": ',
+                                   content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json()['message'], 'URL is required')
+            
+            # Non-object payloads and non-string URLs are rejected the same way
+            response = client.post('/api/products', json=['https://example.com/product/1'])
+            self.assertEqual(response.status_code, 400)
+            response = client.post('/api/products', json={'url': 42})
+            self.assertEqual(response.status_code, 400)
+            
+            # Oversized bodies are refused without being parsed
+            response = client.post('/api/products',
+                                   json={'url': 'https://example.com/' + 'a' * 5000})
+            self.assertEqual(response.status_code, 413)
+            
+            # So are bodies that do not declare their length
+            body = json.dumps({'url': 'https://example.com/' + 'a' * 5000}).encode()
+            response = client.post('/api/products', input_stream=io.BytesIO(body),
+                                   content_type='application/json',
+                                   headers={'Transfer-Encoding': 'chunked'},
+                                   environ_overrides={'wsgi.input_terminated': True})
+            self.assertEqual(response.status_code, 413)
+            
+            mock_get_by_url.assert_not_called()
+        
+        with patch.object(app.product_service, 'get_product') as mock_get_product:
+            response = client.put('/api/products/1/price', data='not json',
+                                  content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json()['message'], 'Price is required')
+            
+            response = client.put('/api/products/1/price', json={'price': 'cheap'})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json()['error'], 'Invalid price')
+            
+            mock_get_product.assert_not_called()
 
 
 if __name__ == '__main__':
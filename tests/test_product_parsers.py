@@ -4,12 +4,17 @@ Tests for product parsing functionality.
 import unittest
 from unittest.mock import Mock, patch
 import json
+import socket
+import threading
+import time
 
 from src.models.web_scraping import PageContent, ProductInfo
 from src.parsers.product_parser import ProductParser, ParsingResult
 from src.parsers.html_parser import HtmlCssParser
 from src.parsers.structured_data_parser import StructuredDataParser
-from src.parsers.ai_parser import AIParser
+import requests
+
+from src.parsers.ai_parser import AIParser, MAX_HTML_CHARS
 
 
 class TestProductParser(unittest.TestCase):
@@ -227,6 +232,56 @@ class TestHtmlCssParser(unittest.TestCase):
         
         self.assertFalse(result.success)
         self.assertIn("minimum required", result.error_message)
+    
+    def test_make_soup_uses_lxml(self):
+        """Test that pages are parsed with the lxml tree builder."""
+        soup = self.parser._make_soup(self.sample_html)
+        
+        self.assertIn('lxml', soup.builder.features)
+        self.assertEqual(soup.select_one('h1').get_text(strip=True), "Awesome Test Product")
+    
+    def test_can_parse_then_parse_builds_tree_once(self):
+        """Test that parse reuses the tree built by can_parse for the same page."""
+        with patch.object(self.parser, '_make_soup', wraps=self.parser._make_soup) as mock_make_soup:
+            self.assertTrue(self.parser.can_parse(self.page_content))
+            result = self.parser.parse(self.page_content)
+        
+        self.assertTrue(result.success)
+        self.assertEqual(mock_make_soup.call_count, 1)
+    
+    def test_can_parse_with_plain_add_to_cart_text(self):
+        """Test that add-to-cart text in unattributed elements counts as an indicator."""
+        for markup in ('<div><span>Add to cart</span></div>', '<p>Buy now</p>'):
+            with self.subTest(markup=markup):
+                content = PageContent(
+                    url="https://example.com/item",
+                    html=f'<html><body><div class="price">$10.00</div>{markup}</body></html>',
+                    status_code=200,
+                    headers={}
+                )
+                self.assertTrue(self.parser.can_parse(content))
+    
+    def test_selector_priority_beats_document_order(self):
+        """Test that combined selector queries keep the selector list priority."""
+        html = """
+        <html><body>
+            <span class="entry-title">Earlier Listing Title</span>
+            <div data-price="12.50"></div>
+            <h1>Priority Product Name</h1>
+            <div class="sale-price">$9.99</div>
+        </body></html>
+        """
+        soup = self.parser._make_soup(html)
+        
+        self.assertEqual(self.parser._extract_product_name(soup), "Priority Product Name")
+        self.assertEqual(self.parser._extract_product_price(soup), 9.99)
+        for first_only in (False, True):
+            with self.subTest(first_only=first_only):
+                expected = []
+                for selector in self.parser.price_selectors:
+                    matches = soup.select(selector)
+                    expected.extend(matches[:1] if first_only else matches)
+                self.assertEqual(self.parser._price_query.select(soup, first_only=first_only), expected)
 
 
 class TestStructuredDataParser(unittest.TestCase):
@@ -399,7 +454,7 @@ class TestAIParser(unittest.TestCase):
         no_key_parser = AIParser(api_key=None)
         self.assertFalse(no_key_parser.can_parse(self.page_content))
     
-    @patch('src.parsers.ai_parser.requests.post')
+    @patch('src.parsers.ai_parser.requests.Session.post')
     def test_parse_success(self, mock_post):
         """Test successful AI parsing."""
         # Mock AI API response
@@ -430,7 +485,131 @@ class TestAIParser(unittest.TestCase):
         self.assertEqual(result.product_info.image_url, "https://example.com/images/ai-product.jpg")
         self.assertEqual(result.confidence_score, 0.8)
     
-    @patch('src.parsers.ai_parser.requests.post')
+    @patch('src.parsers.ai_parser.requests.Session.post')
+    def test_parse_reuses_result_for_unchanged_page(self, mock_post):
+        """Test that an unchanged page is not sent to the AI again."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'choices': [{'message': {'content': '{"name": "AI Test Product", "price": 59.99}'}}]
+        }
+        mock_post.return_value = mock_response
+        
+        first = self.parser.parse(self.page_content)
+        first.product_info.price = 1.0
+        second = self.parser.parse(self.page_content)
+        
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertTrue(second.success)
+        self.assertEqual(second.product_info.price, 59.99)
+        
+        changed_page = PageContent(
+            url=self.page_content.url,
+            html=self.sample_html.replace("$59.99", "$49.99"),
+            status_code=200,
+            headers={}
+        )
+        self.parser.parse(changed_page)
+        self.assertEqual(mock_post.call_count, 2)
+    
+    @patch('src.parsers.ai_parser.requests.Session.post')
+    def test_parse_known_site_without_api_call(self, mock_post):
+        """Test that pages from sites with rules are parsed without calling the AI."""
+        html = """
+        <html><body>
+            <span id="productTitle"> Rules Product </span>
+            <div id="corePrice_feature_div">
+                <span class="a-price"><span class="a-offscreen">$1,299.00</span></span>
+            </div>
+            <img id="landingImage" src="/images/rules.jpg">
+        </body></html>
+        """
+        content = PageContent(url="https://www.amazon.com/dp/B000TEST", html=html,
+                              status_code=200, headers={})
+        
+        result = self.parser.parse(content)
+        
+        mock_post.assert_not_called()
+        self.assertTrue(result.success)
+        self.assertEqual(result.confidence_score, 0.95)
+        self.assertEqual(result.product_info.name, "Rules Product")
+        self.assertEqual(result.product_info.price, 1299.0)
+        self.assertEqual(result.product_info.currency, "USD")
+        self.assertEqual(result.product_info.image_url, "https://www.amazon.com/images/rules.jpg")
+    
+    @patch('src.parsers.ai_parser.requests.Session.post')
+    def test_parse_known_site_falls_back_to_api(self, mock_post):
+        """Test that a known site whose page no longer matches its rules goes to the AI."""
+        mock_post.return_value = Mock(status_code=500, text="error")
+        content = PageContent(url="https://www.amazon.com/dp/B000TEST", html=self.sample_html,
+                              status_code=200, headers={})
+        
+        self.parser.parse(content)
+        
+        mock_post.assert_called_once()
+    
+    @patch('src.parsers.ai_parser.requests.Session.post')
+    def test_parse_known_site_xhtml_and_empty_pages(self, mock_post):
+        """Test that XHTML pages from known sites use the rules and empty pages go to the AI."""
+        mock_post.return_value = Mock(status_code=500, text="error")
+        xhtml = """<?xml version="1.0" encoding="UTF-8"?>
+        <html xmlns="http://www.w3.org/1999/xhtml"><body>
+            <span id="productTitle">XHTML Product</span>
+            <div id="corePrice_feature_div">
+                <span class="a-price"><span class="a-offscreen">$19.99</span></span>
+            </div>
+        </body></html>
+        """
+        content = PageContent(url="https://www.amazon.com/dp/B000XHTML", html=xhtml,
+                              status_code=200, headers={})
+        
+        result = self.parser.parse(content)
+        
+        mock_post.assert_not_called()
+        self.assertTrue(result.success)
+        self.assertEqual(result.product_info.name, "XHTML Product")
+        self.assertEqual(result.product_info.price, 19.99)
+        
+        empty = PageContent(url="https://www.ebay.com/itm/1", html="  ", status_code=200, headers={})
+        self.assertIsNone(self.parser._parse_with_domain_rules(empty))
+        self.parser.parse(empty)
+        mock_post.assert_called_once()
+    
+    def test_parse_many_runs_calls_concurrently(self):
+        """Test that batch parsing overlaps API calls and keeps input order."""
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+        
+        def slow_post(*args, **kwargs):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.pop()
+            prompt = kwargs['json']['messages'][0]['content']
+            price = prompt.split('<div class="price">$')[1].split('<')[0]
+            response = Mock(status_code=200)
+            response.json.return_value = {
+                'choices': [{'message': {'content': json.dumps({'name': 'Batch', 'price': float(price)})}}]
+            }
+            return response
+        
+        contents = [
+            PageContent(url=f"https://example.com/batch/{i}",
+                        html=self.sample_html.replace("59.99", f"{i + 1}.00"),
+                        status_code=200, headers={})
+            for i in range(4)
+        ]
+        
+        with patch.object(self.parser.session, 'post', side_effect=slow_post):
+            results = self.parser.parse_many(contents, max_workers=4)
+        
+        self.assertEqual([r.product_info.price for r in results], [1.0, 2.0, 3.0, 4.0])
+        self.assertGreater(max(peak), 1)
+    
+    @patch('src.parsers.ai_parser.requests.Session.post')
     def test_parse_api_error(self, mock_post):
         """Test handling of AI API errors."""
         mock_response = Mock()
@@ -443,6 +622,57 @@ class TestAIParser(unittest.TestCase):
         self.assertFalse(result.success)
         self.assertIn("AI API call failed", result.error_message)
     
+    def test_api_session_reused(self):
+        """Test that API calls share one pooled session with retries configured."""
+        session = self.parser.session
+        self.assertEqual(session.headers['Authorization'], 'Bearer test-key')
+        
+        adapter = session.get_adapter(self.parser.api_endpoint)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIn('POST', adapter.max_retries.allowed_methods)
+        
+        with patch.object(session, 'post') as mock_post:
+            mock_post.return_value = Mock(status_code=500, text="error")
+            self.parser._call_ai_api("first")
+            self.parser._call_ai_api("second")
+        
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertIs(self.parser.session, session)
+    
+    def test_api_read_timeout_not_retried(self):
+        """Test that a completion request that times out waiting for a response is sent once."""
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+        server.settimeout(0.05)
+        connections = []
+        stop = threading.Event()
+        
+        def accept_and_stall():
+            # Read each request but never answer it
+            while not stop.is_set():
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    continue
+                connections.append(connection)
+                connection.recv(65536)
+        
+        acceptor = threading.Thread(target=accept_and_stall, daemon=True)
+        acceptor.start()
+        try:
+            url = f"http://127.0.0.1:{server.getsockname()[1]}/v1/chat/completions"
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                self.parser.session.post(url, json={'messages': []}, timeout=0.2)
+        finally:
+            stop.set()
+            acceptor.join(timeout=5)
+            server.close()
+            for connection in connections:
+                connection.close()
+        
+        self.assertEqual(len(connections), 1)
+    
     def test_parse_disabled(self):
         """Test parsing when AI is disabled."""
         disabled_parser = AIParser(enabled=False)
@@ -451,6 +681,14 @@ class TestAIParser(unittest.TestCase):
         self.assertFalse(result.success)
         self.assertIn("AI parsing is disabled", result.error_message)
     
+    def test_create_extraction_prompt(self):
+        """Test that the prompt embeds the URL and HTML in the fixed template."""
+        prompt = self.parser._create_extraction_prompt("<main>Item</main>", "https://example.com/item")
+        
+        self.assertIn("content from URL: https://example.com/item\n", prompt)
+        self.assertIn("HTML Content:\n<main>Item</main>\n\nJSON Response:\n", prompt)
+        self.assertTrue(prompt.endswith("JSON Response:\n"))
+    
     def test_clean_html_for_ai(self):
         """Test HTML cleaning for AI processing."""
         messy_html = """
@@ -479,6 +717,60 @@ class TestAIParser(unittest.TestCase):
         # Should keep main content
         self.assertIn('Product Name', cleaned)
         self.assertIn('$29.99', cleaned)
+    
+    def test_clean_html_for_ai_xhtml(self):
+        """Test that XHTML pages with an encoding declaration are cleaned, not passed through."""
+        xhtml = """<?xml version="1.0" encoding="UTF-8"?>
+        <!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN"
+            "http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd">
+        <html xmlns="http://www.w3.org/1999/xhtml">
+        <head><script>trackVisitor();</script><style>.price { color: red; }</style></head>
+        <body><main><h1>Café Grinder</h1><div class="price">€49.99</div></main></body>
+        </html>
+        """
+        
+        cleaned = self.parser._clean_html_for_ai(xhtml)
+        
+        self.assertNotIn('trackVisitor', cleaned)
+        self.assertNotIn('color: red', cleaned)
+        self.assertNotIn('<?xml', cleaned)
+        self.assertIn('Café Grinder', cleaned)
+        self.assertIn('€49.99', cleaned)
+        
+        self.assertEqual(self.parser._clean_html_for_ai(''), '')
+    
+    def test_clean_html_collapses_whitespace_before_truncating(self):
+        """Test that indentation does not use up the HTML budget."""
+        def page(row_count):
+            rows = "".join(f"\n            <p>Item {i}</p>" for i in range(row_count))
+            return f"<html><body><main>{rows}\n            <p>Last item</p></main></body></html>"
+        
+        # Over the budget as written, within it once indentation is collapsed
+        html = page(400)
+        self.assertGreater(len(html), MAX_HTML_CHARS)
+        cleaned = self.parser._clean_html_for_ai(html)
+        self.assertFalse('\n' in cleaned)
+        self.assertIn('Last item', cleaned)
+        
+        truncated = self.parser._clean_html_for_ai(page(1000))
+        self.assertEqual(len(truncated), MAX_HTML_CHARS + 3)
+        self.assertTrue(truncated.endswith('...'))
+    
+    def test_clean_html_prefers_earlier_selectors(self):
+        """Test that main content follows selector priority, not document order."""
+        html = """
+        <html><body>
+            <div id="content">
+                <nav>Navigation</nav>
+                <div class="product-details"><h1>Nested Product</h1></div>
+            </div>
+        </body></html>
+        """
+        
+        cleaned = self.parser._clean_html_for_ai(html)
+        
+        self.assertTrue(cleaned.startswith('<div class="product-details">'))
+        self.assertNotIn('Navigation', cleaned)
 
 
 if __name__ == '__main__':
@@ -6,9 +6,15 @@ import unittest
 import tempfile
 import os
 from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from sqlalchemy import create_mock_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
 
 from src.models.database import get_database_manager, Product, PriceHistory
-from src.services.product_service import ProductService
+from src.services.product_service import ProductService, _filter_products
 
 
 class TestProductService(unittest.TestCase):
@@ -29,6 +35,7 @@ class TestProductService(unittest.TestCase):
     
     def tearDown(self):
         """Clean up test database."""
+        self.db_manager.close()
         os.unlink(self.temp_db.name)
     
     def test_add_product_success(self):
@@ -66,6 +73,58 @@ class TestProductService(unittest.TestCase):
         )
         self.assertIsNone(product2)
     
+    def test_add_products_bulk(self):
+        """Test adding several products in one transaction."""
+        products = self.product_service.add_products_bulk([
+            {'url': "https://example.com/product1", 'name': "Product 1", 'price': 99.99},
+            {'url': "https://example.com/product2", 'name': "Product 2", 'price': 149.99,
+             'image_url': "https://example.com/image2.jpg"},
+        ])
+        
+        self.assertEqual(len(products), 2)
+        self.assertEqual(products[0].url, "https://example.com/product1")
+        self.assertEqual(products[1].image_url, "https://example.com/image2.jpg")
+        self.assertEqual(products[1].lowest_price, 149.99)
+        
+        # Each product gets its initial price history entry
+        for product in products:
+            history = self.product_service.get_price_history(product.id)
+            self.assertEqual(len(history), 1)
+            self.assertEqual(history[0].source, 'manual')
+    
+    def test_add_products_bulk_without_insert_returning(self):
+        """Test the portable bulk insert on databases without INSERT ... RETURNING."""
+        with patch.object(self.db_manager.engine.dialect, 'insert_returning', False):
+            products = self.product_service.add_products_bulk([
+                {'url': "https://example.com/product1", 'name': "Product 1", 'price': 99.99},
+                {'url': "https://example.com/product2", 'name': "Product 2", 'price': 149.99},
+            ])
+        
+        self.assertEqual([p.url for p in products],
+                         ["https://example.com/product1", "https://example.com/product2"])
+        for product in products:
+            stored = self.product_service.get_product(product.id)
+            self.assertEqual(stored.url, product.url)
+            history = self.product_service.get_price_history(product.id)
+            self.assertEqual(len(history), 1)
+            self.assertEqual(history[0].price, product.current_price)
+    
+    def test_add_products_bulk_duplicate_fails(self):
+        """Test that a bulk insert containing an existing URL adds nothing."""
+        self.product_service.add_product(
+            url="https://example.com/product1",
+            name="Test Product",
+            price=99.99
+        )
+        
+        products = self.product_service.add_products_bulk([
+            {'url': "https://example.com/product2", 'name': "Product 2", 'price': 149.99},
+            {'url': "https://example.com/product1", 'name': "Duplicate", 'price': 89.99},
+        ])
+        
+        self.assertEqual(products, [])
+        self.assertEqual(len(self.product_service.get_all_products()), 1)
+    
     def test_get_product_by_id(self):
         """Test getting a product by ID."""
         # Add product
@@ -144,6 +203,55 @@ class TestProductService(unittest.TestCase):
         all_products = self.product_service.get_all_products(active_only=False)
         self.assertEqual(len(all_products), 2)
     
+    def test_iter_products_streams_in_chunks(self):
+        """Test that iter_products yields every product across chunk boundaries."""
+        self.product_service.add_products_bulk([
+            {'url': f"https://example.com/product{i}", 'name': f"Product {i}", 'price': 10.0 + i}
+            for i in range(5)
+        ])
+        
+        iterator = self.product_service.iter_products(chunk_size=2)
+        self.assertNotIsInstance(iterator, list)
+        
+        streamed = list(iterator)
+        self.assertEqual(len(streamed), 5)
+        self.assertEqual(
+            [p.id for p in streamed],
+            [p.id for p in self.product_service.get_all_products()]
+        )
+    
+    def test_iter_products_validates_sort_field_on_call(self):
+        """Test that an invalid sort field is rejected before iteration starts."""
+        with self.assertRaises(ValueError):
+            self.product_service.iter_products(sort_by='price; DROP TABLE products')
+    
+    def test_iter_products_raises_database_errors_mid_stream(self):
+        """Test that a database failure while streaming is not swallowed."""
+        self.product_service.add_products_bulk([
+            {'url': f"https://example.com/product{i}", 'name': f"Product {i}", 'price': 10.0 + i}
+            for i in range(3)
+        ])
+        
+        from src.services import product_service as product_service_module
+        listed_product = product_service_module._listed_product
+        calls = []
+        
+        def fail_after_first(*args):
+            calls.append(args)
+            if len(calls) > 1:
+                raise OperationalError('SELECT', {}, Exception('disk I/O error'))
+            return listed_product(*args)
+        
+        iterator = self.product_service.iter_products(chunk_size=1)
+        with patch.object(product_service_module, '_listed_product', side_effect=fail_after_first):
+            self.assertIsNotNone(next(iterator))
+            with self.assertRaises(OperationalError):
+                next(iterator)
+        
+        with patch.object(product_service_module, '_listed_product',
+                          side_effect=OperationalError('SELECT', {}, Exception('disk I/O error'))):
+            self.assertEqual(self.product_service.get_all_products(), [])
+    
     def test_update_product_price(self):
         """Test updating a product's price."""
         # Add product
@@ -182,6 +290,54 @@ class TestProductService(unittest.TestCase):
         self.assertEqual(updated_product.previous_price, 99.99)
         self.assertEqual(updated_product.lowest_price, 99.99)  # Should remain the same
     
+    def test_update_prices_bulk(self):
+        """Test updating several prices in one transaction."""
+        product1 = self.product_service.add_product(
+            url="https://example.com/product1",
+            name="Product 1",
+            price=99.99
+        )
+        product2 = self.product_service.add_product(
+            url="https://example.com/product2",
+            name="Product 2",
+            price=149.99
+        )
+        
+        updated = self.product_service.update_prices_bulk([
+            (product1.id, 89.99, 'automatic'),
+            (product2.id, 159.99, 'manual'),
+            (9999, 10.0, 'manual'),  # Unknown product is skipped
+        ])
+        self.assertEqual(updated, 2)
+        
+        product1 = self.product_service.get_product(product1.id)
+        self.assertEqual(product1.current_price, 89.99)
+        self.assertEqual(product1.previous_price, 99.99)
+        self.assertEqual(product1.lowest_price, 89.99)
+        
+        product2 = self.product_service.get_product(product2.id)
+        self.assertEqual(product2.current_price, 159.99)
+        self.assertEqual(product2.previous_price, 149.99)
+        self.assertEqual(product2.lowest_price, 149.99)
+        
+        history = self.product_service.get_price_history(product2.id)
+        self.assertEqual(len(history), 2)
+        self.assertEqual(history[0].source, 'manual')
+        
+        # A product updated twice is counted once, with both updates applied
+        updated = self.product_service.update_prices_bulk([
+            (product1.id, 79.99, 'automatic'),
+            (product1.id, 84.99, 'automatic'),
+            (9999, 10.0, 'manual'),
+        ])
+        self.assertEqual(updated, 1)
+        
+        product1 = self.product_service.get_product(product1.id)
+        self.assertEqual(product1.current_price, 84.99)
+        self.assertEqual(product1.previous_price, 79.99)
+        self.assertEqual(product1.lowest_price, 79.99)
+        self.assertEqual(len(self.product_service.get_price_history(product1.id)), 4)
+    
     def test_delete_product(self):
         """Test deleting a product."""
         # Add product
@@ -244,6 +400,45 @@ class TestProductService(unittest.TestCase):
         self.assertEqual(history[2].price, 99.99)
         self.assertEqual(history[2].source, 'manual')  # Initial price is marked as manual
     
+    def test_get_product_with_recent_history(self):
+        """Test getting a product and its latest history entries together."""
+        product = self.product_service.add_product("https://example.com/product1", "Test Product", 99.99)
+        self.product_service.update_product_price(product.id, 89.99, 'automatic')
+        self.product_service.update_product_price(product.id, 79.99, 'manual')
+        
+        loaded, history = self.product_service.get_product_with_recent_history(product.id, limit=2)
+        
+        self.assertEqual(loaded.name, "Test Product")
+        self.assertEqual(loaded.current_price, 79.99)
+        self.assertEqual([entry.price for entry in history], [79.99, 89.99])
+        
+        # A product without history still loads, and unknown ids return nothing
+        other = self.product_service.add_product("https://example.com/product2", "Other", 10.0)
+        with self.db_manager.get_session() as session:
+            session.query(PriceHistory).filter(PriceHistory.product_id == other.id).delete()
+            session.commit()
+        loaded, history = self.product_service.get_product_with_recent_history(other.id)
+        self.assertEqual(loaded.id, other.id)
+        self.assertEqual(history, [])
+        self.assertEqual(self.product_service.get_product_with_recent_history(999), (None, []))
+    
+    def test_get_price_series(self):
+        """Test getting price history as oldest-first arrays."""
+        product = self.product_service.add_product("https://example.com/product1", "Test Product", 99.99)
+        self.product_service.update_product_price(product.id, 89.99, 'automatic')
+        self.product_service.update_product_price(product.id, 79.99, 'manual')
+        
+        timestamps, prices = self.product_service.get_price_series(product.id)
+        
+        self.assertEqual(list(prices), [99.99, 89.99, 79.99])
+        self.assertEqual(len(timestamps), 3)
+        self.assertEqual(list(timestamps), sorted(timestamps))
+        
+        _, future_prices = self.product_service.get_price_series(
+            product.id, since=datetime.now() + timedelta(days=1)
+        )
+        self.assertEqual(len(future_prices), 0)
+    
     def test_get_price_history_with_limit(self):
         """Test getting price history with a limit."""
         # Add product
@@ -310,6 +505,260 @@ class TestProductService(unittest.TestCase):
         self.assertEqual(prev_price, 89.99)
         self.assertEqual(curr_price, 109.99)
     
+    def test_get_products_with_drop_status(self):
+        """Test batch price drop status matches has_price_dropped."""
+        product1 = self.product_service.add_product(
+            url="https://example.com/product1",
+            name="Dropped Product",
+            price=99.99
+        )
+        product2 = self.product_service.add_product(
+            url="https://example.com/product2",
+            name="Raised Product",
+            price=49.99
+        )
+        product3 = self.product_service.add_product(
+            url="https://example.com/product3",
+            name="Unchanged Product",
+            price=19.99
+        )
+        
+        self.product_service.update_product_price(product1.id, 89.99, 'automatic')
+        self.product_service.update_product_price(product2.id, 59.99, 'automatic')
+        
+        results = self.product_service.get_products_with_drop_status()
+        self.assertEqual(len(results), 3)
+        
+        for product, prev_price, curr_price, has_dropped in results:
+            self.assertEqual(
+                (has_dropped, prev_price, curr_price),
+                self.product_service.has_price_dropped(product.id)
+            )
+        
+        status_by_id = {product.id: has_dropped for product, _, _, has_dropped in results}
+        self.assertTrue(status_by_id[product1.id])
+        self.assertFalse(status_by_id[product2.id])
+        self.assertFalse(status_by_id[product3.id])
+    
+    def test_get_dropped_product_ids(self):
+        """Test selecting only the IDs of products with a price drop."""
+        product1, product2, product3 = self.product_service.add_products_bulk([
+            {'url': "https://example.com/product1", 'name': "Product 1", 'price': 99.99},
+            {'url': "https://example.com/product2", 'name': "Product 2", 'price': 49.99},
+            {'url': "https://example.com/product3", 'name': "Product 3", 'price': 19.99},
+        ])
+        self.product_service.update_prices_bulk([
+            (product1.id, 89.99, 'automatic'),
+            (product2.id, 59.99, 'automatic'),
+            (product3.id, 9.99, 'automatic'),
+        ])
+        self.product_service.deactivate_product(product3.id)
+        
+        self.assertEqual(self.product_service.get_dropped_product_ids(), [product1.id])
+        self.assertEqual(
+            self.product_service.get_dropped_product_ids(active_only=False),
+            [product1.id, product3.id]
+        )
+        self.assertEqual(self.product_service.get_product_statistics()['recent_price_drops'], 1)
+        
+        # Sub-cent float noise written outside the service is not a drop
+        with self.db_manager.get_session() as session:
+            session.query(Product).filter(Product.id == product2.id).update(
+                {'previous_price': 10.0, 'current_price': 9.999999999}
+            )
+            session.commit()
+        self.product_service._statistics_cache = None
+        self.assertEqual(self.product_service.get_dropped_product_ids(), [product1.id])
+        self.assertEqual(self.product_service.get_product_statistics()['recent_price_drops'], 1)
+    
+    def test_prices_rounded_to_cents(self):
+        """Test that prices are stored in whole cents and compared exactly."""
+        product = self.product_service.add_product(
+            url="https://example.com/product1",
+            name="Test Product",
+            price=0.1 + 0.2
+        )
+        self.assertEqual(product.current_price, 0.3)
+        
+        # A float representation error must not register as a price drop
+        self.product_service.update_product_price(product.id, 0.30000000000000004, 'automatic')
+        has_dropped, prev_price, curr_price = self.product_service.has_price_dropped(product.id)
+        self.assertFalse(has_dropped)
+        self.assertEqual(curr_price, 0.3)
+        
+        self.product_service.update_product_price(product.id, Decimal('0.295'), 'manual')
+        updated = self.product_service.get_product(product.id)
+        self.assertEqual(updated.current_price, 0.3)
+    
+    def test_query_products_filters_sorts_and_paginates(self):
+        """Test that query_products filters, sorts and pages in the database."""
+        banana = self.product_service.add_product("https://shop.example.com/banana", "banana", 3.00)
+        apple = self.product_service.add_product("https://shop.example.com/apple", "Apple", 5.00)
+        cherry = self.product_service.add_product("https://other.example.com/cherry", "Cherry 100%", 1.00)
+        self.product_service.deactivate_product(cherry.id)
+        
+        # Active products only, sorted case-insensitively by name
+        products, total_count = self.product_service.query_products(sort_by='name', sort_order='asc')
+        self.assertEqual([p.id for p in products], [apple.id, banana.id])
+        self.assertEqual(total_count, 2)
+        
+        # Search matches name or URL, case-insensitively, with LIKE wildcards taken literally
+        products, total_count = self.product_service.query_products(active_only=False, search='SHOP')
+        self.assertEqual(total_count, 2)
+        products, total_count = self.product_service.query_products(active_only=False, search='100%')
+        self.assertEqual([p.id for p in products], [cherry.id])
+        products, total_count = self.product_service.query_products(active_only=False, search='_')
+        self.assertEqual(total_count, 0)
+        
+        # Only the requested page is returned, with the full match count
+        products, total_count = self.product_service.query_products(
+            active_only=False, sort_by='current_price', sort_order='desc', limit=2, offset=1
+        )
+        self.assertEqual([p.id for p in products], [banana.id, cherry.id])
+        self.assertEqual(total_count, 3)
+        
+        # Products without a previous price sort as 0
+        self.product_service.update_product_price(banana.id, 2.50, 'manual')
+        products, _ = self.product_service.query_products(sort_by='previous_price', sort_order='desc')
+        self.assertEqual([p.id for p in products], [banana.id, apple.id])
+        
+        # A count the caller already has is returned as is
+        products, total_count = self.product_service.query_products(active_only=False, total_count=3)
+        self.assertEqual(len(products), 3)
+        self.assertEqual(total_count, 3)
+        
+        with self.assertRaises(ValueError):
+            self.product_service.query_products(sort_by='url; DROP TABLE products')
+    
+    def test_query_products_sorts_non_ascii_names_case_insensitively(self):
+        """Test that name sorting folds case beyond ASCII, like str.casefold()."""
+        names = ["éclair mini", "Zebra", "ÉCLAIR Deluxe", "apple", "Ärger", "ärmel"]
+        for i, name in enumerate(names):
+            self.product_service.add_product(f"https://example.com/p{i}", name, 1.0)
+        
+        expected = sorted(names, key=str.casefold)
+        products, _ = self.product_service.query_products(sort_by='name', sort_order='asc')
+        self.assertEqual([p.name for p in products], expected)
+        
+        # Keyset pages walk the same order
+        paged, after = [], None
+        while True:
+            page, _ = self.product_service.query_products(sort_by='name', sort_order='asc',
+                                                          limit=2, after=after)
+            if not page:
+                break
+            paged.extend(p.name for p in page)
+            after = (page[-1].sort_value, page[-1].id)
+        self.assertEqual(paged, expected)
+    
+    def test_search_matches_non_ascii_case_insensitively(self):
+        """Test that search folds case beyond ASCII on SQLite."""
+        deluxe = self.product_service.add_product("https://example.com/deluxe", "ÉCLAIR Deluxe", 4.0)
+        mini = self.product_service.add_product("https://example.com/mini", "éclair mini", 2.0)
+        self.product_service.add_product("https://example.com/eclair", "Eclair plain", 1.0)
+        
+        for search in ('éclair', 'ÉCLAIR', 'Éclair'):
+            products, total_count = self.product_service.query_products(search=search, sort_by='name')
+            self.assertEqual({p.id for p in products}, {deluxe.id, mini.id}, search)
+            self.assertEqual(total_count, 2)
+        
+        streamed = list(self.product_service.iter_products(search='ÉCLAIR MINI'))
+        self.assertEqual([p.id for p in streamed], [mini.id])
+    
+    def test_search_case_insensitive_on_other_backends(self):
+        """Test that search uses ILIKE where LIKE is case-sensitive."""
+        engine = create_mock_engine("postgresql://", lambda *args, **kwargs: None)
+        query = _filter_products(Session(bind=engine).query(Product), True, 'Widget')
+        
+        sql = str(query.statement.compile(dialect=engine.dialect))
+        self.assertIn('products.name ILIKE', sql)
+        self.assertIn('products.url ILIKE', sql)
+    
+    def test_query_products_keyset_pagination(self):
+        """Test paging through products with a keyset anchor in every sort order."""
+        for i, price in enumerate([5.0, 3.0, 5.0, 1.0, 3.0]):
+            product = self.product_service.add_product(f"https://example.com/p{i}", f"Product {i}", price)
+            if i % 2:
+                # Leave some products without a last_checked timestamp
+                with self.db_manager.get_session() as session:
+                    session.query(Product).filter(Product.id == product.id).update({'last_checked': None})
+                    session.commit()
+        
+        for sort_by in ('name', 'current_price', 'last_checked'):
+            for sort_order in ('asc', 'desc'):
+                expected, _ = self.product_service.query_products(sort_by=sort_by, sort_order=sort_order)
+                
+                paged, after = [], None
+                while True:
+                    page, total_count = self.product_service.query_products(
+                        sort_by=sort_by, sort_order=sort_order, limit=2, after=after
+                    )
+                    paged.extend(page)
+                    if len(page) < 2:
+                        break
+                    after = (page[-1].sort_value, page[-1].id)
+                
+                self.assertEqual([p.id for p in paged], [p.id for p in expected])
+                self.assertEqual(total_count, 5)
+    
+    def test_query_products_keyset_anchor_changes(self):
+        """Test that a keyset page does not depend on the anchor's current row."""
+        products = [
+            self.product_service.add_product(f"https://example.com/p{i}", f"Product {i}", float(i))
+            for i in range(1, 7)
+        ]
+        
+        first_page, _ = self.product_service.query_products(sort_by='current_price', sort_order='asc', limit=3)
+        self.assertEqual([p.id for p in first_page], [p.id for p in products[:3]])
+        after = (first_page[-1].sort_value, first_page[-1].id)
+        
+        # The anchor's price moves past the rest of the listing
+        self.product_service.update_product_price(first_page[-1].id, 100.0)
+        second_page, _ = self.product_service.query_products(
+            sort_by='current_price', sort_order='asc', limit=3, after=after
+        )
+        self.assertEqual([p.id for p in second_page], [products[3].id, products[4].id, products[5].id])
+        
+        # A deleted anchor still yields the following page
+        self.product_service.delete_product(first_page[-1].id)
+        second_page, _ = self.product_service.query_products(
+            sort_by='current_price', sort_order='asc', limit=3, after=after
+        )
+        self.assertEqual([p.id for p in second_page], [products[3].id, products[4].id, products[5].id])
+    
+    def test_query_products_price_change(self):
+        """Test that listed products carry the price change computed by the database."""
+        dropped = self.product_service.add_product("https://example.com/p1", "Dropped", 100.0)
+        unchanged = self.product_service.add_product("https://example.com/p2", "Unchanged", 50.0)
+        self.product_service.update_product_price(dropped.id, 80.0)
+        
+        products, _ = self.product_service.query_products(sort_by='name', sort_order='asc')
+        
+        self.assertEqual(products[0].id, dropped.id)
+        self.assertAlmostEqual(products[0].price_change_amount, -20.0)
+        self.assertAlmostEqual(products[0].price_change_percentage, -20.0)
+        self.assertEqual(products[1].id, unchanged.id)
+        self.assertIsNone(products[1].price_change_amount)
+        self.assertIsNone(products[1].price_change_percentage)
+    
+    def test_iter_products_matches_query_products(self):
+        """Test streaming products with the same filters and order as query_products."""
+        for i, name in enumerate(["Widget B", "gadget", "Widget a"]):
+            self.product_service.add_product(f"https://example.com/p{i}", name, 10.0 + i)
+        
+        for sort_by, sort_order, search in (('name', 'asc', None), ('current_price', 'desc', 'widget')):
+            expected, total_count = self.product_service.query_products(
+                search=search, sort_by=sort_by, sort_order=sort_order
+            )
+            streamed = list(self.product_service.iter_products(
+                chunk_size=1, search=search, sort_by=sort_by, sort_order=sort_order
+            ))
+            
+            self.assertEqual([p.id for p in streamed], [p.id for p in expected])
+            self.assertEqual(self.product_service.count_products(search=search), total_count)
+        
+        self.assertEqual(self.product_service.count_products(search="widget"), 2)
+    
     def test_get_products_for_monitoring(self):
         """Test getting products for monitoring."""
         # Add products
@@ -365,6 +814,23 @@ class TestProductService(unittest.TestCase):
         self.assertEqual(stats['active_products'], 2)
         self.assertEqual(stats['inactive_products'], 1)
         self.assertEqual(stats['recent_price_drops'], 1)
+    
+    def test_get_product_statistics_cache(self):
+        """Test that statistics are cached and refreshed after product changes."""
+        product = self.product_service.add_product("https://example.com/product1", "Product 1", 99.99)
+        self.assertEqual(self.product_service.get_product_statistics()['active_products'], 1)
+        
+        # Writes that bypass the service are only seen once the cache expires
+        with self.db_manager.get_session() as session:
+            session.query(Product).filter(Product.id == product.id).update({'is_active': False})
+            session.commit()
+        self.assertEqual(self.product_service.get_product_statistics()['active_products'], 1)
+        
+        # Changes made through the service refresh the statistics immediately
+        self.product_service.add_product("https://example.com/product2", "Product 2", 49.99)
+        stats = self.product_service.get_product_statistics()
+        self.assertEqual(stats['total_products'], 2)
+        self.assertEqual(stats['active_products'], 1)
 
 
 if __name__ == '__main__':
@@ -5,6 +5,7 @@ import unittest
 from unittest.mock import Mock, patch, mock_open
 import ssl
 import os
+import threading
 from datetime import datetime, timezone, timedelta
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
@@ -292,6 +293,30 @@ class TestSecurityService(unittest.TestCase):
         is_valid = self.security_service.is_certificate_valid("invalid certificate")
         self.assertFalse(is_valid)
     
+    def test_certificate_cache_thread_safe(self):
+        """Test that concurrent lookups survive evictions from the certificate cache."""
+        pems = [self.ca_cert_pem, self.server_cert_pem, self.client_cert_pem]
+        errors = []
+        
+        def load_repeatedly(offset):
+            try:
+                for i in range(300):
+                    pem = pems[(i + offset) % len(pems)]
+                    cert = self.security_service._load_certificate(pem)
+                    self.assertEqual(cert.public_bytes(serialization.Encoding.PEM).decode(), pem)
+            except Exception as e:
+                errors.append(e)
+        
+        with patch('src.security.security_service.CERTIFICATE_CACHE_MAX_ENTRIES', 1):
+            workers = [threading.Thread(target=load_repeatedly, args=(n,)) for n in range(8)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(self.security_service._cert_cache), 1)
+    
     def test_extract_client_id_from_common_name(self):
         """Test client ID extraction from certificate common name."""
         client_id = self.security_service._extract_client_id(self.client_cert)
@@ -101,6 +101,41 @@ class TestWebInterface(unittest.TestCase):
                     'text/plain' in response.content_type
                 )
     
+    def test_security_headers_on_pages_and_errors(self):
+        """Test that security headers are set exactly once on pages and error responses."""
+        with patch('src.app.DatabaseManager'), \
+             patch('src.app.SecurityService'), \
+             patch('src.app.setup_mtls_authentication'):
+            
+            app = SecureFlaskApp(self.mock_config_service)
+            app.app.config['TESTING'] = True
+            
+            with app.app.test_client() as client:
+                for path in ('/', '/static/styles.css', '/does-not-exist'):
+                    response = client.get(path)
+                    self.assertEqual(response.headers.getlist('X-Frame-Options'), ['DENY'])
+                    self.assertEqual(len(response.headers.getlist('Content-Security-Policy')), 1)
+                    self.assertIn('Strict-Transport-Security', response.headers)
+                    self.assertNotIn('Server', response.headers)
+    
+    def test_server_timing_header(self):
+        """Test that the Server-Timing header is only added when enabled."""
+        for enabled in (False, True):
+            self.mock_config.enable_server_timing = enabled
+            with patch('src.app.DatabaseManager'), \
+                 patch('src.app.SecurityService'), \
+                 patch('src.app.setup_mtls_authentication'):
+                
+                app = SecureFlaskApp(self.mock_config_service)
+                app.app.config['TESTING'] = True
+                
+                with app.app.test_client() as client:
+                    response = client.get('/')
+                    if enabled:
+                        self.assertRegex(response.headers['Server-Timing'], r'^app;dur=\d+\.\d{2}$')
+                    else:
+                        self.assertNotIn('Server-Timing', response.headers)
+    
     def test_html_contains_required_elements(self):
         """Test that the HTML contains required elements for functionality."""
         with patch('src.app.DatabaseManager'), \
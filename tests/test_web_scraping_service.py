@@ -1,6 +1,7 @@
 """
 Tests for web scraping service functionality.
 """
+import dataclasses
 import unittest
 from unittest.mock import Mock, patch, MagicMock
 import requests
@@ -340,6 +341,14 @@ class TestScrapingResult(unittest.TestCase):
         self.assertIsNone(result.page_content)
         self.assertEqual(result.error_message, error_msg)
         self.assertEqual(result.retry_count, retry_count)
+    
+    def test_result_is_immutable(self):
+        """Test that scraping results cannot be modified after creation."""
+        result = ScrapingResult.error_result("Test error")
+        
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            result.success = True
+        self.assertFalse(hasattr(result, '__dict__'))
 
 
 class TestPageContent(unittest.TestCase):
@@ -379,6 +388,14 @@ class TestPageContent(unittest.TestCase):
         )
         
         self.assertEqual(content.fetched_at, custom_time)
+    
+    def test_page_content_uses_slots(self):
+        """Test that PageContent instances carry no per-instance __dict__."""
+        content = PageContent(url="https://example.com", html="", status_code=200, headers={})
+        
+        self.assertFalse(hasattr(content, '__dict__'))
+        with self.assertRaises(AttributeError):
+            content.unexpected_attribute = True
 
 
 if __name__ == '__main__':